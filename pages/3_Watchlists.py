@@ -40,19 +40,8 @@ from stock_lookup import get_stock_info
 from cached_data import get_shared_stock_data
 
 # Import TR analysis modules (moved from function-level)
-from tr_indicator import analyze_tr_indicator
-from tr_enhanced import (
-    add_peaks_and_valleys,
-    calculate_buy_points,
-    add_buy_zone_indicator,
-    calculate_stop_loss,
-    identify_buy_and_exit_signals,
-    add_tr_enhancements,
-    add_strength_indicators,
-    add_star_for_strong_stocks,
-    add_signal_markers,
-    detect_and_adjust_splits
-)
+from tr_indicator import analyze_tr_indicator, tr_stage_from_status
+from tr_enhanced import analyze_prefetched_tr, prepare_market_data
 from universal_cache import get_stock_data, clear_cache as clear_universal_cache
 
 # Import the NEW batch fetcher module
@@ -861,51 +850,25 @@ def remove_stock_from_watchlist(watchlist_id, symbol):
     return True
 
 
-def apply_tr_analysis_to_batch_data(df, ticker, market_df=None, timeframe='daily'):
+def apply_tr_analysis_to_batch_data(df, ticker, market_df=None, timeframe='daily', start_date=None):
     """
     Apply TR analysis to ALREADY-FETCHED batch data
     This is the KEY to making batch fetching actually fast!
     
     Args:
-        df: Already-fetched DataFrame with OHLCV data
+        df: Already-fetched DataFrame with daily OHLCV data
         ticker: Stock symbol
-        market_df: Pre-fetched SPY data (to avoid fetching for each stock!)
+        market_df: Pre-fetched SPY data from prepare_market_data
+                   (to avoid fetching for each stock!)
         timeframe: 'daily' or 'weekly'
+        start_date: Drop bars before this date (optional)
     
     Returns:
         DataFrame with TR analysis applied
     """
-    # All imports now at top of file for better performance
-    
-    if df is None or df.empty:
-        return None
-    
-    # Make a copy to avoid modifying batch data
-    df = df.copy()
-    
-    # Ensure Date column exists
-    if 'Date' not in df.columns and df.index.name == 'Date':
-        df = df.reset_index()
-    
-    # CRITICAL: Detect and adjust for stock splits
-    df = detect_and_adjust_splits(df)
-    
-    # Use the pre-fetched market data (don't fetch again!)
+    # Same pipeline as analyze_stock_complete_tr, minus the downloads
     # This saves 3-5 seconds per stock!
-    
-    # Apply TR analysis in correct order
-    df = analyze_tr_indicator(df)
-    df = add_peaks_and_valleys(df)
-    df = calculate_buy_points(df)
-    df = add_buy_zone_indicator(df)
-    df = calculate_stop_loss(df)
-    df = identify_buy_and_exit_signals(df)
-    df = add_tr_enhancements(df)
-    df = add_strength_indicators(df, market_df)
-    df = add_star_for_strong_stocks(df)
-    df = add_signal_markers(df)
-    
-    return df
+    return analyze_prefetched_tr(df, ticker, timeframe, market_df, start_date)
 
 
 # ============================================================================
@@ -1003,14 +966,19 @@ def analyze_watchlist_batch(watchlist_id, duration_days=400, timeframe='daily'):
     
     start_time = time.time()
     
-    # STEP 1: Batch fetch raw stock data (FAST!)
+    # Same window as analyze_stock_complete_tr so results match the detail views
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=duration_days)
+    
+    # STEP 1: Batch fetch raw DAILY stock data (FAST!)
+    # Weekly bars are resampled from daily inside the TR pipeline
     if BATCH_FETCHING_AVAILABLE:
         print("✅ Using BATCH FETCHING (10x faster!)...")
         batch_data = fetch_watchlist_data_batch(
             symbols=symbols,
             api_source=api_source,
             duration_days=duration_days,
-            timeframe=timeframe,
+            timeframe='daily',
             use_cache=True
         )
     else:
@@ -1018,17 +986,12 @@ def analyze_watchlist_batch(watchlist_id, duration_days=400, timeframe='daily'):
         batch_data = {}
         for symbol in symbols:
             try:
-                df = get_shared_stock_data(symbol, duration_days, timeframe, api_source)
-                batch_data[symbol] = df
+                batch_data[symbol] = get_stock_data(symbol, start_date, end_date, '1d', api_source)
             except:
                 batch_data[symbol] = None
     
     # STEP 1.5: Fetch SPY data ONCE for all stocks (for RS calculation)
     print("📊 Fetching SPY data for Relative Strength calculations...")
-    # Imports now at top of file
-    
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=duration_days + 100)  # Extra buffer
     
     market_df = get_stock_data(
         ticker='SPY',
@@ -1039,20 +1002,14 @@ def analyze_watchlist_batch(watchlist_id, duration_days=400, timeframe='daily'):
         force_refresh=False
     )
     
-    if market_df is not None and not market_df.empty:
-        market_df = market_df.copy()
-        if 'Date' not in market_df.columns:
-            market_df = market_df.reset_index()
-            if 'index' in market_df.columns:
-                market_df = market_df.rename(columns={'index': 'Date'})
-        market_df['Date'] = pd.to_datetime(market_df['Date'])
+    market_df = prepare_market_data(market_df, timeframe)
+    
+    if market_df is not None:
         print(f"✅ SPY data fetched: {len(market_df)} rows")
     else:
-        market_df = None
         print("⚠️ Could not fetch SPY data - RS calculations may be affected")
     
-    # STEP 2: Apply COMPLETE TR analysis (with all technical indicators)
-    # Use get_shared_stock_data() which applies the FULL analysis pipeline
+    # STEP 2: Apply COMPLETE TR analysis to the batch data (no more downloads)
     stock_data = []
     
     # Create progress indicators
@@ -1079,11 +1036,11 @@ def analyze_watchlist_batch(watchlist_id, duration_days=400, timeframe='daily'):
             })
             continue
         
-        # Use get_shared_stock_data which has COMPLETE analysis with ALL fields
-        # This is cached by Streamlit so it won't refetch if already analyzed
+        # Apply the COMPLETE TR pipeline to the already-fetched data
+        # (batch period, e.g. '2y', is trimmed to the requested window)
         try:
             print(f"   Applying complete TR analysis to {symbol}...")
-            analyzed_df = get_shared_stock_data(symbol, duration_days, timeframe, api_source)
+            analyzed_df = apply_tr_analysis_to_batch_data(df, symbol, market_df, timeframe, start_date)
             
             if analyzed_df is not None and not analyzed_df.empty:
                 stock_info = extract_stock_data(analyzed_df, symbol)
@@ -1114,33 +1071,35 @@ def calculate_alignment(tr_daily, tr_weekly):
     """
     Calculate alignment between Daily and Weekly TR Status
     
+    Args:
+        tr_daily: Daily TR stage code or status string
+        tr_weekly: Weekly TR stage code or status string
+    
     Returns:
         str: 'bull', 'bear', or 'mixed'
     """
-    if not tr_daily or not tr_weekly or tr_daily == 'N/A' or tr_weekly == 'N/A':
-        return 'mixed'
+    daily_stage = _as_tr_stage(tr_daily)
+    weekly_stage = _as_tr_stage(tr_weekly)
     
-    # Define bullish and bearish statuses
-    bullish = ['Strong Buy', 'Buy', 'Neutral Buy']
-    bearish = ['Strong Sell', 'Sell', 'Neutral Sell']
-    
-    # Check if daily is bullish/bearish
-    daily_bullish = any(status in str(tr_daily) for status in bullish)
-    daily_bearish = any(status in str(tr_daily) for status in bearish)
-    
-    # Check if weekly is bullish/bearish
-    weekly_bullish = any(status in str(tr_weekly) for status in bullish)
-    weekly_bearish = any(status in str(tr_weekly) for status in bearish)
+    if daily_stage is None or weekly_stage is None:
+        return 'mixed'
     
-    # Determine alignment
-    if daily_bullish and weekly_bullish:
+    # Stage sign is the trend direction (Neutral = 0 is neither)
+    if daily_stage > 0 and weekly_stage > 0:
         return 'bull'
-    elif daily_bearish and weekly_bearish:
+    elif daily_stage < 0 and weekly_stage < 0:
         return 'bear'
     else:
         return 'mixed'
 
 
+def _as_tr_stage(tr_status):
+    """TR stage code from a code or a (possibly enhanced) status string, None for N/A"""
+    if isinstance(tr_status, (int, np.integer)):
+        return int(tr_status)
+    return tr_stage_from_status(tr_status)
+
+
 def analyze_watchlist_multi_tf(watchlist_id, duration_days=400):
     """
     Multi-Timeframe Analysis: Analyze all stocks on BOTH Daily AND Weekly timeframes
@@ -1363,6 +1322,18 @@ def calculate_ytd_performance(df):
         return 'N/A'
 
 
+# TR stage code -> badge CSS class
+TR_BADGE_CLASSES = {
+    3: 'tr-strong-buy',
+    2: 'tr-buy',
+    1: 'tr-neutral',
+    0: 'tr-neutral',
+    -1: 'tr-neutral',
+    -2: 'tr-sell',
+    -3: 'tr-strong-sell'
+}
+
+
 def format_tr_badge(value):
     """Format TR Status with colored badge - handles enhanced signals (↑↓✓*) and strips Exit/BUY markers"""
     if value == 'N/A' or value is None or value == 'Error':
@@ -1397,22 +1368,7 @@ def format_tr_badge(value):
     value_str = re.sub(r'\s+', ' ', value_str).strip()
     
     # Determine base status for color (ignore enhancements)
-    if 'Strong Buy' in value_str:
-        css_class = 'tr-strong-buy'
-    elif 'Strong Sell' in value_str:
-        css_class = 'tr-strong-sell'
-    elif 'Neutral Buy' in value_str:
-        css_class = 'tr-neutral'
-    elif 'Neutral Sell' in value_str:
-        css_class = 'tr-neutral'
-    elif 'Buy' in value_str and 'Sell' not in value_str:
-        css_class = 'tr-buy'
-    elif 'Sell' in value_str:
-        css_class = 'tr-sell'
-    elif 'Neutral' in value_str:
-        css_class = 'tr-neutral'
-    else:
-        css_class = 'tr-loading'
+    css_class = TR_BADGE_CLASSES.get(tr_stage_from_status(value_str), 'tr-loading')
     
     return f'<div class="{css_class}">{value_str}</div>'
 
@@ -327,14 +327,14 @@ def fetch_list_data_batch(symbols, list_key, force_refresh=False, api_source='ya
         try:
             # Use batch_fetcher for single API call
             if BATCH_FETCHING_AVAILABLE:
-                from batch_fetcher import batch_fetch_stocks
-                
-                # Fetch all stocks in ONE call (500 days for 1Y performance)
-                batch_data = batch_fetch_stocks(
+                # Fetch all stocks in ONE call (500 days for 1Y performance);
+                # symbols already cached by any list or watchlist are not re-downloaded
+                batch_data = fetch_watchlist_data_batch(
                     symbols=symbols_to_fetch,
                     api_source=api_source,
                     duration_days=500,
-                    timeframe='daily'
+                    timeframe='daily',
+                    use_cache=not force_refresh
                 )
                 
                 # Process batch results and cache them
@@ -14,6 +14,7 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from pattern_detection import detect_patterns_for_chart
+from pattern_screener import query_patterns
 from tr_enhanced import analyze_stock_complete_tr
 
 st.set_page_config(
@@ -625,7 +626,39 @@ else:
     - **Smooth Curves:** Blue/purple dotted lines show idealized pattern shape
     """)
 
-
+# Universe screener - reads the index built nightly by pattern_screener.py
+st.markdown("---")
+with st.expander("🌐 Universe Screener (all stocks)"):
+    pattern_types = [
+        'Cup & Handle', 'Flat Base', 'Saucer Base', 'Ascending Base',
+        'Ascending Triangle', 'Descending Triangle', 'Symmetrical Triangle',
+        'Double Bottom', 'Double Top', 'Inverse Head & Shoulders', 'Head & Shoulders'
+    ]
+    
+    scol1, scol2, scol3 = st.columns(3)
+    with scol1:
+        screen_types = st.multiselect("Pattern", pattern_types, default=['Cup & Handle'])
+    with scol2:
+        screen_bars = st.number_input("Completed in last N bars", min_value=1, max_value=250, value=10)
+    with scol3:
+        screen_conf = st.slider("Min Confidence", 0, 100, 70)
+    
+    matches = query_patterns(
+        pattern_type=screen_types or None,
+        within_bars=int(screen_bars),
+        min_confidence=screen_conf,
+        selected_only=not show_all
+    )
+    
+    if matches.empty:
+        st.info("ℹ️ No matches - run `python src/pattern_screener.py` to build or update the index.")
+    else:
+        st.caption(f"{len(matches)} patterns in {matches['symbol'].nunique()} stocks")
+        st.dataframe(
+            matches[['symbol', 'type', 'direction', 'confidence', 'start_date', 'end_date', 'target_price']],
+            use_container_width=True,
+            hide_index=True
+        )
 
 # Footer
 st.markdown("---")
@@ -20,7 +20,7 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 from cached_data import get_shared_stock_data
-from ml_ichimoku_predictor import predict_ichimoku_confidence
+from ml_ichimoku_predictor import build_signal_frame, predict_ichimoku_confidence_batch
 from tr_enhanced import analyze_stock_complete_tr
 
 st.set_page_config(
@@ -543,77 +543,33 @@ def find_enhanced_tr_signals(df, tr_data, ema_13, ema_30, senkou_a, senkou_b):
 
 
 def get_ml_confidence_for_signals(df, buy_signals, sell_signals, ema_13, ema_30, ema_200, senkou_a, senkou_b):
-    """Get ML confidence scores for detected Ichimoku signals."""
-    buy_predictions = []
-    sell_predictions = []
+    """Get ML confidence scores for detected Ichimoku signals (one batched model call)."""
+    # Signals outside the frame have no bar to score
+    buy_signals = [idx for idx in buy_signals if 0 <= idx < len(df)]
+    sell_signals = [idx for idx in sell_signals if 0 <= idx < len(df)]
+    indices = buy_signals + sell_signals
     
-    for idx in buy_signals:
-        try:
-            entry_price = float(df['Close'].iloc[idx])
-            ema13_val = float(ema_13.iloc[idx])
-            ema30_val = float(ema_30.iloc[idx])
-            ema200_val = float(ema_200.iloc[idx])
-            cloud_top = max(float(senkou_a.iloc[idx]), float(senkou_b.iloc[idx]))
-            cloud_bottom = min(float(senkou_a.iloc[idx]), float(senkou_b.iloc[idx]))
-            
-            if entry_price > cloud_top:
-                price_position = 'above'
-            elif entry_price < cloud_bottom:
-                price_position = 'below'
-            else:
-                price_position = 'inside'
-            
-            signal_data = {
-                'entry_price': entry_price,
-                'ema_13': ema13_val,
-                'ema_30': ema30_val,
-                'ema_200': ema200_val,
-                'cloud_top': cloud_top,
-                'cloud_bottom': cloud_bottom,
-                'price_position': price_position,
-                'timeframe': 'Daily'
-            }
-            
-            prediction = predict_ichimoku_confidence(signal_data)
-            buy_predictions.append((idx, prediction))
-        except:
-            continue
+    if not indices:
+        return {'buy_predictions': [], 'sell_predictions': []}
     
-    for idx in sell_signals:
-        try:
-            entry_price = float(df['Close'].iloc[idx])
-            ema13_val = float(ema_13.iloc[idx])
-            ema30_val = float(ema_30.iloc[idx])
-            ema200_val = float(ema_200.iloc[idx])
-            cloud_top = max(float(senkou_a.iloc[idx]), float(senkou_b.iloc[idx]))
-            cloud_bottom = min(float(senkou_a.iloc[idx]), float(senkou_b.iloc[idx]))
-            
-            if entry_price > cloud_top:
-                price_position = 'above'
-            elif entry_price < cloud_bottom:
-                price_position = 'below'
-            else:
-                price_position = 'inside'
-            
-            signal_data = {
-                'entry_price': entry_price,
-                'ema_13': ema13_val,
-                'ema_30': ema30_val,
-                'ema_200': ema200_val,
-                'cloud_top': cloud_top,
-                'cloud_bottom': cloud_bottom,
-                'price_position': price_position,
-                'timeframe': 'Daily'
-            }
-            
-            prediction = predict_ichimoku_confidence(signal_data)
-            sell_predictions.append((idx, prediction))
-        except:
-            continue
+    signals = build_signal_frame(df['Close'], ema_13, ema_30, ema_200, senkou_a, senkou_b, indices)
+    
+    # Skip signals the model cannot score (e.g. no Senkou B yet in the first
+    # ~77 bars) instead of failing the whole batch
+    finite = np.isfinite(signals.drop(columns='price_position').to_numpy(dtype=float)).all(axis=1)
+    buy_finite, sell_finite = finite[:len(buy_signals)], finite[len(buy_signals):]
+    buy_signals = [idx for idx, ok in zip(buy_signals, buy_finite) if ok]
+    sell_signals = [idx for idx, ok in zip(sell_signals, sell_finite) if ok]
+    signals = signals[finite].reset_index(drop=True)
+    
+    if signals.empty:
+        return {'buy_predictions': [], 'sell_predictions': []}
+    
+    predictions = predict_ichimoku_confidence_batch(signals, timeframe='Daily')
     
     return {
-        'buy_predictions': buy_predictions,
-        'sell_predictions': sell_predictions
+        'buy_predictions': list(zip(buy_signals, predictions[:len(buy_signals)])),
+        'sell_predictions': list(zip(sell_signals, predictions[len(buy_signals):]))
     }
 
 
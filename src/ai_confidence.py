@@ -7,17 +7,84 @@ Features:
 - Labels outcomes (success/failure)
 - Trains Random Forest & XGBoost models
 - Generates confidence scores for predictions
+
+Training data:
+- Histories are read from the shared universal_cache in parallel, only
+  missing/stale tickers are downloaded (one batch)
+- Features and labels of all patterns of a ticker are computed with
+  array operations (prefix sums, forward max/min windows)
+- The labeled dataset is stored in model_dir and reused: tickers whose
+  bars did not change are not recomputed
 """
 
+import json
 import pandas as pd
 import numpy as np
 import pickle
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
+from cache_storage import get_backend, atomic_write, write_json
+from pattern_detection import PriceWindowStats
+
+# Columns produced by extract_features, in training order
+FEATURE_COLUMNS = [
+    'pattern_type', 'confidence', 'direction', 'pattern_length', 'price_range',
+    'price_range_pct', 'volatility', 'avg_volume', 'volume_trend', 'neckline',
+    'target_distance', 'current_price', 'trend_strength'
+]
+
+# Columns of the stored training dataset
+DATASET_COLUMNS = ['ticker', 'end_date', *FEATURE_COLUMNS, 'label']
+
+# Bump when pattern detection, feature extraction or labeling changes -
+# a stored dataset built by another version is rebuilt from scratch
+TRAINING_DATASET_VERSION = 2
+
+# Stored with the dataset fingerprints (version + feature schema)
+DATASET_KEY = f"v{TRAINING_DATASET_VERSION}:{','.join(DATASET_COLUMNS)}"
+
+# Tickers per parallel cache read
+TRAINING_FETCH_CHUNK = 50
+
+
+def _window_moments(values, starts, ends):
+    """
+    Mean, sample std and least-squares slope of values[s:e+1] for many windows
+
+    Uses prefix sums of the values (centered on their mean to limit
+    cancellation), so every window costs O(1).
+
+    Args:
+        values (np.ndarray): Series values
+        starts, ends (np.ndarray): Inclusive window bounds
+
+    Returns:
+        tuple: (mean, std, slope) arrays - std is NaN and slope 0 for single bars
+    """
+    offset = values.mean() if len(values) else 0.0
+    centered = values - offset
+    index = np.arange(len(values))
+
+    prefix = np.zeros((3, len(values) + 1))
+    prefix[0, 1:] = np.cumsum(centered)
+    prefix[1, 1:] = np.cumsum(centered * index)
+    prefix[2, 1:] = np.cumsum(centered ** 2)
+
+    total, weighted, squares = prefix[:, ends + 1] - prefix[:, starts]
+    n = (ends - starts + 1).astype(float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / n
+        std = np.sqrt(np.maximum(squares - total * mean, 0) / (n - 1))
+        slope = (weighted - (starts + (n - 1) / 2) * total) / (n * (n ** 2 - 1) / 12)
+
+    return mean + offset, np.where(n > 1, std, np.nan), np.where(n > 1, slope, 0.0)
+
 
 class AIConfidenceScorer:
     """ML-based confidence scoring for pattern predictions"""
@@ -82,7 +149,7 @@ class AIConfidenceScorer:
         else:
             features['neckline'] = 0
         
-        if 'target_price' in pattern:
+        if pattern.get('target_price') is not None:
             current_price = df[price_col].iloc[end_idx]
             features['target_distance'] = abs(pattern['target_price'] - current_price) / current_price
         else:
@@ -161,83 +228,254 @@ class AIConfidenceScorer:
             else:
                 return 0  # Failure (no significant move)
     
-    def collect_training_data(self, tickers, lookback_years=3):
+    def extract_features_batch(self, patterns, df, price_col='Close'):
+        """
+        extract_features for all patterns of one price series at once
+        
+        Window max/min come from PriceWindowStats, means/std/slopes from
+        prefix sums, so no per-pattern slicing of the DataFrame.
+        
+        Args:
+            patterns (list): Pattern dictionaries
+            df (pd.DataFrame): Price data
+            price_col (str): Price column name
+        
+        Returns:
+            pd.DataFrame: One row per pattern, FEATURE_COLUMNS
+        """
+        prices = df[price_col].to_numpy(dtype=float)
+        starts = np.array([p['start_idx'] for p in patterns], dtype=np.intp)
+        ends = np.array([p['end_idx'] for p in patterns], dtype=np.intp)
+        
+        stats = PriceWindowStats(prices)
+        high = stats.range_max(starts, ends + 1)
+        low = stats.range_min(starts, ends + 1)
+        mean, std, _ = _window_moments(prices, starts, ends)
+        
+        features = pd.DataFrame({
+            'pattern_type': [p['type'] for p in patterns],
+            'confidence': [p['confidence'] for p in patterns],
+            'direction': [p['direction'] for p in patterns],
+            'pattern_length': ends - starts,
+            'price_range': high - low,
+            'price_range_pct': (high - low) / mean,
+            'volatility': std / mean
+        })
+        
+        # Volume characteristics (if available)
+        if 'Volume' in df.columns:
+            avg_volume, _, volume_trend = _window_moments(df['Volume'].to_numpy(dtype=float), starts, ends)
+            features['avg_volume'] = avg_volume
+            features['volume_trend'] = volume_trend
+        else:
+            features['avg_volume'] = 0
+            features['volume_trend'] = 0
+        
+        # Pattern-specific features
+        features['neckline'] = [p.get('neckline', 0) for p in patterns]
+        
+        current_price = prices[ends]
+        target = np.array([np.nan if p.get('target_price') is None else p['target_price'] for p in patterns],
+                          dtype=float)
+        features['target_distance'] = np.where(np.isnan(target), 0, np.abs(target - current_price) / current_price)
+        
+        # Market context
+        features['current_price'] = current_price
+        
+        # Trend strength (slope of the last 21 bars)
+        trend_starts = np.maximum(ends - 20, 0)
+        features['trend_strength'] = np.where(ends >= 20, _window_moments(prices, trend_starts, ends)[2], 0)
+        
+        return features
+    
+    def label_outcomes_batch(self, patterns, df, price_col='Close', lookforward_days=30):
+        """
+        label_pattern_outcome for all patterns of one price series at once
+        
+        The max/min of the lookforward_days bars after every bar are computed
+        once (rolling window), then each pattern is a lookup.
+        
+        Args:
+            patterns (list): Pattern dictionaries
+            df (pd.DataFrame): Complete price data (including future)
+            price_col (str): Price column name
+            lookforward_days (int): Days to look forward for outcome
+        
+        Returns:
+            np.ndarray: 1 success, 0 failure, -1 unknown per pattern
+        """
+        prices = df[price_col].to_numpy(dtype=float)
+        ends = np.array([p['end_idx'] for p in patterns], dtype=np.intp)
+        labels = np.full(len(patterns), -1)
+        
+        # Need enough future data and a target to evaluate
+        has_target = np.array(['target_price' in p for p in patterns], dtype=bool)
+        known = (ends + lookforward_days < len(prices)) & has_target
+        if not known.any():
+            return labels
+        
+        future_low, future_high = PriceWindowStats(prices).rolling(lookforward_days)[:2]
+        
+        end_idx = ends[known]
+        future_max = future_high[end_idx + 1]
+        future_min = future_low[end_idx + 1]
+        current_price = prices[end_idx]
+        target = np.array([np.nan if p['target_price'] is None else p['target_price']
+                           for p, k in zip(patterns, known) if k], dtype=float)
+        direction = np.array([p['direction'] for p, k in zip(patterns, known) if k])
+        
+        # Bullish: target reached = success, >10% drop = failure
+        bullish = np.select([future_max >= target, future_min < current_price * 0.90], [1, 0], -1)
+        # Bearish: target reached = success, >10% rise = failure
+        bearish = np.select([future_min <= target, future_max > current_price * 1.10], [1, 0], -1)
+        # Neutral: success if a 5% move happened either way
+        max_move = np.maximum(np.abs(future_max - current_price), np.abs(future_min - current_price)) / current_price
+        neutral = np.where(max_move > 0.05, 1, 0)
+        
+        labels[known] = np.select([direction == 'bullish', direction == 'bearish'], [bullish, bearish], neutral)
+        return labels
+    
+    def collect_training_data(self, tickers, lookback_years=3, timeframe='weekly',
+                              lookforward_days=30, workers=8):
         """
         Collect historical patterns for training
         
         Args:
             tickers (list): List of stock tickers to analyze
             lookback_years (int): Years of historical data
+            timeframe (str): 'daily' or 'weekly' bars
+            lookforward_days (int): Bars to look forward for the outcome
+            workers (int): Threads for the parallel cache reads
         
         Returns:
             tuple: (features_df, labels_series)
         """
-        print(f"📊 Collecting training data from {len(tickers)} stocks...")
+        dataset = self.build_training_dataset(tickers, lookback_years, timeframe, lookforward_days, workers)
         
-        from pattern_detection import detect_patterns_for_chart
-        from stock_data_formatter import get_stock_data_formatted
+        features_df = dataset[FEATURE_COLUMNS].reset_index(drop=True)
+        labels_series = dataset['label'].reset_index(drop=True)
         
-        all_features = []
-        all_labels = []
+        return features_df, labels_series
+    
+    def get_dataset_path(self, timeframe='weekly', lookforward_days=30):
+        """Stored training dataset for a timeframe / lookforward window"""
+        backend = get_backend()
+        return os.path.join(self.model_dir, f'pattern_training_{timeframe}_fwd{lookforward_days}{backend.extension}')
+    
+    def build_training_dataset(self, tickers, lookback_years=3, timeframe='weekly',
+                               lookforward_days=30, workers=8):
+        """
+        Labeled patterns of all tickers, reusing the stored dataset
         
+        Only tickers whose bars changed since the last build (fingerprint in
+        the '.json' sidecar) are detected and labeled again; the dataset is
+        written back to model_dir as one columnar file. A dataset stored
+        under another DATASET_KEY (detection/feature version) is rebuilt.
+        
+        Args:
+            tickers (list): List of stock tickers to analyze
+            lookback_years (int): Years of historical data
+            timeframe (str): 'daily' or 'weekly' bars
+            lookforward_days (int): Bars to look forward for the outcome
+            workers (int): Threads for the parallel cache reads
+        
+        Returns:
+            pd.DataFrame: ticker, end_date, FEATURE_COLUMNS and label (0/1)
+                          for the requested tickers
+        """
+        from pattern_screener import bars_fingerprint
+        
+        backend = get_backend()
+        dataset_path = self.get_dataset_path(timeframe, lookforward_days)
+        fingerprint_path = dataset_path + '.json'
+        
+        stored = pd.DataFrame()
+        fingerprints = {}
+        if os.path.exists(dataset_path) and os.path.exists(fingerprint_path):
+            try:
+                with open(fingerprint_path) as f:
+                    sidecar = json.load(f)
+                if sidecar.get('dataset_key') == DATASET_KEY:
+                    stored = backend.read(dataset_path)
+                    fingerprints = sidecar['fingerprints']
+                else:
+                    print("⚠️  Training dataset built by another feature version, rebuilding")
+            except Exception as e:
+                print(f"⚠️  Could not read training dataset, rebuilding: {e}")
+                stored, fingerprints = pd.DataFrame(), {}
+        
+        print(f"📊 Collecting training data from {len(tickers)} stocks...")
+        histories = fetch_training_histories(tickers, lookback_years * 365, timeframe, workers)
+        
+        rebuilt = {}
+        reused = 0
         for ticker in tickers:
+            df = histories.get(ticker)
+            
+            if df is None or len(df) < 50:
+                print(f"   ⚠️  Not enough data for {ticker}")
+                continue
+            
+            fingerprint = bars_fingerprint(df)
+            if fingerprints.get(ticker) == fingerprint:
+                reused += 1
+                continue
+            
             try:
-                print(f"   Analyzing {ticker}...")
-                
-                # Get historical data using Tiingo (your existing source)
-                df = get_stock_data_formatted(
-                    ticker=ticker,
-                    timeframe='weekly',
-                    days=lookback_years * 365
-                )
-                
-                if df is None or len(df) < 50:
-                    print(f"   ⚠️  Not enough data for {ticker}")
-                    continue
-                
-                # Find the correct price column name
-                price_col = None
-                for col in ['adjClose', 'adj_close', 'Close', 'close']:
-                    if col in df.columns:
-                        price_col = col
-                        break
-                
-                if price_col is None:
-                    print(f"   ⚠️  No price column found for {ticker}")
-                    continue
-                
-                # Detect patterns
-                patterns = detect_patterns_for_chart(df, price_col)
-                
-                print(f"   Found {len(patterns)} patterns")
-                
-                # Extract features and labels for each pattern
-                for pattern in patterns:
-                    # Skip patterns too close to present (need future data for labeling)
-                    if pattern['end_idx'] + 30 >= len(df):
-                        continue
-                    
-                    # Extract features
-                    features = self.extract_features(pattern, df, price_col)
-                    
-                    # Label outcome
-                    label = self.label_pattern_outcome(pattern, df, price_col)
-                    
-                    if label != -1:  # Only include if we have a clear label
-                        all_features.append(features)
-                        all_labels.append(label)
-                
+                rebuilt[ticker] = self._ticker_training_rows(ticker, df, lookforward_days)
+                fingerprints[ticker] = fingerprint
             except Exception as e:
                 print(f"   ⚠️  Error with {ticker}: {e}")
-                continue
         
-        print(f"\n✅ Collected {len(all_features)} labeled patterns")
+        if rebuilt:
+            if not stored.empty:
+                stored = stored[~stored['ticker'].isin(list(rebuilt))]
+            frames = [f for f in [stored] + list(rebuilt.values()) if not f.empty]
+            stored = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            
+            atomic_write(backend, stored, dataset_path)
+            write_json({'dataset_key': DATASET_KEY, 'fingerprints': fingerprints}, fingerprint_path)
+        
+        if stored.empty:
+            dataset = pd.DataFrame(columns=DATASET_COLUMNS)
+        else:
+            dataset = stored[stored['ticker'].isin(tickers)]
         
-        # Convert to DataFrame
-        features_df = pd.DataFrame(all_features)
-        labels_series = pd.Series(all_labels)
+        print(f"\n✅ Collected {len(dataset)} labeled patterns "
+              f"({len(rebuilt)} stocks analyzed, {reused} reused)")
         
-        return features_df, labels_series
+        return dataset.reset_index(drop=True)
+    
+    def _ticker_training_rows(self, ticker, df, lookforward_days=30):
+        """Features and labels of one ticker's detected patterns (labeled ones only)"""
+        from pattern_detection import detect_patterns_for_chart
+        
+        # Find the correct price column name
+        price_col = None
+        for col in ['adjClose', 'adj_close', 'Close', 'close']:
+            if col in df.columns:
+                price_col = col
+                break
+        
+        if price_col is None:
+            raise ValueError("No price column found")
+        
+        df = df.reset_index(drop=True)
+        
+        # Skip patterns too close to present (need future data for labeling)
+        patterns = [p for p in detect_patterns_for_chart(df, price_col)
+                    if p['end_idx'] + lookforward_days < len(df)]
+        
+        features = self.extract_features_batch(patterns, df, price_col)
+        labels = self.label_outcomes_batch(patterns, df, price_col, lookforward_days)
+        
+        dates = pd.to_datetime(df['Date']) if 'Date' in df.columns else pd.to_datetime(df.index.to_series())
+        features.insert(0, 'ticker', ticker)
+        features.insert(1, 'end_date', dates.to_numpy()[[p['end_idx'] for p in patterns]])
+        features['label'] = labels
+        
+        # Only include patterns with a clear label
+        return features[labels != -1]
     
     def train_models(self, features_df, labels_series):
         """
@@ -403,6 +641,41 @@ class AIConfidenceScorer:
             print(f"⚠️  Could not load models: {e}")
 
 
+def fetch_training_histories(tickers, duration_days, timeframe='weekly', workers=8):
+    """
+    Histories for training, read from the shared universal_cache in parallel
+    
+    Cached tickers are read by a thread pool; the rest are downloaded in
+    one batch through batch_fetcher (and written through to the cache).
+    
+    Args:
+        tickers (list): Stock tickers
+        duration_days (int): Days of history
+        timeframe (str): 'daily' or 'weekly'
+        workers (int): Threads for the cache reads
+    
+    Returns:
+        dict: {ticker: DataFrame with Date column}
+    """
+    from batch_fetcher import get_cached_batch, fetch_watchlist_data_batch
+    
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i:i + TRAINING_FETCH_CHUNK] for i in range(0, len(tickers), TRAINING_FETCH_CHUNK)]
+    
+    histories = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for cached in executor.map(lambda chunk: get_cached_batch(chunk, duration_days, timeframe, 'yahoo'), chunks):
+            histories.update(cached)
+    
+    missing = [t for t in tickers if t not in histories]
+    if missing:
+        print(f"📥 Downloading {len(missing)} stocks not in cache...")
+        fetched = fetch_watchlist_data_batch(missing, duration_days=duration_days, timeframe=timeframe)
+        histories.update({t: df for t, df in fetched.items() if df is not None})
+    
+    return histories
+
+
 # Convenience function
 def get_ai_scorer():
     """Get or create AI confidence scorer instance"""
@@ -23,10 +23,9 @@ Created: November 2025
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Tuple
 import time
-import os
-import pickle
+from universal_cache import resample_ohlcv, normalize_bars, get_cached_stock_data, store_stock_data
 
 # Try to import Tiingo (optional)
 try:
@@ -269,7 +268,7 @@ def batch_fetch_stocks(symbols: List[str], api_source: str = 'yahoo',
     This is the MAIN function to use for batch fetching.
     Automatically handles:
     - Yahoo vs Tiingo
-    - Daily vs Weekly
+    - Daily vs Weekly (weekly bars are resampled from the daily batch)
     - Error handling and fallback
     
     Args:
@@ -294,6 +293,12 @@ def batch_fetch_stocks(symbols: List[str], api_source: str = 'yahoo',
     if not symbols:
         return {}
     
+    if timeframe == 'weekly':
+        return resample_batch(
+            batch_fetch_stocks(symbols, api_source, duration_days, 'daily', tiingo_api_key),
+            timeframe
+        )
+    
     print(f"\n{'='*60}")
     print(f"📦 BATCH FETCHING {len(symbols)} STOCKS")
     print(f"   Source: {api_source.upper()}")
@@ -305,8 +310,7 @@ def batch_fetch_stocks(symbols: List[str], api_source: str = 'yahoo',
     end_date = datetime.now()
     start_date = end_date - timedelta(days=duration_days)
     
-    # Determine interval
-    interval = '1wk' if timeframe == 'weekly' else '1d'
+    interval = '1d'
     
     # Convert duration_days to period string for Yahoo
     if duration_days <= 5:
@@ -335,8 +339,7 @@ def batch_fetch_stocks(symbols: List[str], api_source: str = 'yahoo',
         elif api_source == 'tiingo':
             start_str = start_date.strftime('%Y-%m-%d')
             end_str = end_date.strftime('%Y-%m-%d')
-            freq = 'weekly' if timeframe == 'weekly' else 'daily'
-            result = batch_fetch_tiingo(symbols, start_str, end_str, tiingo_api_key, freq)
+            result = batch_fetch_tiingo(symbols, start_str, end_str, tiingo_api_key, 'daily')
             if result:
                 return result
     except Exception as e:
@@ -349,8 +352,7 @@ def batch_fetch_stocks(symbols: List[str], api_source: str = 'yahoo',
             print("  Falling back to Tiingo...")
             start_str = start_date.strftime('%Y-%m-%d')
             end_str = end_date.strftime('%Y-%m-%d')
-            freq = 'weekly' if timeframe == 'weekly' else 'daily'
-            result = batch_fetch_tiingo(symbols, start_str, end_str, tiingo_api_key, freq)
+            result = batch_fetch_tiingo(symbols, start_str, end_str, tiingo_api_key, 'daily')
             if result:
                 return result
         elif api_source == 'tiingo':
@@ -365,54 +367,103 @@ def batch_fetch_stocks(symbols: List[str], api_source: str = 'yahoo',
     return {}
 
 
+def resample_batch(batch_data: Dict[str, pd.DataFrame], timeframe: str = 'weekly') -> Dict[str, pd.DataFrame]:
+    """
+    Resample a daily batch to weekly/monthly bars (universal_cache.resample_ohlcv)
+    
+    Args:
+        batch_data: {symbol: daily DataFrame} from a batch fetch
+        timeframe: 'weekly' or 'monthly'
+    
+    Returns:
+        dict: {symbol: resampled DataFrame or None}
+    """
+    result = {}
+    
+    for symbol, df in batch_data.items():
+        if df is None or df.empty:
+            result[symbol] = None
+            continue
+        
+        # Single-symbol Yahoo downloads keep the ticker level, Tiingo is lowercase
+        if isinstance(df.columns, pd.MultiIndex):
+            df = df.set_axis(df.columns.get_level_values(0), axis=1)
+        df = df.rename(columns={c: c.capitalize() for c in df.columns
+                                if c in ('date', 'open', 'high', 'low', 'close', 'volume')})
+        
+        result[symbol] = resample_ohlcv(df, timeframe)
+    
+    return result
+
+
 # ============================================================================
 # BATCH CACHE SYSTEM
 # ============================================================================
 
-def get_batch_cache_key(symbols: List[str], duration_days: int, timeframe: str, api_source: str) -> str:
-    """Generate cache key for batch data"""
-    # Sort symbols for consistent cache key
-    sorted_symbols = '_'.join(sorted(symbols))
-    return f"batch_{sorted_symbols}_{duration_days}_{timeframe}_{api_source}"
+def _batch_range(duration_days: int):
+    """Date range a batch of duration_days covers (same as batch_fetch_stocks)"""
+    end_date = datetime.now()
+    return end_date - timedelta(days=duration_days), end_date
 
 
-def get_cached_batch(symbols: List[str], duration_days: int, timeframe: str, 
-                     api_source: str, cache_dir: str = '.stock_cache') -> Optional[Dict[str, pd.DataFrame]]:
-    """Check if batch data is cached and fresh (< 1 hour old)"""
-    cache_key = get_batch_cache_key(symbols, duration_days, timeframe, api_source)
-    cache_file = os.path.join(cache_dir, f"{cache_key}.pkl")
-    
-    if os.path.exists(cache_file):
-        # Check if cache is fresh (< 1 hour old)
-        file_time = datetime.fromtimestamp(os.path.getmtime(cache_file))
-        age_hours = (datetime.now() - file_time).total_seconds() / 3600
-        
-        if age_hours < 1:
-            try:
-                with open(cache_file, 'rb') as f:
-                    data = pickle.load(f)
-                print(f"✅ Using cached batch data ({age_hours:.1f}h old)")
-                return data
-            except Exception as e:
-                print(f"⚠️ Cache read error: {e}")
+def get_cached_batch(symbols: List[str], duration_days: int, timeframe: str,
+                     api_source: str) -> Dict[str, pd.DataFrame]:
+    """
+    Per-symbol cache lookup for a batch
+    
+    Every symbol is looked up on its own in the universal_cache history
+    store (shared with watchlists, idea lists and the detail views), so a
+    list that gained one stock is still served from cache for the others.
+    A symbol counts as cached when its history covers the range and is
+    fresh (market_calendar.is_fresh).
     
-    return None
+    Returns:
+        dict: {symbol: DataFrame} for the cached symbols only
+    """
+    if timeframe == 'weekly':
+        return resample_batch(get_cached_batch(symbols, duration_days, 'daily', api_source), timeframe)
+    
+    start_date, end_date = _batch_range(duration_days)
+    
+    cached = {}
+    for symbol in symbols:
+        df = get_cached_stock_data(symbol, start_date, end_date)
+        if df is not None:
+            cached[symbol] = df
+    
+    if cached:
+        print(f"✅ {len(cached)}/{len(symbols)} stocks served from cache")
+    
+    return cached
 
 
-def cache_batch(symbols: List[str], data: Dict[str, pd.DataFrame], duration_days: int, 
-                timeframe: str, api_source: str, cache_dir: str = '.stock_cache'):
-    """Cache batch result for reuse"""
-    try:
-        os.makedirs(cache_dir, exist_ok=True)
-        cache_key = get_batch_cache_key(symbols, duration_days, timeframe, api_source)
-        cache_file = os.path.join(cache_dir, f"{cache_key}.pkl")
-        
-        with open(cache_file, 'wb') as f:
-            pickle.dump(data, f)
-        
-        print(f"✅ Cached batch data for {len(symbols)} stocks")
-    except Exception as e:
-        print(f"⚠️ Cache write error: {e}")
+def cache_batch(symbols: List[str], data: Dict[str, pd.DataFrame], duration_days: int,
+                timeframe: str, api_source: str) -> Dict[str, pd.DataFrame]:
+    """
+    Write a daily batch through to the per-symbol histories
+    
+    Returns:
+        dict: {symbol: DataFrame} read back in the cached layout (Date
+              column), None for symbols without data
+    """
+    if timeframe != 'daily':
+        return data  # Weekly bars are derived from the cached daily bars
+    
+    start_date, end_date = _batch_range(duration_days)
+    
+    stored = {}
+    for symbol in symbols:
+        try:
+            if store_stock_data(symbol, data.get(symbol), start_date, end_date):
+                stored[symbol] = get_cached_stock_data(symbol, start_date, end_date)
+            else:
+                stored[symbol] = None
+        except Exception as e:
+            print(f"⚠️ Cache write error for {symbol}: {e}")
+            stored[symbol] = normalize_bars(data.get(symbol))
+    
+    print(f"✅ Cached {sum(df is not None for df in stored.values())} stocks")
+    return stored
 
 
 # ============================================================================
@@ -425,7 +476,9 @@ def fetch_watchlist_data_batch(symbols: List[str], api_source: str = 'yahoo',
     """
     HIGH-LEVEL function: Fetch watchlist stocks with smart caching
     
-    This is the function to use in the Watchlists page.
+    This is the function to use in the Watchlists and Investment Ideas
+    pages. Cached symbols are served from their per-symbol entries and only
+    the missing ones are downloaded (in one batch call).
     
     Args:
         symbols: List of stock symbols
@@ -441,15 +494,22 @@ def fetch_watchlist_data_batch(symbols: List[str], api_source: str = 'yahoo',
     if not symbols:
         return {}
     
+    # Weekly views reuse the (cached) daily batch - no separate '1wk' download
+    if timeframe == 'weekly':
+        daily = fetch_watchlist_data_batch(symbols, api_source, duration_days, 'daily',
+                                           use_cache, tiingo_api_key)
+        return resample_batch(daily, timeframe)
+    
     # Check cache first
-    if use_cache:
-        cached_data = get_cached_batch(symbols, duration_days, timeframe, api_source)
-        if cached_data:
-            return cached_data
+    cached_data = get_cached_batch(symbols, duration_days, timeframe, api_source) if use_cache else {}
+    missing = [s for s in dict.fromkeys(symbols) if s not in cached_data]
+    
+    if not missing:
+        return {s: cached_data[s] for s in symbols}
     
-    # Fetch batch data
+    # Fetch only the symbols that are not cached
     batch_data = batch_fetch_stocks(
-        symbols=symbols,
+        symbols=missing,
         api_source=api_source,
         duration_days=duration_days,
         timeframe=timeframe,
@@ -458,9 +518,9 @@ def fetch_watchlist_data_batch(symbols: List[str], api_source: str = 'yahoo',
     
     # Cache the result
     if use_cache and batch_data:
-        cache_batch(symbols, batch_data, duration_days, timeframe, api_source)
+        batch_data = cache_batch(missing, batch_data, duration_days, timeframe, api_source)
     
-    return batch_data
+    return {s: cached_data[s] if s in cached_data else batch_data.get(s) for s in symbols}
 
 
 # ============================================================================
@@ -0,0 +1,341 @@
+"""
+CACHE STORAGE BACKENDS - COLUMNAR ON-DISK FORMAT
+================================================
+Pluggable file formats for the stock data caches
+(universal_cache and stock_cache.StockDataCache)
+
+Backends:
+- 'feather': Arrow IPC, uncompressed, memory-mapped on read (default)
+- 'parquet': Compressed columnar, smallest files
+- 'pickle':  Legacy format (used when pyarrow is not installed)
+
+Feather/Parquet support column projection, so callers that only need
+Date/Close (e.g. get_market_data) never read the OHLV columns. Feather
+files are memory-mapped, so parallel scanner workers reading the same
+ticker share the OS page cache instead of each unpickling a copy.
+
+Select the backend with the STOCK_CACHE_FORMAT environment variable.
+
+Migration of existing .pkl caches:
+    python cache_storage.py [--format feather] [--delete]
+"""
+
+import os
+import json
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+# Try to import pyarrow (optional - falls back to pickle)
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class PickleBackend:
+    """Legacy pickle storage - whole frame is loaded on every read"""
+
+    name = 'pickle'
+    extension = '.pkl'
+
+    def write(self, df, path):
+        with open(path, 'wb') as f:
+            pickle.dump(df, f)
+
+    def read(self, path, columns=None):
+        with open(path, 'rb') as f:
+            df = pickle.load(f)
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df
+
+
+class FeatherBackend:
+    """Arrow IPC (Feather v2) storage, uncompressed so it can be memory-mapped"""
+
+    name = 'feather'
+    extension = '.feather'
+
+    def write(self, df, path):
+        feather.write_feather(_arrow_safe(df.reset_index(drop=True)), path, compression='uncompressed')
+
+    def read(self, path, columns=None):
+        table = feather.read_table(path, columns=_existing_columns(path, columns), memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+
+class ParquetBackend:
+    """Parquet storage - compressed, smallest on disk"""
+
+    name = 'parquet'
+    extension = '.parquet'
+
+    def write(self, df, path):
+        _arrow_safe(df.reset_index(drop=True)).to_parquet(path, index=False)
+
+    def read(self, path, columns=None):
+        return pd.read_parquet(path, columns=_existing_columns(path, columns), memory_map=True)
+
+
+def _arrow_safe(df):
+    """
+    Convert object columns Arrow cannot store as-is
+    
+    TR results carry e.g. Peak_Date: Timestamps with '' on bars without a
+    peak. Date-like columns become datetime64 ('' -> NaT), any other mixed
+    column is stored as strings.
+    """
+    converted = {}
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        try:
+            pa.array(values, from_pandas=True)
+            continue
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+
+        blank = values.isna() | values.eq('')
+        if pd.api.types.infer_dtype(values[~blank], skipna=True) in ('datetime', 'datetime64', 'date'):
+            converted[column] = pd.to_datetime(values.mask(blank))
+        else:
+            converted[column] = values.astype(str).where(values.notna(), None)
+
+    if converted:
+        df = df.copy()
+        for column, values in converted.items():
+            df[column] = values
+    return df
+
+
+def _existing_columns(path, columns):
+    """Drop requested columns that are not in the file (pickle backend behaves the same)"""
+    if columns is None:
+        return None
+
+    if str(path).endswith(ParquetBackend.extension):
+        import pyarrow.parquet as pq
+        schema_names = pq.read_schema(path).names
+    else:
+        with pa.memory_map(str(path), 'r') as source:
+            schema_names = pa.ipc.open_file(source).schema.names
+
+    return [c for c in columns if c in schema_names]
+
+
+BACKENDS = {
+    'pickle': PickleBackend,
+    'feather': FeatherBackend,
+    'parquet': ParquetBackend
+}
+
+
+def get_backend(name=None):
+    """
+    Get a storage backend
+
+    Args:
+        name: 'feather', 'parquet' or 'pickle'
+              (default: STOCK_CACHE_FORMAT env var, then 'feather')
+
+    Returns:
+        Backend instance (falls back to pickle if pyarrow is not installed)
+    """
+    if name is None:
+        name = os.getenv('STOCK_CACHE_FORMAT', 'feather')
+
+    name = name.lower()
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown cache format '{name}' (use one of {', '.join(BACKENDS)})")
+
+    if name != 'pickle' and not PYARROW_AVAILABLE:
+        return PickleBackend()
+
+    return BACKENDS[name]()
+
+
+def atomic_write(backend, df, path):
+    """Write through a temp file + rename so parallel readers never see a partial file"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    try:
+        backend.write(df, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def write_json(data, path):
+    """Write a small JSON sidecar atomically"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ONE-SHOT MIGRATION OF EXISTING .pkl CACHES
+# ═══════════════════════════════════════════════════════════════════
+
+def migrate_universal_cache(backend=None, delete=False):
+    """
+    Convert universal_cache pickles to the selected backend
+
+    - history/*.pkl (canonical histories) are rewritten as-is
+    - Legacy TICKER_start_end_interval.pkl range files are merged into
+      the matching ticker/interval history, so nothing is re-downloaded
+      (coverage only grows where the ranges overlap/touch, as in
+      universal_cache.compact_cache)
+
+    Args:
+        backend: Target backend (default: get_backend())
+        delete: Remove the .pkl files after a successful conversion
+
+    Returns:
+        int: Number of .pkl files migrated
+    """
+    import universal_cache as uc
+
+    cache_dir = uc.CACHE_DIR
+    history_dir = uc.HISTORY_DIR
+    backend = backend or get_backend()
+
+    migrated = 0
+
+    # Group legacy range files by ticker/interval
+    ranges = {}
+    for pkl_file in cache_dir.glob('*.pkl'):
+        parts = pkl_file.stem.split('_')
+        if len(parts) != 4:
+            continue
+        ticker, start_str, end_str, interval = parts
+        try:
+            ranges.setdefault((ticker, interval), []).append(
+                (pkl_file, pd.to_datetime(start_str), pd.to_datetime(end_str))
+            )
+        except ValueError:
+            continue
+
+    # Existing pickled histories (resampled bars are rebuilt from the daily history)
+    for pkl_file in history_dir.glob('*.pkl'):
+        if pkl_file.stem.endswith('_resampled'):
+            continue
+        ticker, interval = pkl_file.stem.rsplit('_', 1)
+        ranges.setdefault((ticker, interval), [])
+
+    for (ticker, interval), files in ranges.items():
+        legacy_file = history_dir / f"{ticker}_{interval}.pkl"
+        history = (uc._load_history(ticker, interval, backend=backend) or
+                   uc._load_history(ticker, interval, backend=PickleBackend()) or
+                   {'data': None, 'start': None, 'end': None})
+
+        data, start, end = history['data'], history['start'], history['end']
+        converted = [legacy_file] if legacy_file.exists() else []
+        merged = []
+
+        for pkl_file, file_start, file_end in sorted(files, key=lambda f: f[1]):
+            try:
+                with open(pkl_file, 'rb') as f:
+                    df = pickle.load(f)
+            except Exception as e:
+                print(f"   ⚠️  Skipping {pkl_file.name}: {e}")
+                continue
+
+            df = df.copy()
+            df['Date'] = pd.to_datetime(df['Date'])
+            data = uc._merge_bars(data, df)
+            merged.append(pkl_file)
+
+            # Same rule as compact_cache: disjoint ranges keep their bars but
+            # not the coverage, so the gap is still fetched when requested
+            if start is None:
+                start, end = file_start, file_end
+            elif file_start <= end + pd.Timedelta(days=4) and file_end >= start - pd.Timedelta(days=4):
+                start, end = min(start, file_start), max(end, file_end)
+
+        if data is None or data.empty:
+            continue
+
+        # Merged bars are only as fresh as the oldest pickle they came from
+        fetched_at = history.get('fetched_at')
+        if merged:
+            oldest = min(pd.Timestamp(p.stat().st_mtime, unit='s', tz='UTC').tz_convert(uc.MARKET_TZ) for p in merged)
+            fetched_at = oldest if fetched_at is None else min(fetched_at, oldest)
+
+        converted += merged
+        uc._save_history(ticker, interval, dict(history, data=data, start=start, end=end, fetched_at=fetched_at),
+                         backend=backend)
+        migrated += len(converted)
+        print(f"   ✅ {ticker} ({interval}): {len(data)} bars from {len(converted)} pickle(s)")
+
+        if delete and backend.extension != '.pkl':
+            for pkl_file in converted:
+                pkl_file.unlink()
+
+    return migrated
+
+
+def migrate_stock_data_cache(cache_dir='cache', backend=None, delete=False):
+    """
+    Convert StockDataCache *_cache.pkl files to the selected backend
+
+    Args:
+        cache_dir: StockDataCache directory
+        backend: Target backend (default: get_backend())
+        delete: Remove the .pkl files after a successful conversion
+
+    Returns:
+        int: Number of .pkl files migrated
+    """
+    backend = backend or get_backend()
+    cache_dir = Path(cache_dir)
+
+    if backend.extension == '.pkl' or not cache_dir.exists():
+        return 0
+
+    migrated = 0
+    for pkl_file in cache_dir.glob('*_cache.pkl'):
+        try:
+            with open(pkl_file, 'rb') as f:
+                df = pickle.load(f)
+            atomic_write(backend, df, pkl_file.with_suffix(backend.extension))
+        except Exception as e:
+            print(f"   ⚠️  Skipping {pkl_file.name}: {e}")
+            continue
+
+        migrated += 1
+        if delete:
+            pkl_file.unlink()
+
+    return migrated
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate .pkl stock caches to a columnar format")
+    parser.add_argument('--format', default=None, choices=list(BACKENDS), help="Target format (default: feather)")
+    parser.add_argument('--stock-cache-dir', default='cache', help="StockDataCache directory")
+    parser.add_argument('--delete', action='store_true', help="Delete .pkl files after migrating")
+    args = parser.parse_args()
+
+    target = get_backend(args.format)
+    if target.name == 'pickle':
+        print("⚠️  pyarrow is not installed - nothing to migrate (pip install pyarrow)")
+    else:
+        print(f"\n🔄 Migrating pickle caches to {target.name}...")
+        count = migrate_universal_cache(target, args.delete)
+        count += migrate_stock_data_cache(args.stock_cache_dir, target, args.delete)
+        print(f"✅ Migrated {count} pickle file(s)\n")
@@ -0,0 +1,169 @@
+"""
+NYSE SESSION CALENDAR & CACHE FRESHNESS POLICY
+===============================================
+Decides when cached daily bars have to be refetched
+
+Calendar:
+- Regular sessions 9:30-16:00 America/New_York, weekends closed
+- NYSE holidays from pandas holiday rules (Good Friday, Juneteenth
+  from 2022, no Columbus/Veterans Day) plus unscheduled closures
+- Early closes (13:00) before July 4th, after Thanksgiving, Christmas Eve
+
+Freshness:
+- A session's daily bar is final SETTLE_DELAY after its close; data
+  fetched after that is immutable and never refetched
+- While a session is running, data is reused for INTRADAY_TTL
+  (STOCK_CACHE_INTRADAY_TTL_MIN, default 15 minutes)
+- Nights, weekends and holidays never trigger a refetch: the latest
+  session is the last completed one until the next open
+"""
+
+import os
+from datetime import time
+from functools import lru_cache
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, Holiday, GoodFriday, USMartinLutherKingJr,
+    USPresidentsDay, USMemorialDay, USLaborDay, USThanksgivingDay,
+    nearest_workday, sunday_to_monday
+)
+
+MARKET_TZ = 'America/New_York'
+
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# Providers publish the final daily bar a little after the close
+SETTLE_DELAY = pd.Timedelta(minutes=30)
+
+INTRADAY_TTL = pd.Timedelta(minutes=float(os.environ.get('STOCK_CACHE_INTRADAY_TTL_MIN', 15)))
+
+# Unscheduled closures (weather, national days of mourning)
+SPECIAL_CLOSURES = {
+    pd.Timestamp('2012-10-29'), pd.Timestamp('2012-10-30'),
+    pd.Timestamp('2018-12-05'), pd.Timestamp('2025-01-09')
+}
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE holidays"""
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+    ]
+
+
+@lru_cache(maxsize=None)
+def _holidays(year):
+    """Closed weekdays of a calendar year"""
+    holidays = NYSEHolidayCalendar().holidays(f'{year}-01-01', f'{year}-12-31')
+    return frozenset(holidays) | {d for d in SPECIAL_CLOSURES if d.year == year}
+
+
+def is_session(date):
+    """True if NYSE trades on this (naive) date"""
+    date = pd.Timestamp(date).normalize()
+    return date.weekday() < 5 and date not in _holidays(date.year)
+
+
+def session_close(date):
+    """Close of the session on this date (tz-aware, America/New_York)"""
+    date = pd.Timestamp(date).normalize()
+
+    early = (
+        (date.month == 12 and date.day == 24) or
+        (date.month == 7 and date.day == 3 and date.weekday() < 4) or
+        (date.month == 11 and date - pd.Timedelta(days=1) in _holidays(date.year) and date.weekday() == 4)
+    )
+    close = EARLY_CLOSE if early else SESSION_CLOSE
+
+    return pd.Timestamp.combine(date.date(), close).tz_localize(MARKET_TZ)
+
+
+def market_now():
+    """Current time in America/New_York"""
+    return pd.Timestamp.now(tz=MARKET_TZ)
+
+
+def _as_market_time(value):
+    """Naive timestamps are local wall-clock time (datetime.now()), convert to ET"""
+    value = pd.Timestamp(value)
+    if value.tzinfo is None:
+        value = pd.Timestamp(value.to_pydatetime().astimezone())
+    return value.tz_convert(MARKET_TZ)
+
+
+def latest_session(until=None, now=None):
+    """
+    Most recent session that has opened, optionally limited to bars before 'until'
+
+    Args:
+        until: Exclusive end of the requested bars (same as get_stock_data
+               end_date) - sessions dated on/after it are ignored
+        now: Current time (default: market_now())
+
+    Returns:
+        pd.Timestamp: Naive session date, or None
+    """
+    now = _as_market_time(now) if now is not None else market_now()
+
+    date = pd.Timestamp(now.date())
+    if now.time() < SESSION_OPEN:
+        date -= pd.Timedelta(days=1)
+
+    if until is not None:
+        date = min(date, (pd.Timestamp(until) - pd.Timedelta(1)).normalize())
+
+    # Longest closure (weekend + holidays) is well under two weeks
+    for _ in range(14):
+        if is_session(date):
+            return date
+        date -= pd.Timedelta(days=1)
+
+    return None
+
+
+def is_fresh(fetched_at, session=None, now=None):
+    """
+    Whether data fetched at 'fetched_at' still holds the latest bar of a session
+
+    Args:
+        fetched_at: When the data was fetched (naive local or tz-aware)
+        session: Session date that must be covered (default: latest_session())
+        now: Current time (default: market_now())
+
+    Returns:
+        bool: False if the data has to be refetched
+    """
+    now = _as_market_time(now) if now is not None else market_now()
+
+    if session is None:
+        session = latest_session(now=now)
+        if session is None:
+            return True
+
+    if fetched_at is None:
+        return False
+
+    fetched_at = _as_market_time(fetched_at)
+    final_at = session_close(session) + SETTLE_DELAY
+
+    # Fetched after the final bar was published: immutable
+    if fetched_at >= final_at:
+        return True
+
+    # Session still running (or settling): short TTL
+    if now < final_at:
+        return now - fetched_at < INTRADAY_TTL
+
+    return False
@@ -134,8 +134,19 @@ class IchimokuMLPredictor:
         Returns:
             DataFrame with engineered features
         """
-        # Convert to DataFrame
-        df = pd.DataFrame([signal_data])
+        return self._engineer_feature_frame(pd.DataFrame([signal_data]))
+    
+    def _engineer_feature_frame(self, signals: pd.DataFrame) -> pd.DataFrame:
+        """
+        Engineer features for many signals at once (one row per signal).
+        
+        Args:
+            signals: DataFrame with the signal_data fields as columns
+            
+        Returns:
+            DataFrame with engineered features
+        """
+        df = signals.copy()
         
         # 1. PRICE POSITION FEATURES
         position_map = {'above': 1, 'inside': 0, 'below': -1}
@@ -216,10 +227,20 @@ class IchimokuMLPredictor:
         Returns:
             List of factor strings explaining the prediction
         """
-        factors = []
-        
         # Get first row (we only predict one signal at a time)
-        row = features.iloc[0]
+        return self._factors_for_row(features.iloc[0])
+    
+    def _factors_for_row(self, row) -> list:
+        """
+        Confidence factors for one row of engineered features.
+        
+        Args:
+            row: Engineered features of one signal (Series or dict)
+            
+        Returns:
+            List of factor strings explaining the prediction
+        """
+        factors = []
         
         # EMA Alignment
         if row.get('ema_alignment_bullish', 0) == 1:
@@ -353,6 +374,109 @@ class IchimokuMLPredictor:
             'timeframe': timeframe,
             'performance_metrics': metrics
         }
+    
+    def predict_batch(self, signals, timeframe: str = 'Daily') -> list:
+        """
+        Generate ML confidence predictions for many signals at once.
+        
+        Features are engineered as one frame and the model is called once,
+        instead of one predict() (one-row DataFrame + predict_proba) per signal.
+        
+        Args:
+            signals: DataFrame (or list of dicts) with the predict() fields
+                     except timeframe, one row per signal
+                     (see build_signal_frame)
+            timeframe: 'Daily' or 'Weekly'
+                
+        Returns:
+            List of prediction dictionaries (same format as predict), in row order
+        """
+        signals = pd.DataFrame(signals).reset_index(drop=True)
+        if signals.empty:
+            return []
+        
+        # Validate required fields
+        required_fields = ['entry_price', 'ema_13', 'ema_30', 'ema_200', 
+                          'cloud_top', 'cloud_bottom', 'price_position']
+        
+        missing = [f for f in required_fields if f not in signals.columns]
+        if missing:
+            raise ValueError(f"Missing required fields: {missing}")
+        
+        # Select model based on timeframe
+        if timeframe == 'Daily':
+            model = self.daily_model
+            feature_cols = self.daily_features
+            model_name = self.daily_model_name
+            model_accuracy = self.daily_accuracy
+            metrics = self.daily_metrics
+        elif timeframe == 'Weekly':
+            model = self.weekly_model
+            feature_cols = self.weekly_features
+            model_name = self.weekly_model_name
+            model_accuracy = self.weekly_accuracy
+            metrics = self.weekly_metrics
+        else:
+            raise ValueError(f"Invalid timeframe: {timeframe}. Must be 'Daily' or 'Weekly'")
+        
+        # Placeholder values for features that require historical data
+        for col in ['max_gain_pct', 'max_loss_pct']:
+            if col not in signals.columns:
+                signals[col] = 0.0
+        
+        # Engineer features and score all signals in one model call
+        features = self._engineer_feature_frame(signals)
+        confidences = model.predict_proba(features[feature_cols])[:, 1]
+        
+        predictions = []
+        for row, confidence_raw in zip(features.to_dict('records'), confidences):
+            predictions.append({
+                'confidence_pct': round(confidence_raw * 100, 1),
+                'confidence_level': self._interpret_confidence(confidence_raw),
+                'expected_outcome': 'Success' if confidence_raw >= 0.5 else 'Failure',
+                'model_used': model_name,
+                'model_accuracy': round(model_accuracy * 100, 1),
+                'confidence_factors': self._factors_for_row(row),
+                'raw_probability': round(confidence_raw, 4),
+                'timeframe': timeframe,
+                'performance_metrics': metrics
+            })
+        
+        return predictions
+
+
+def build_signal_frame(close, ema_13, ema_30, ema_200, senkou_a, senkou_b, indices) -> pd.DataFrame:
+    """
+    Signal inputs for predict_batch at the given bar positions.
+    
+    Args:
+        close, ema_13, ema_30, ema_200, senkou_a, senkou_b: Series aligned by position
+        indices: Bar positions of the signals
+        
+    Returns:
+        DataFrame with one row per index: entry_price, EMAs, cloud top/bottom
+        and price_position ('above', 'inside', 'below' the cloud)
+    """
+    indices = np.asarray(indices, dtype=int)
+    
+    def at(series):
+        return np.asarray(series, dtype=float)[indices]
+    
+    entry_price = at(close)
+    span_a, span_b = at(senkou_a), at(senkou_b)
+    cloud_top = np.where(span_b > span_a, span_b, span_a)
+    cloud_bottom = np.where(span_b < span_a, span_b, span_a)
+    
+    return pd.DataFrame({
+        'entry_price': entry_price,
+        'ema_13': at(ema_13),
+        'ema_30': at(ema_30),
+        'ema_200': at(ema_200),
+        'cloud_top': cloud_top,
+        'cloud_bottom': cloud_bottom,
+        'price_position': np.select([entry_price > cloud_top, entry_price < cloud_bottom],
+                                    ['above', 'below'], 'inside')
+    })
 
 # ============================================================================
 # CONVENIENCE FUNCTIONS
@@ -386,6 +510,20 @@ def predict_ichimoku_confidence(signal_data: Dict) -> Dict:
     predictor = get_predictor()
     return predictor.predict(signal_data)
 
+def predict_ichimoku_confidence_batch(signals, timeframe: str = 'Daily') -> list:
+    """
+    Convenience function to get confidence predictions for many signals.
+    
+    Args:
+        signals: DataFrame of signal inputs (see build_signal_frame)
+        timeframe: 'Daily' or 'Weekly'
+        
+    Returns:
+        List of prediction results dictionaries, in row order
+    """
+    predictor = get_predictor()
+    return predictor.predict_batch(signals, timeframe)
+
 # ============================================================================
 # TESTING / DEMO
 # ============================================================================
@@ -11,10 +11,10 @@ This predictor works with the hybrid TR models and shows:
 """
 
 import pandas as pd
-import numpy as np
 import pickle
 import os
 import glob
+import threading
 from datetime import datetime
 
 # Import metrics calculator
@@ -30,51 +30,146 @@ _cached_metrics = {
     'weekly': None
 }
 
-def load_latest_models():
-    """Load the most recent TR models"""
-    
-    # Check multiple possible locations
-    possible_dirs = [
-        'ml_models',
-        'src/ml_models',
-        '../ml_models',
-        os.path.join(os.path.dirname(__file__), 'ml_models'),
-        os.path.join(os.path.dirname(__file__), '..', 'ml_models')
-    ]
+# Process-wide model registry, filled lazily per timeframe:
+# {'daily': {'path': ..., 'dir_mtime': ..., 'data': {...}}}
+_model_registry = {}
+_models_dir = None
+_registry_lock = threading.Lock()
+
+# Check multiple possible locations
+POSSIBLE_MODEL_DIRS = [
+    'ml_models',
+    'src/ml_models',
+    '../ml_models',
+    os.path.join(os.path.dirname(__file__), 'ml_models'),
+    os.path.join(os.path.dirname(__file__), '..', 'ml_models')
+]
+
+# Target gain (%) the models were trained on
+TARGETS = {
+    'Daily': 5.0,
+    'Weekly': 8.0
+}
+
+
+def find_models_dir():
+    """Find the ml_models directory (searched once, then remembered)"""
+    global _models_dir
     
-    models_dir = None
-    for directory in possible_dirs:
+    if _models_dir is not None and os.path.isdir(_models_dir):
+        return _models_dir
+    
+    for directory in POSSIBLE_MODEL_DIRS:
         if os.path.exists(directory):
             daily_test = glob.glob(f'{directory}/tr_daily_*.pkl')
             if daily_test:
-                models_dir = directory
-                break
-    
-    if not models_dir:
-        raise FileNotFoundError("TR models not found. Please train models first.")
+                _models_dir = directory
+                return directory
     
-    # Find latest models
-    daily_models = glob.glob(f'{models_dir}/tr_daily_*.pkl')
-    weekly_models = glob.glob(f'{models_dir}/tr_weekly_*.pkl')
+    raise FileNotFoundError("TR models not found. Please train models first.")
+
+
+def get_model(timeframe='Daily'):
+    """
+    Get the latest TR model for one timeframe
     
-    if not daily_models or not weekly_models:
-        raise FileNotFoundError("TR models not found. Please train models first.")
+    The model is unpickled on first use and kept for the life of the
+    process. The models directory is only re-globbed when its mtime
+    changes, and the model is only reloaded when that glob finds a newer
+    tr_<timeframe>_*.pkl.
     
-    # Sort by timestamp (filename) and get latest
-    daily_model_path = sorted(daily_models)[-1]
-    weekly_model_path = sorted(weekly_models)[-1]
+    Args:
+        timeframe: 'Daily' or 'Weekly'
     
-    # Load models
-    with open(daily_model_path, 'rb') as f:
-        daily_data = pickle.load(f)
+    Returns:
+        dict: Model data (model, features, accuracy, success_rate, ...)
+    """
+    key = 'daily' if timeframe == 'Daily' else 'weekly'
     
-    with open(weekly_model_path, 'rb') as f:
-        weekly_data = pickle.load(f)
+    with _registry_lock:
+        models_dir = find_models_dir()
+        dir_mtime = os.stat(models_dir).st_mtime_ns
+        entry = _model_registry.get(key)
+        
+        if entry is not None and entry['dir_mtime'] == dir_mtime:
+            return entry['data']
+        
+        # Directory changed (or first use) - find latest model by timestamp (filename)
+        models = glob.glob(f'{models_dir}/tr_{key}_*.pkl')
+        if not models:
+            raise FileNotFoundError("TR models not found. Please train models first.")
+        model_path = sorted(models)[-1]
+        
+        if entry is not None and entry['path'] == model_path:
+            entry['dir_mtime'] = dir_mtime
+            return entry['data']
+        
+        with open(model_path, 'rb') as f:
+            model_data = pickle.load(f)
+        
+        _model_registry[key] = {'path': model_path, 'dir_mtime': dir_mtime, 'data': model_data}
+        _cached_metrics[key] = None
+        
+        print(f"✅ {key.capitalize()} Model Loaded: {os.path.basename(model_path)}")
+        
+        return model_data
+
+
+def load_latest_models():
+    """Load the most recent TR models (cached - see get_model)"""
+    return get_model('Daily'), get_model('Weekly')
+
+
+def build_feature_frame(signals):
+    """
+    Derived model features for a DataFrame of signals (one row per signal)
     
-    print(f"✅ Daily Model Loaded: {os.path.basename(daily_model_path)}")
-    print(f"✅ Weekly Model Loaded: {os.path.basename(weekly_model_path)}")
+    Args:
+        signals: DataFrame with the predict_confidence signal_data keys as columns
     
-    return daily_data, weekly_data
+    Returns:
+        pd.DataFrame: One column per model feature
+    """
+    entry_price = signals['entry_price'].astype(float)
+    ema_3 = signals['ema_3'].astype(float)
+    ema_9 = signals['ema_9'].astype(float)
+    ema_20 = signals['ema_20'].astype(float)
+    ema_34 = signals['ema_34'].astype(float)
+    ppo_value = signals['ppo_value'].astype(float)
+    
+    return pd.DataFrame({
+        'tr_stage': signals['tr_stage'],
+        # EMA distances
+        'distance_from_ema3': (entry_price - ema_3) / entry_price * 100,
+        'distance_from_ema9': (entry_price - ema_9) / entry_price * 100,
+        'distance_from_ema20': (entry_price - ema_20) / entry_price * 100,
+        'distance_from_ema34': (entry_price - ema_34) / entry_price * 100,
+        # Above EMA indicators
+        'above_ema3': (entry_price > ema_3).astype(int),
+        'above_ema9': (entry_price > ema_9).astype(int),
+        'above_ema20': (entry_price > ema_20).astype(int),
+        'above_ema34': (entry_price > ema_34).astype(int),
+        # EMA alignment
+        'ema_alignment': ((ema_3 > ema_9) & (ema_9 > ema_20) & (ema_20 > ema_34)).astype(int),
+        # PPO indicators
+        'ppo_value': ppo_value,
+        'ppo_histogram': signals['ppo_histogram'],
+        'ppo_positive': (ppo_value > 0).astype(int),
+        'ppo_strong': (ppo_value.abs() > 1.5).astype(int),
+        'pmo_value': signals['pmo_value'],
+        # Quality indicator
+        'has_quality': (signals['quality_level'] > 0).astype(int),
+        'has_buy_point': signals['has_buy_point'],
+        'has_uptrend': signals['has_uptrend'],
+        'has_rs_chaikin': signals['has_rs_chaikin']
+    }, index=signals.index)
+
+
+def _predict_success_proba(model_data, feature_frame):
+    """Probability of success (%) for every row, in one predict_proba call"""
+    X = feature_frame[model_data['features']].to_numpy(dtype=float)
+    return model_data['model'].predict_proba(X)[:, 1] * 100
+
 
 def predict_confidence(signal_data, timeframe='Daily'):
     """
@@ -105,76 +200,50 @@ def predict_confidence(signal_data, timeframe='Daily'):
         - quality_tier: str
         - factors: list of contributing factors
     """
+    model_data = get_model(timeframe)
     
-    # Load models
-    daily_data, weekly_data = load_latest_models()
+    feature_frame = build_feature_frame(pd.DataFrame([signal_data]))
+    confidence = _predict_success_proba(model_data, feature_frame)[0]
     
-    # Select appropriate model
-    if timeframe == 'Daily':
-        model_data = daily_data
-        target = 5.0
-    else:
-        model_data = weekly_data
-        target = 8.0
-    
-    model = model_data['model']
-    features = model_data['features']
-    
-    # Calculate derived features
-    entry_price = signal_data['entry_price']
-    
-    # EMA distances
-    distance_from_ema3 = (entry_price - signal_data['ema_3']) / entry_price * 100
-    distance_from_ema9 = (entry_price - signal_data['ema_9']) / entry_price * 100
-    distance_from_ema20 = (entry_price - signal_data['ema_20']) / entry_price * 100
-    distance_from_ema34 = (entry_price - signal_data['ema_34']) / entry_price * 100
-    
-    # Above EMA indicators
-    above_ema3 = 1 if entry_price > signal_data['ema_3'] else 0
-    above_ema9 = 1 if entry_price > signal_data['ema_9'] else 0
-    above_ema20 = 1 if entry_price > signal_data['ema_20'] else 0
-    above_ema34 = 1 if entry_price > signal_data['ema_34'] else 0
-    
-    # EMA alignment
-    ema_alignment = 1 if (signal_data['ema_3'] > signal_data['ema_9'] > 
-                          signal_data['ema_20'] > signal_data['ema_34']) else 0
-    
-    # PPO indicators
-    ppo_positive = 1 if signal_data['ppo_value'] > 0 else 0
-    ppo_strong = 1 if abs(signal_data['ppo_value']) > 1.5 else 0
-    
-    # Quality indicator
-    has_quality = 1 if signal_data['quality_level'] > 0 else 0
-    
-    # Build feature array
-    feature_values = {
-        'tr_stage': signal_data['tr_stage'],
-        'distance_from_ema3': distance_from_ema3,
-        'distance_from_ema9': distance_from_ema9,
-        'distance_from_ema20': distance_from_ema20,
-        'distance_from_ema34': distance_from_ema34,
-        'above_ema3': above_ema3,
-        'above_ema9': above_ema9,
-        'above_ema20': above_ema20,
-        'above_ema34': above_ema34,
-        'ema_alignment': ema_alignment,
-        'ppo_value': signal_data['ppo_value'],
-        'ppo_histogram': signal_data['ppo_histogram'],
-        'ppo_positive': ppo_positive,
-        'ppo_strong': ppo_strong,
-        'pmo_value': signal_data['pmo_value'],
-        'has_quality': has_quality,
-        'has_buy_point': signal_data['has_buy_point'],
-        'has_uptrend': signal_data['has_uptrend'],
-        'has_rs_chaikin': signal_data['has_rs_chaikin']
-    }
+    return _describe_prediction(signal_data, feature_frame.iloc[0], confidence, model_data, timeframe)
+
+
+def predict_confidence_batch(signals, timeframe='Daily'):
+    """
+    Predict confidence for many TR signals at once
+    
+    Parameters:
+    -----------
+    signals : pd.DataFrame
+        One row per signal, same keys as predict_confidence's signal_data
+    
+    timeframe : str
+        'Daily' or 'Weekly'
     
-    # Create feature vector in correct order
-    X = np.array([[feature_values[f] for f in features]])
+    Returns:
+    --------
+    list of dicts (same format as predict_confidence), in row order
+    """
+    if len(signals) == 0:
+        return []
+    
+    model_data = get_model(timeframe)
+    
+    feature_frame = build_feature_frame(signals)
+    confidences = _predict_success_proba(model_data, feature_frame)
+    
+    return [
+        _describe_prediction(signal_data, feature_frame.iloc[i], confidences[i], model_data, timeframe)
+        for i, signal_data in enumerate(signals.to_dict('records'))
+    ]
+
+
+def _describe_prediction(signal_data, features, confidence, model_data, timeframe):
+    """Confidence level, quality tier, factors and metrics for one scored signal"""
+    target = TARGETS['Daily'] if timeframe == 'Daily' else TARGETS['Weekly']
     
-    # Predict
-    proba = model.predict_proba(X)[0]
-    confidence = proba[1] * 100  # Probability of success
+    ema_alignment = features['ema_alignment']
+    above_ema20 = features['above_ema20']
     
     # Determine confidence level
     if confidence >= 75:
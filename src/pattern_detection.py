@@ -3,17 +3,143 @@ Pattern Detection Module - Top 8 Chart Patterns
 FIXED: Proper datetime handling
 """
 
+import logging
+from bisect import bisect_left, bisect_right
+
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.signal import find_peaks
 
+logger = logging.getLogger(__name__)
+
+# Overlap (fraction of either pattern's length) above which the
+# lower-priority pattern is dropped
+OVERLAP_THRESHOLD = 0.4
+
+
+class PriceWindowStats:
+    """
+    Window statistics of one price series, built once and queried by every detector
+    
+    - rolling(w): min/max/argmin/argmax of each w-bar window (cached per size)
+    - range_argmin/range_argmax: any [lo, hi) range in O(1) (sparse tables)
+    - peaks_in/troughs_in: peak/trough indices inside [lo, hi) via prefix counts
+    
+    Ties resolve to the first index, like np.argmin/np.argmax.
+    """
+    
+    def __init__(self, prices, peaks=None, troughs=None):
+        self.prices = prices
+        self.n = len(prices)
+        self.peaks = np.array([], dtype=np.intp) if peaks is None else peaks
+        self.troughs = np.array([], dtype=np.intp) if troughs is None else troughs
+        
+        # prefix[i] = number of peaks/troughs before bar i
+        self._peak_prefix = self._prefix_counts(self.peaks)
+        self._trough_prefix = self._prefix_counts(self.troughs)
+        
+        self._rolling = {}
+        self._tables = {}
+    
+    def _prefix_counts(self, indices):
+        counts = np.zeros(self.n + 1, dtype=np.intp)
+        counts[np.asarray(indices, dtype=np.intp) + 1] = 1
+        return np.cumsum(counts)
+    
+    def peak_count(self, lo, hi):
+        """Number of peaks in [lo, hi) (scalars or arrays)"""
+        return self._peak_prefix[hi] - self._peak_prefix[lo]
+    
+    def trough_count(self, lo, hi):
+        """Number of troughs in [lo, hi) (scalars or arrays)"""
+        return self._trough_prefix[hi] - self._trough_prefix[lo]
+    
+    def peaks_in(self, lo, hi):
+        """Peak indices in [lo, hi), ascending"""
+        return self.peaks[self._peak_prefix[lo]:self._peak_prefix[hi]]
+    
+    def troughs_in(self, lo, hi):
+        """Trough indices in [lo, hi), ascending"""
+        return self.troughs[self._trough_prefix[lo]:self._trough_prefix[hi]]
+    
+    def rolling(self, window):
+        """
+        Statistics of prices[s:s + window] for every start s
+        
+        Returns:
+            Tuple (min, max, argmin, argmax) of arrays indexed by start,
+            argmin/argmax relative to the start
+        """
+        if window not in self._rolling:
+            view = sliding_window_view(self.prices, window)
+            starts = np.arange(len(view))
+            argmin = view.argmin(axis=1)
+            argmax = view.argmax(axis=1)
+            self._rolling[window] = (
+                self.prices[starts + argmin], self.prices[starts + argmax], argmin, argmax
+            )
+        return self._rolling[window]
+    
+    def is_local_min(self, radius):
+        """Bars equal to the minimum of the 2*radius+1 bars centered on them"""
+        flags = np.zeros(self.n, dtype=bool)
+        if self.n > 2 * radius:
+            lows = self.rolling(2 * radius + 1)[0]
+            flags[radius:self.n - radius] = self.prices[radius:self.n - radius] == lows
+        return flags
+    
+    def _sparse_table(self, kind):
+        """table[k, i] = first index of the max ('max') or min ('min') of prices[i:i + 2**k]"""
+        if kind not in self._tables:
+            values = self.prices if kind == 'max' else -self.prices
+            levels = [np.arange(self.n)]
+            width = 1
+            while 2 * width <= self.n:
+                prev = levels[-1]
+                left = prev[:self.n - 2 * width + 1]
+                right = prev[width:width + len(left)]
+                level = np.zeros(self.n, dtype=np.intp)
+                level[:len(left)] = np.where(values[right] > values[left], right, left)
+                levels.append(level)
+                width *= 2
+            self._tables[kind] = (values, np.vstack(levels))
+        return self._tables[kind]
+    
+    def _range_arg(self, kind, lo, hi):
+        values, table = self._sparse_table(kind)
+        lo = np.asarray(lo, dtype=np.intp)
+        hi = np.asarray(hi, dtype=np.intp)
+        
+        # Two overlapping power-of-two blocks cover [lo, hi)
+        level = np.frexp(hi - lo)[1] - 1
+        left = table[level, lo]
+        right = table[level, hi - (1 << level)]
+        return np.where(values[right] > values[left], right, left)
+    
+    def range_argmin(self, lo, hi):
+        """Index of the first minimum of prices[lo:hi] (hi > lo)"""
+        return self._range_arg('min', lo, hi)
+    
+    def range_argmax(self, lo, hi):
+        """Index of the first maximum of prices[lo:hi] (hi > lo)"""
+        return self._range_arg('max', lo, hi)
+    
+    def range_max(self, lo, hi):
+        """Maximum of prices[lo:hi] (hi > lo)"""
+        return self.prices[self.range_argmax(lo, hi)]
+    
+    def range_min(self, lo, hi):
+        """Minimum of prices[lo:hi] (hi > lo)"""
+        return self.prices[self.range_argmin(lo, hi)]
+
 
 class PatternDetector:
     """Detects chart patterns in price data"""
     
     def __init__(self, df, price_col='Close'):
-        """Initialize with price data"""
-        self.df = df.copy()
+        """Initialize with price data (df is only read, never copied)"""
+        self.df = df
         
         # Find price column
         if price_col in df.columns:
@@ -33,6 +159,9 @@ class PatternDetector:
         else:
             self.dates = pd.to_datetime(df.index).to_series().reset_index(drop=True)
         
+        # Boxed once - Series.__getitem__ per key point dominated the scan
+        self._dates = self.dates.tolist()
+        
         self._find_peaks_and_troughs()
     
     def _find_peaks_and_troughs(self):
@@ -45,6 +174,7 @@ class PatternDetector:
         
         self.peaks = peaks
         self.troughs = troughs
+        self.stats = PriceWindowStats(self.prices, peaks, troughs)
     
     def detect_all_patterns(self):
         """Detect all 11 patterns and return list"""
@@ -95,16 +225,16 @@ class PatternDetector:
                 'type': 'Head & Shoulders',
                 'direction': 'bearish',
                 'confidence': confidence,
-                'start_date': self.dates[left_idx],
-                'end_date': self.dates[right_idx],
+                'start_date': self._dates[left_idx],
+                'end_date': self._dates[right_idx],
                 'start_idx': left_idx,
                 'end_idx': right_idx,
                 'neckline': neckline,
                 'target_price': target,
                 'key_points': [
-                    (self.dates[left_idx], left),
-                    (self.dates[head_idx], head),
-                    (self.dates[right_idx], right)
+                    (self._dates[left_idx], left),
+                    (self._dates[head_idx], head),
+                    (self._dates[right_idx], right)
                 ]
             })
         
@@ -139,16 +269,16 @@ class PatternDetector:
                 'type': 'Inverse Head & Shoulders',
                 'direction': 'bullish',
                 'confidence': confidence,
-                'start_date': self.dates[left_idx],
-                'end_date': self.dates[right_idx],
+                'start_date': self._dates[left_idx],
+                'end_date': self._dates[right_idx],
                 'start_idx': left_idx,
                 'end_idx': right_idx,
                 'neckline': neckline,
                 'target_price': target,
                 'key_points': [
-                    (self.dates[left_idx], left),
-                    (self.dates[head_idx], head),
-                    (self.dates[right_idx], right)
+                    (self._dates[left_idx], left),
+                    (self._dates[head_idx], head),
+                    (self._dates[right_idx], right)
                 ]
             })
         
@@ -170,7 +300,7 @@ class PatternDetector:
             if abs(peak1 - peak2) / max(peak1, peak2) > 0.02:
                 continue
             
-            between = self.troughs[(self.troughs > peak1_idx) & (self.troughs < peak2_idx)]
+            between = self.stats.troughs_in(peak1_idx + 1, peak2_idx)
             if len(between) == 0:
                 continue
             
@@ -184,16 +314,16 @@ class PatternDetector:
                 'type': 'Double Top',
                 'direction': 'bearish',
                 'confidence': confidence,
-                'start_date': self.dates[peak1_idx],
-                'end_date': self.dates[peak2_idx],
+                'start_date': self._dates[peak1_idx],
+                'end_date': self._dates[peak2_idx],
                 'start_idx': peak1_idx,
                 'end_idx': peak2_idx,
                 'support': trough,
                 'target_price': target,
                 'key_points': [
-                    (self.dates[peak1_idx], peak1),
-                    (self.dates[trough_idx], trough),
-                    (self.dates[peak2_idx], peak2)
+                    (self._dates[peak1_idx], peak1),
+                    (self._dates[trough_idx], trough),
+                    (self._dates[peak2_idx], peak2)
                 ]
             })
         
@@ -215,7 +345,7 @@ class PatternDetector:
             if abs(trough1 - trough2) / min(trough1, trough2) > 0.02:
                 continue
             
-            between = self.peaks[(self.peaks > trough1_idx) & (self.peaks < trough2_idx)]
+            between = self.stats.peaks_in(trough1_idx + 1, trough2_idx)
             if len(between) == 0:
                 continue
             
@@ -229,40 +359,45 @@ class PatternDetector:
                 'type': 'Double Bottom',
                 'direction': 'bullish',
                 'confidence': confidence,
-                'start_date': self.dates[trough1_idx],
-                'end_date': self.dates[trough2_idx],
+                'start_date': self._dates[trough1_idx],
+                'end_date': self._dates[trough2_idx],
                 'start_idx': trough1_idx,
                 'end_idx': trough2_idx,
                 'resistance': peak,
                 'target_price': target,
                 'key_points': [
-                    (self.dates[trough1_idx], trough1),
-                    (self.dates[peak_idx], peak),
-                    (self.dates[trough2_idx], trough2)
+                    (self._dates[trough1_idx], trough1),
+                    (self._dates[peak_idx], peak),
+                    (self._dates[trough2_idx], trough2)
                 ]
             })
         
         return patterns
     
+    def _triangle_windows(self, window_size=30):
+        """Yield (start, local_peaks, local_troughs) of windows with 2+ peaks and 2+ troughs"""
+        starts = np.arange(0, len(self.prices) - window_size, 10)
+        ends = starts + window_size
+        
+        enough = (self.stats.peak_count(starts, ends) >= 2) & (self.stats.trough_count(starts, ends) >= 2)
+        
+        for start in starts[enough]:
+            start = int(start)
+            yield (start,
+                   self.stats.peaks_in(start, start + window_size),
+                   self.stats.troughs_in(start, start + window_size))
+    
     def detect_ascending_triangle(self):
         """Bullish continuation - flat top, rising bottom"""
         patterns = []
         window_size = 30
         
-        for start in range(0, len(self.prices) - window_size, 10):
-            window = self.prices[start:start + window_size]
-            
-            local_peaks = [i for i in self.peaks if start <= i < start + window_size]
-            local_troughs = [i for i in self.troughs if start <= i < start + window_size]
-            
-            if len(local_peaks) < 2 or len(local_troughs) < 2:
+        for start, local_peaks, local_troughs in self._triangle_windows(window_size):
+            peak_prices = self.prices[local_peaks]
+            if peak_prices.max() - peak_prices.min() > np.mean(peak_prices) * 0.03:
                 continue
             
-            peak_prices = [self.prices[i] for i in local_peaks]
-            if max(peak_prices) - min(peak_prices) > np.mean(peak_prices) * 0.03:
-                continue
-            
-            trough_prices = [self.prices[i] for i in local_troughs]
+            trough_prices = self.prices[local_troughs]
             if trough_prices[-1] <= trough_prices[0]:
                 continue
             
@@ -274,13 +409,13 @@ class PatternDetector:
                 'type': 'Ascending Triangle',
                 'direction': 'bullish',
                 'confidence': confidence,
-                'start_date': self.dates[start],
-                'end_date': self.dates[start + window_size - 1],
+                'start_date': self._dates[start],
+                'end_date': self._dates[start + window_size - 1],
                 'start_idx': start,
                 'end_idx': start + window_size - 1,
                 'resistance': resistance,
                 'target_price': target,
-                'key_points': [(self.dates[i], self.prices[i]) for i in local_peaks]
+                'key_points': [(self._dates[i], self.prices[i]) for i in local_peaks]
             })
         
         return patterns
@@ -290,20 +425,12 @@ class PatternDetector:
         patterns = []
         window_size = 30
         
-        for start in range(0, len(self.prices) - window_size, 10):
-            window = self.prices[start:start + window_size]
-            
-            local_peaks = [i for i in self.peaks if start <= i < start + window_size]
-            local_troughs = [i for i in self.troughs if start <= i < start + window_size]
-            
-            if len(local_peaks) < 2 or len(local_troughs) < 2:
+        for start, local_peaks, local_troughs in self._triangle_windows(window_size):
+            trough_prices = self.prices[local_troughs]
+            if trough_prices.max() - trough_prices.min() > np.mean(trough_prices) * 0.03:
                 continue
             
-            trough_prices = [self.prices[i] for i in local_troughs]
-            if max(trough_prices) - min(trough_prices) > np.mean(trough_prices) * 0.03:
-                continue
-            
-            peak_prices = [self.prices[i] for i in local_peaks]
+            peak_prices = self.prices[local_peaks]
             if peak_prices[-1] >= peak_prices[0]:
                 continue
             
@@ -315,13 +442,13 @@ class PatternDetector:
                 'type': 'Descending Triangle',
                 'direction': 'bearish',
                 'confidence': confidence,
-                'start_date': self.dates[start],
-                'end_date': self.dates[start + window_size - 1],
+                'start_date': self._dates[start],
+                'end_date': self._dates[start + window_size - 1],
                 'start_idx': start,
                 'end_idx': start + window_size - 1,
                 'support': support,
                 'target_price': target,
-                'key_points': [(self.dates[i], self.prices[i]) for i in local_troughs]
+                'key_points': [(self._dates[i], self.prices[i]) for i in local_troughs]
             })
         
         return patterns
@@ -331,18 +458,12 @@ class PatternDetector:
         patterns = []
         window_size = 30
         
-        for start in range(0, len(self.prices) - window_size, 10):
-            local_peaks = [i for i in self.peaks if start <= i < start + window_size]
-            local_troughs = [i for i in self.troughs if start <= i < start + window_size]
-            
-            if len(local_peaks) < 2 or len(local_troughs) < 2:
-                continue
-            
-            peak_prices = [self.prices[i] for i in local_peaks]
+        for start, local_peaks, local_troughs in self._triangle_windows(window_size):
+            peak_prices = self.prices[local_peaks]
             if peak_prices[-1] >= peak_prices[0] * 0.97:
                 continue
             
-            trough_prices = [self.prices[i] for i in local_troughs]
+            trough_prices = self.prices[local_troughs]
             if trough_prices[-1] <= trough_prices[0] * 1.03:
                 continue
             
@@ -353,13 +474,14 @@ class PatternDetector:
                 'type': 'Symmetrical Triangle',
                 'direction': 'neutral',
                 'confidence': confidence,
-                'start_date': self.dates[start],
-                'end_date': self.dates[start + window_size - 1],
+                'start_date': self._dates[start],
+                'end_date': self._dates[start + window_size - 1],
                 'start_idx': start,
                 'end_idx': start + window_size - 1,
                 'apex': apex,
                 'target_price': None,
-                'key_points': [(self.dates[i], self.prices[i]) for i in local_peaks + local_troughs]
+                'key_points': [(self._dates[i], self.prices[i])
+                               for i in np.concatenate([local_peaks, local_troughs])]
             })
         
         return patterns
@@ -369,47 +491,55 @@ class PatternDetector:
         patterns = []
         window_size = 50
         
-        for start in range(0, len(self.prices) - window_size, 10):
-            window = self.prices[start:start + window_size]
-            
-            cup_low_idx = np.argmin(window[:40])
-            cup_low = window[cup_low_idx]
-            cup_start = window[0]
-            
-            if cup_low >= cup_start * 0.95:
-                continue
-            
-            recovery_idx = cup_low_idx + np.argmax(window[cup_low_idx:40])
-            if window[recovery_idx] < cup_start * 0.95:
-                continue
-            
-            if recovery_idx + 10 >= len(window):
-                continue
-            
-            handle = window[recovery_idx:recovery_idx + 10]
-            handle_low = np.min(handle)
+        starts = np.arange(0, len(self.prices) - window_size, 10)
+        if len(starts) == 0:
+            return patterns
+        
+        # Cup low within the first 40 bars, recovery = highest bar after it
+        lows, _, low_offsets, _ = self.stats.rolling(40)
+        cup_low = lows[starts]
+        cup_low_pos = starts + low_offsets[starts]
+        cup_start = self.prices[starts]
+        
+        recovery_pos = self.stats.range_argmax(cup_low_pos, starts + 40)
+        recovery = self.prices[recovery_pos]
+        
+        candidates = (
+            (cup_low < cup_start * 0.95) &
+            (recovery >= cup_start * 0.95) &
+            (recovery_pos - starts + 10 < window_size)
+        )
+        
+        # Handle = 10 bars from the recovery
+        handle_lows = self.stats.rolling(10)[0]
+        
+        for k in np.flatnonzero(candidates):
+            start = int(starts[k])
+            cup_low_idx = int(cup_low_pos[k]) - start
+            recovery_idx = int(recovery_pos[k]) - start
             
-            pullback = (window[recovery_idx] - handle_low) / window[recovery_idx]
+            handle_low = handle_lows[start + recovery_idx]
+            pullback = (recovery[k] - handle_low) / recovery[k]
             if not (0.03 <= pullback <= 0.12):
                 continue
             
-            target = cup_start + (cup_start - cup_low)
-            confidence = min(85, int(60 + (cup_start - cup_low) / cup_start * 100))
+            target = cup_start[k] + (cup_start[k] - cup_low[k])
+            confidence = min(85, int(60 + (cup_start[k] - cup_low[k]) / cup_start[k] * 100))
             
             patterns.append({
                 'type': 'Cup & Handle',
                 'direction': 'bullish',
                 'confidence': confidence,
-                'start_date': self.dates[start],
-                'end_date': self.dates[start + recovery_idx + 10],
+                'start_date': self._dates[start],
+                'end_date': self._dates[start + recovery_idx + 10],
                 'start_idx': start,
                 'end_idx': start + recovery_idx + 10,
-                'cup_depth': cup_low,
+                'cup_depth': cup_low[k],
                 'target_price': target,
                 'key_points': [
-                    (self.dates[start], cup_start),
-                    (self.dates[start + cup_low_idx], cup_low),
-                    (self.dates[start + recovery_idx], window[recovery_idx])
+                    (self._dates[start], cup_start[k]),
+                    (self._dates[start + cup_low_idx], cup_low[k]),
+                    (self._dates[start + recovery_idx], recovery[k])
                 ]
             })
         
@@ -428,45 +558,47 @@ class PatternDetector:
         max_depth = 0.15  # 15% max depth
         min_depth = 0.03  # 3% min depth (must have some consolidation)
         
-        for start in range(0, len(self.prices) - window_size, 5):
-            window = self.prices[start:start + window_size]
-            
-            # Calculate depth
-            high = np.max(window)
-            low = np.min(window)
-            depth = (high - low) / high
-            
-            # Check if flat (tight range)
-            if not (min_depth <= depth <= max_depth):
-                continue
-            
-            # Check for prior uptrend (price at start should be elevated)
-            if start >= 20:
-                prior_price = self.prices[start - 20]
-                if window[0] < prior_price * 1.1:  # Should be at least 10% above prior
-                    continue
+        starts = np.arange(0, len(self.prices) - window_size, 5)
+        if len(starts) == 0:
+            return patterns
+        
+        # Calculate depth
+        lows, highs, _, _ = self.stats.rolling(window_size)
+        high = highs[starts]
+        low = lows[starts]
+        depth = (high - low) / high
+        
+        # Check if flat (tight range)
+        candidates = (min_depth <= depth) & (depth <= max_depth)
+        
+        # Check for prior uptrend (price at start should be at least 10% above 20 bars earlier)
+        prior = starts >= 20
+        candidates[prior] &= ~(self.prices[starts[prior]] < self.prices[starts[prior] - 20] * 1.1)
+        
+        for k in np.flatnonzero(candidates):
+            start = int(starts[k])
             
             # Calculate resistance (top of range)
-            resistance = high
+            resistance = high[k]
             target = resistance * 1.10  # 10% above resistance
-            confidence = min(75, int(55 + (1 - depth/max_depth) * 20))
+            confidence = min(75, int(55 + (1 - depth[k]/max_depth) * 20))
             
             patterns.append({
                 'type': 'Flat Base',
                 'direction': 'bullish',
                 'confidence': confidence,
-                'start_date': self.dates[start],
-                'end_date': self.dates[start + window_size - 1],
+                'start_date': self._dates[start],
+                'end_date': self._dates[start + window_size - 1],
                 'start_idx': start,
                 'end_idx': start + window_size - 1,
                 'resistance': resistance,
-                'support': low,
-                'depth_pct': depth * 100,
+                'support': low[k],
+                'depth_pct': depth[k] * 100,
                 'target_price': target,
                 'key_points': [
-                    (self.dates[start], window[0]),
-                    (self.dates[start + window_size//2], low),
-                    (self.dates[start + window_size - 1], window[-1])
+                    (self._dates[start], self.prices[start]),
+                    (self._dates[start + window_size//2], low[k]),
+                    (self._dates[start + window_size - 1], self.prices[start + window_size - 1])
                 ]
             })
         
@@ -484,55 +616,59 @@ class PatternDetector:
         window_size = 50  # ~10 weeks minimum
         max_depth = 0.25  # Usually <20%, allow up to 25%
         
-        for start in range(0, len(self.prices) - window_size, 10):
-            window = self.prices[start:start + window_size]
-            
-            # Find the low point
-            low_idx = np.argmin(window)
-            low = window[low_idx]
-            
-            # Low should be in middle portion (not at edges)
-            if low_idx < window_size * 0.2 or low_idx > window_size * 0.8:
-                continue
-            
-            # Check depth
-            left_high = np.max(window[:low_idx])
-            right_high = np.max(window[low_idx:])
-            depth = (max(left_high, right_high) - low) / max(left_high, right_high)
-            
-            if depth > max_depth or depth < 0.05:
-                continue
-            
-            # Check for gradual slope (saucer shape)
-            # Left side should gradually decline
-            left_slope = (window[low_idx] - window[0]) / (low_idx + 1)
-            # Right side should gradually rise
-            right_slope = (window[-1] - window[low_idx]) / (window_size - low_idx)
-            
-            # Both slopes should be gradual (not steep)
-            if abs(left_slope) > 0.02 * window[0] or abs(right_slope) > 0.02 * window[-1]:
-                continue
+        starts = np.arange(0, len(self.prices) - window_size, 10)
+        if len(starts) == 0:
+            return patterns
+        
+        # Find the low point
+        lows, _, low_offsets, _ = self.stats.rolling(window_size)
+        low_idx = low_offsets[starts]
+        
+        # Low should be in middle portion (not at edges)
+        middle = (low_idx >= window_size * 0.2) & (low_idx <= window_size * 0.8)
+        starts, low_idx = starts[middle], low_idx[middle]
+        low = lows[starts]
+        ends = starts + window_size - 1
+        
+        # Check depth
+        left_high = self.stats.range_max(starts, starts + low_idx)
+        right_high = self.stats.range_max(starts + low_idx, starts + window_size)
+        resistance = np.maximum(left_high, right_high)
+        depth = (resistance - low) / resistance
+        
+        # Check for gradual slope (saucer shape): left side gradually declines,
+        # right side gradually rises - both slopes should not be steep
+        left_slope = (low - self.prices[starts]) / (low_idx + 1)
+        right_slope = (self.prices[ends] - low) / (window_size - low_idx)
+        
+        candidates = (
+            (depth <= max_depth) & (depth >= 0.05) &
+            (np.abs(left_slope) <= 0.02 * self.prices[starts]) &
+            (np.abs(right_slope) <= 0.02 * self.prices[ends])
+        )
+        
+        for k in np.flatnonzero(candidates):
+            start = int(starts[k])
             
-            resistance = max(left_high, right_high)
-            target = resistance * 1.15
-            confidence = min(70, int(50 + (1 - depth/max_depth) * 20))
+            target = resistance[k] * 1.15
+            confidence = min(70, int(50 + (1 - depth[k]/max_depth) * 20))
             
             patterns.append({
                 'type': 'Saucer Base',
                 'direction': 'bullish',
                 'confidence': confidence,
-                'start_date': self.dates[start],
-                'end_date': self.dates[start + window_size - 1],
+                'start_date': self._dates[start],
+                'end_date': self._dates[start + window_size - 1],
                 'start_idx': start,
                 'end_idx': start + window_size - 1,
-                'resistance': resistance,
-                'support': low,
-                'depth_pct': depth * 100,
+                'resistance': resistance[k],
+                'support': low[k],
+                'depth_pct': depth[k] * 100,
                 'target_price': target,
                 'key_points': [
-                    (self.dates[start], window[0]),
-                    (self.dates[start + low_idx], low),
-                    (self.dates[start + window_size - 1], window[-1])
+                    (self._dates[start], self.prices[start]),
+                    (self._dates[start + int(low_idx[k])], low[k]),
+                    (self._dates[start + window_size - 1], self.prices[start + window_size - 1])
                 ]
             })
         
@@ -550,61 +686,110 @@ class PatternDetector:
         patterns = []
         window_size = 60  # ~12 weeks
         
-        for start in range(0, len(self.prices) - window_size, 10):
-            window = self.prices[start:start + window_size]
-            
-            # Find local troughs in window
-            local_troughs = []
-            for i in range(5, len(window) - 5, 5):
-                chunk = window[max(0, i-5):min(len(window), i+6)]
-                if window[i] == np.min(chunk):
-                    local_troughs.append((i, window[i]))
-            
-            # Need at least 3 pullbacks
-            if len(local_troughs) < 3:
-                continue
+        starts = np.arange(0, len(self.prices) - window_size, 10)
+        if len(starts) == 0:
+            return patterns
+        
+        # Local troughs: every 5th bar of the window that is the low of its +/-5 bars
+        offsets = np.arange(5, window_size - 5, 5)
+        is_trough = self.stats.is_local_min(5)[starts[:, None] + offsets]
+        
+        # Need at least 3 pullbacks
+        highs = self.stats.rolling(window_size)[1]
+        
+        for k in np.flatnonzero(is_trough.sum(axis=1) >= 3):
+            start = int(starts[k])
+            trough_idx = offsets[is_trough[k]]
+            trough_prices = self.prices[start + trough_idx]
             
             # Check if troughs are ascending (higher lows)
-            trough_prices = [t[1] for t in local_troughs]
-            ascending = all(trough_prices[i] < trough_prices[i+1] for i in range(len(trough_prices)-1))
-            
-            if not ascending:
+            if not np.all(trough_prices[:-1] < trough_prices[1:]):
                 continue
             
-            # Check pullback depths (should be 10-20% each)
-            valid_pullbacks = True
-            for i, (idx, price) in enumerate(local_troughs):
-                # Find high before this trough
-                high_before = np.max(window[:idx]) if idx > 0 else window[0]
-                pullback = (high_before - price) / high_before
-                if pullback < 0.05 or pullback > 0.25:
-                    valid_pullbacks = False
-                    break
-            
-            if not valid_pullbacks:
+            # Check pullback depths from the high before each trough
+            high_before = self.stats.range_max(np.full(len(trough_idx), start), start + trough_idx)
+            pullback = (high_before - trough_prices) / high_before
+            if not np.all((pullback >= 0.05) & (pullback <= 0.25)):
                 continue
             
-            resistance = np.max(window)
+            resistance = highs[start]
             target = resistance * 1.20
-            confidence = min(75, int(55 + len(local_troughs) * 5))
+            confidence = min(75, int(55 + len(trough_idx) * 5))
             
             patterns.append({
                 'type': 'Ascending Base',
                 'direction': 'bullish',
                 'confidence': confidence,
-                'start_date': self.dates[start],
-                'end_date': self.dates[start + window_size - 1],
+                'start_date': self._dates[start],
+                'end_date': self._dates[start + window_size - 1],
                 'start_idx': start,
                 'end_idx': start + window_size - 1,
                 'resistance': resistance,
-                'num_pullbacks': len(local_troughs),
+                'num_pullbacks': len(trough_idx),
                 'target_price': target,
-                'key_points': [(self.dates[start + idx], price) for idx, price in local_troughs]
+                'key_points': [(self._dates[start + int(idx)], price)
+                               for idx, price in zip(trough_idx, trough_prices)]
             })
         
         return patterns
 
 
+class SelectedIntervals:
+    """
+    Selected patterns sorted by start_idx, for overlap checks
+    
+    A selected pattern can only overlap [start, end] if it starts before 'end'
+    and after 'start' minus the longest selected length, so find_overlap
+    only looks at that slice of the sorted starts.
+    """
+    
+    def __init__(self):
+        self._starts = []
+        self._patterns = []
+        self._max_length = 0
+    
+    def __len__(self):
+        return len(self._patterns)
+    
+    def add(self, pattern):
+        start = pattern['start_idx']
+        pos = bisect_right(self._starts, start)
+        self._starts.insert(pos, start)
+        self._patterns.insert(pos, pattern)
+        self._max_length = max(self._max_length, pattern['end_idx'] - start)
+    
+    def find_overlap(self, pattern, threshold=OVERLAP_THRESHOLD):
+        """
+        First selected pattern that overlaps 'pattern' too much
+        
+        Args:
+            pattern: Candidate with start_idx/end_idx
+            threshold: Maximum overlap as a fraction of either pattern's length
+        
+        Returns:
+            The overlapping selected pattern, or None
+        """
+        p_start = pattern['start_idx']
+        p_end = pattern['end_idx']
+        
+        lo = bisect_right(self._starts, p_start - self._max_length)
+        hi = bisect_left(self._starts, p_end)
+        
+        for selected in self._patterns[lo:hi]:
+            s_start = selected['start_idx']
+            s_end = selected['end_idx']
+            
+            # Calculate overlap
+            overlap_length = min(p_end, s_end) - max(p_start, s_start)
+            if overlap_length <= 0:
+                continue
+            
+            if (overlap_length / (p_end - p_start) > threshold) or (overlap_length / (s_end - s_start) > threshold):
+                return selected
+        
+        return None
+
+
 def detect_patterns_for_chart(df, price_col='Close', remove_overlaps=True):
     """
     Main function to detect patterns
@@ -630,7 +815,7 @@ def detect_patterns_for_chart(df, price_col='Close', remove_overlaps=True):
         return all_patterns
 
 
-def remove_overlapping_patterns(patterns):
+def remove_overlapping_patterns(patterns, threshold=OVERLAP_THRESHOLD):
     """
     Remove overlapping patterns with SMART priority:
     1. ALWAYS keep Triangles (Ascending, Descending, Symmetrical) - they're important
@@ -638,24 +823,30 @@ def remove_overlapping_patterns(patterns):
     3. Then keep highest confidence
     
     This ensures important patterns like Ascending Triangle ALWAYS show up!
+    A pattern is dropped if it overlaps an already selected one by more than
+    'threshold' of either pattern's length. Selected patterns are kept in a
+    SelectedIntervals index, so each candidate is only compared with the few
+    selected patterns that can reach it.
+    
+    Debug output goes to the 'pattern_detection' logger at DEBUG level.
     """
     if not patterns:
         return patterns
     
-    print(f"\n🔍 PATTERN FILTERING DEBUG:")
-    print(f"Total patterns found: {len(patterns)}")
+    debug = logger.isEnabledFor(logging.DEBUG)
     
     # Separate triangles from other patterns
     triangles = [p for p in patterns if 'Triangle' in p['type']]
     others = [p for p in patterns if 'Triangle' not in p['type']]
     
-    print(f"  Triangles: {len(triangles)}")
-    for t in triangles:
-        print(f"    - {t['type']}: {t['confidence']}% (idx {t['start_idx']}-{t['end_idx']})")
-    
-    print(f"  Others: {len(others)}")
-    for o in others[:5]:  # Show first 5
-        print(f"    - {o['type']}: {o['confidence']}% (idx {o['start_idx']}-{o['end_idx']})")
+    if debug:
+        logger.debug("🔍 PATTERN FILTERING: %d patterns found", len(patterns))
+        logger.debug("  Triangles: %d", len(triangles))
+        for t in triangles:
+            logger.debug("    - %s: %s%% (idx %s-%s)", t['type'], t['confidence'], t['start_idx'], t['end_idx'])
+        logger.debug("  Others: %d", len(others))
+        for o in others[:5]:  # Show first 5
+            logger.debug("    - %s: %s%% (idx %s-%s)", o['type'], o['confidence'], o['start_idx'], o['end_idx'])
     
     # Sort others by: end_idx (most recent first), then confidence
     others_sorted = sorted(
@@ -666,39 +857,23 @@ def remove_overlapping_patterns(patterns):
     
     # Start with ALL triangles - they're always kept!
     selected = triangles.copy()
-    print(f"\n✅ Starting with {len(selected)} triangles (auto-selected)")
+    intervals = SelectedIntervals()
+    for t in triangles:
+        intervals.add(t)
     
     # Now add other patterns if they don't overlap too much
     for pattern in others_sorted:
-        p_start = pattern['start_idx']
-        p_end = pattern['end_idx']
+        blocking = intervals.find_overlap(pattern, threshold)
         
-        # Check overlap with already selected patterns
-        overlaps = False
-        for selected_pattern in selected:
-            s_start = selected_pattern['start_idx']
-            s_end = selected_pattern['end_idx']
-            
-            # Calculate overlap
-            overlap_start = max(p_start, s_start)
-            overlap_end = min(p_end, s_end)
-            
-            if overlap_end > overlap_start:
-                overlap_length = overlap_end - overlap_start
-                p_length = p_end - p_start
-                s_length = s_end - s_start
-                
-                # More lenient: 40% overlap threshold
-                if (overlap_length / p_length > 0.4) or (overlap_length / s_length > 0.4):
-                    overlaps = True
-                    print(f"  ❌ {pattern['type']} overlaps with {selected_pattern['type']}")
-                    break
-        
-        if not overlaps:
+        if blocking is None:
             selected.append(pattern)
-            print(f"  ✅ {pattern['type']} added")
+            intervals.add(pattern)
+            if debug:
+                logger.debug("  ✅ %s added", pattern['type'])
+        elif debug:
+            logger.debug("  ❌ %s overlaps with %s", pattern['type'], blocking['type'])
     
-    print(f"\n📊 FINAL: {len(selected)} patterns selected")
+    logger.debug("📊 FINAL: %d patterns selected", len(selected))
     
     # Sort by date for display
     selected.sort(key=lambda x: x['start_date'])
@@ -0,0 +1,428 @@
+"""
+UNIVERSE PATTERN SCREENER - PERSISTED PATTERN INDEX
+====================================================
+Runs PatternDetector over every symbol in stocks_list.csv and keeps the
+results in a local SQLite index, so the UI can ask for e.g. "all Cup &
+Handle completions in the last 10 bars with confidence >= 70" without
+touching any price data.
+
+How it works:
+1. Daily bars come from batch_fetcher.fetch_watchlist_data_batch
+   (per-symbol cache entries, only stale/missing symbols are downloaded)
+2. Each symbol's bars are fingerprinted; symbols whose bars did not
+   change since the last scan are skipped
+3. Changed symbols are scanned in a process pool (the next batch is
+   fetched while the workers run the current one)
+4. Patterns are replaced per symbol in one transaction per batch
+5. Symbols that left the universe are removed from the index
+
+Index tables:
+- patterns: symbol, type, direction, confidence, start/end date, prices,
+            selected (kept by remove_overlapping_patterns)
+- scanned:  symbol, fingerprint, last bar, scan time
+
+Run nightly:
+    python pattern_screener.py [--days 365] [--workers 4]
+"""
+
+import os
+import sqlite3
+import hashlib
+import time
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from pattern_detection import PatternDetector, remove_overlapping_patterns
+from market_calendar import latest_session, is_session
+
+# Index takes a full-universe scan to rebuild - kept outside .stock_cache so
+# the universal_cache disk budget and clear_cache() never remove it
+INDEX_FILE = Path(__file__).parent / '.stock_index' / 'pattern_index.sqlite'
+
+# Symbols per batch download / write transaction
+BATCH_SIZE = 100
+
+# Same default lookback as the Pattern Detection page (1 Year)
+SCAN_DAYS = 365
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    symbol       TEXT NOT NULL,
+    type         TEXT NOT NULL,
+    direction    TEXT NOT NULL,
+    confidence   INTEGER NOT NULL,
+    start_date   TEXT NOT NULL,
+    end_date     TEXT NOT NULL,
+    start_idx    INTEGER NOT NULL,
+    end_idx      INTEGER NOT NULL,
+    target_price REAL,
+    selected     INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_type_end ON patterns (type, end_date, confidence);
+CREATE INDEX IF NOT EXISTS idx_patterns_end ON patterns (end_date, confidence);
+CREATE INDEX IF NOT EXISTS idx_patterns_symbol ON patterns (symbol);
+
+CREATE TABLE IF NOT EXISTS scanned (
+    symbol      TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    last_bar    TEXT,
+    bars        INTEGER NOT NULL,
+    scanned_at  TEXT NOT NULL
+);
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════
+# INDEX STORAGE
+# ═══════════════════════════════════════════════════════════════════
+
+def connect_index(db_path=None):
+    """
+    Open (and create if needed) the pattern index
+
+    Args:
+        db_path: SQLite file (default: INDEX_FILE)
+
+    Returns:
+        sqlite3.Connection
+    """
+    db_path = Path(db_path or INDEX_FILE)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(_SCHEMA)
+
+    # Indexes built before the overlap flag existed: add it and rescan everything
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(patterns)')]
+    if 'selected' not in columns:
+        with conn:
+            conn.execute('ALTER TABLE patterns ADD COLUMN selected INTEGER NOT NULL DEFAULT 1')
+            conn.execute('DELETE FROM scanned')
+
+    return conn
+
+
+def load_fingerprints(conn):
+    """{symbol: fingerprint} of every scanned symbol"""
+    return dict(conn.execute('SELECT symbol, fingerprint FROM scanned'))
+
+
+def bars_fingerprint(df):
+    """Hash of the Date/Close bars - changes whenever a bar is added or revised"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.to_datetime(df['Date']).to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(df['Close'].to_numpy(dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def write_scan_results(conn, results):
+    """
+    Replace the patterns of the scanned symbols (one transaction)
+
+    Args:
+        conn: Index connection
+        results: List of (symbol, fingerprint, last_bar, bars, rows) with
+                 rows as produced by scan_symbol
+    """
+    scanned_at = datetime.now().isoformat(timespec='seconds')
+
+    with conn:
+        for symbol, fingerprint, last_bar, bars, rows in results:
+            conn.execute('DELETE FROM patterns WHERE symbol = ?', (symbol,))
+            conn.executemany(
+                'INSERT INTO patterns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(symbol,) + row for row in rows]
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO scanned VALUES (?, ?, ?, ?, ?)',
+                (symbol, fingerprint, last_bar, bars, scanned_at)
+            )
+
+
+def prune_index(conn, symbols):
+    """
+    Remove symbols that left the universe (delisted / dropped from the list)
+
+    Args:
+        conn: Index connection
+        symbols: The scanned universe
+
+    Returns:
+        int: Number of symbols removed
+    """
+    with conn:
+        conn.execute('CREATE TEMP TABLE universe (symbol TEXT PRIMARY KEY)')
+        conn.executemany('INSERT OR IGNORE INTO universe VALUES (?)', [(s,) for s in symbols])
+        removed = conn.execute('DELETE FROM scanned WHERE symbol NOT IN (SELECT symbol FROM universe)').rowcount
+        conn.execute('DELETE FROM patterns WHERE symbol NOT IN (SELECT symbol FROM universe)')
+        conn.execute('DROP TABLE universe')
+
+    return removed
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SCANNING
+# ═══════════════════════════════════════════════════════════════════
+
+def scan_symbol(symbol, df):
+    """
+    Detect all patterns of one symbol, flagging the ones the Pattern
+    Detection page keeps when overlaps are removed
+
+    Args:
+        symbol (str): Stock symbol
+        df (pd.DataFrame): Daily bars with Date and Close
+
+    Returns:
+        tuple: (symbol, rows, error) - rows are plain tuples in the
+               patterns column order (without symbol)
+    """
+    try:
+        patterns = PatternDetector(df).detect_all_patterns()
+        kept = {id(p) for p in remove_overlapping_patterns(patterns)}
+    except Exception as e:
+        return symbol, [], str(e)
+
+    rows = [(
+        p['type'],
+        p['direction'],
+        int(p['confidence']),
+        pd.Timestamp(p['start_date']).strftime('%Y-%m-%d'),
+        pd.Timestamp(p['end_date']).strftime('%Y-%m-%d'),
+        int(p['start_idx']),
+        int(p['end_idx']),
+        None if p.get('target_price') is None else float(p['target_price']),
+        int(id(p) in kept)
+    ) for p in patterns]
+
+    return symbol, rows, None
+
+
+def _fetch_screener_batch(symbols, duration_days):
+    """Daily bars of one batch, served from the per-symbol cache where possible"""
+    from batch_fetcher import fetch_watchlist_data_batch
+
+    return fetch_watchlist_data_batch(symbols, duration_days=duration_days)
+
+
+def _changed_symbols(batch_data, fingerprints, force=False):
+    """
+    Symbols whose bars differ from the last scan
+
+    Returns:
+        dict: {symbol: (bars, fingerprint)} with bars reduced to Date/Close
+    """
+    changed = {}
+    for symbol, df in batch_data.items():
+        if df is None or df.empty or 'Close' not in df.columns:
+            continue
+
+        bars = df[['Date', 'Close']].dropna(subset=['Close']).reset_index(drop=True)
+        fingerprint = bars_fingerprint(bars)
+
+        if force or fingerprints.get(symbol) != fingerprint:
+            changed[symbol] = (bars, fingerprint)
+
+    return changed
+
+
+def run_pattern_screener(symbols=None, duration_days=SCAN_DAYS, workers=None,
+                         db_path=None, csv_path=None, force=False, batch_size=BATCH_SIZE):
+    """
+    Scan the universe and update the pattern index incrementally
+
+    Symbols in the index that are not in the scanned universe are removed
+    once the scan finishes.
+
+    Args:
+        symbols (list): Symbols to scan (default: stocks_list.csv)
+        duration_days (int): Days of daily bars per symbol
+        workers (int): Worker processes (default: CPU count - 1, 1 = in-process)
+        db_path: SQLite file (default: INDEX_FILE)
+        csv_path: Stock list CSV when symbols is None
+        force (bool): Rescan symbols even if their bars did not change
+        batch_size (int): Symbols per batch download
+
+    Returns:
+        dict: Counts of 'symbols', 'scanned', 'unchanged', 'patterns',
+              'errors', 'removed'
+    """
+    if symbols is None:
+        from universe_rs import load_universe_symbols
+        symbols = load_universe_symbols(csv_path)
+
+    symbols = list(dict.fromkeys(symbols))
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+
+    start_time = time.time()
+    print(f"\n{'='*60}")
+    print(f"🔺 PATTERN SCREENER: {len(symbols)} symbols, {duration_days} days, {workers} workers")
+    print(f"{'='*60}\n")
+
+    conn = connect_index(db_path)
+    fingerprints = load_fingerprints(conn)
+    stats = {'symbols': len(symbols), 'scanned': 0, 'unchanged': 0, 'patterns': 0, 'errors': 0, 'removed': 0}
+
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    try:
+        next_data = _fetch_screener_batch(batches[0], duration_days) if batches else {}
+
+        for batch_num, batch in enumerate(batches):
+            changed = _changed_symbols(next_data, fingerprints, force)
+            available = sum(1 for s in batch if next_data.get(s) is not None and not next_data[s].empty)
+            unchanged = available - len(changed)
+
+            if executor is not None:
+                futures = [executor.submit(scan_symbol, s, bars) for s, (bars, _) in changed.items()]
+            else:
+                futures = None
+                scans = [scan_symbol(s, bars) for s, (bars, _) in changed.items()]
+
+            # Download the next batch while the workers run this one
+            if batch_num + 1 < len(batches):
+                next_data = _fetch_screener_batch(batches[batch_num + 1], duration_days)
+
+            if futures is not None:
+                scans = [f.result() for f in as_completed(futures)]
+
+            results = []
+            for symbol, rows, error in scans:
+                if error:
+                    print(f"  ❌ Error with {symbol}: {error}")
+                    stats['errors'] += 1
+                    continue
+
+                bars, fingerprint = changed[symbol]
+                last_bar = pd.Timestamp(bars['Date'].iloc[-1]).strftime('%Y-%m-%d')
+                results.append((symbol, fingerprint, last_bar, len(bars), rows))
+                stats['patterns'] += len(rows)
+
+            write_scan_results(conn, results)
+            stats['scanned'] += len(results)
+            stats['unchanged'] += unchanged
+
+            print(f"[{min((batch_num + 1) * batch_size, len(symbols))}/{len(symbols)}] "
+                  f"scanned {len(results)}, unchanged {unchanged}")
+
+        stats['removed'] = prune_index(conn, symbols)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        conn.close()
+
+    print(f"\n✅ Pattern index updated in {time.time() - start_time:.1f}s: "
+          f"{stats['scanned']} scanned, {stats['unchanged']} unchanged, {stats['patterns']} patterns, "
+          f"{stats['removed']} removed\n")
+
+    return stats
+
+
+# ═══════════════════════════════════════════════════════════════════
+# QUERIES
+# ═══════════════════════════════════════════════════════════════════
+
+def session_cutoff(bars, now=None):
+    """
+    Date of the oldest of the last 'bars' NYSE sessions
+
+    Args:
+        bars (int): Number of recent sessions (1 = latest session only)
+        now: Current time (default: market_calendar.market_now())
+
+    Returns:
+        pd.Timestamp: Naive session date
+    """
+    date = latest_session(now=now)
+    remaining = bars - 1
+
+    while remaining > 0:
+        date -= pd.Timedelta(days=1)
+        if is_session(date):
+            remaining -= 1
+
+    return date
+
+
+def query_patterns(pattern_type=None, within_bars=None, min_confidence=None,
+                   direction=None, symbols=None, selected_only=False, db_path=None, now=None):
+    """
+    Query the pattern index
+
+    Args:
+        pattern_type (str or list): e.g. 'Cup & Handle'
+        within_bars (int): Only patterns completed in the last N sessions
+        min_confidence (int): Minimum confidence
+        direction (str): 'bullish', 'bearish' or 'neutral'
+        symbols (list): Restrict to these symbols
+        selected_only (bool): Only patterns kept after overlap removal
+        db_path: SQLite file (default: INDEX_FILE)
+        now: Current time for within_bars (default: market_now())
+
+    Returns:
+        pd.DataFrame: Matching patterns, most recent completions first
+    """
+    db_path = Path(db_path or INDEX_FILE)
+    if not db_path.exists():
+        return pd.DataFrame()
+
+    clauses, params = [], []
+
+    if pattern_type is not None:
+        types = [pattern_type] if isinstance(pattern_type, str) else list(pattern_type)
+        clauses.append(f"type IN ({', '.join('?' * len(types))})")
+        params.extend(types)
+
+    if within_bars is not None:
+        clauses.append('end_date >= ?')
+        params.append(session_cutoff(within_bars, now).strftime('%Y-%m-%d'))
+
+    if min_confidence is not None:
+        clauses.append('confidence >= ?')
+        params.append(int(min_confidence))
+
+    if direction is not None:
+        clauses.append('direction = ?')
+        params.append(direction)
+
+    if symbols is not None:
+        symbols = [str(s).upper() for s in symbols]
+        clauses.append(f"symbol IN ({', '.join('?' * len(symbols))})")
+        params.extend(symbols)
+
+    if selected_only:
+        clauses.append('selected = 1')
+
+    sql = 'SELECT * FROM patterns'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += ' ORDER BY end_date DESC, confidence DESC, symbol'
+
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+    for col in ['start_date', 'end_date']:
+        df[col] = pd.to_datetime(df[col])
+
+    return df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan the stock universe for chart patterns")
+    parser.add_argument('--days', type=int, default=SCAN_DAYS, help="Days of daily bars per symbol")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count - 1)")
+    parser.add_argument('--csv', default=None, help="Stock list CSV (default: stocks_list.csv)")
+    parser.add_argument('--force', action='store_true', help="Rescan symbols with unchanged bars")
+    args = parser.parse_args()
+
+    run_pattern_screener(duration_days=args.days, workers=args.workers, csv_path=args.csv, force=args.force)
@@ -8,6 +8,8 @@ import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
 
+from tr_calculations import align_to_market, calculate_ibd_rs_composite, rs_composite_to_rating
+
 
 def fetch_market_data(timeframe='daily', duration_days=365):
     """
@@ -124,61 +126,31 @@ def calculate_relative_strength_ibd(stock_df, market_df=None, timeframe='daily')
         print("⚠️ No market data available, using RS = 50 (neutral)")
         return pd.Series([50] * len(stock_df), index=stock_df.index)
     
-    # Calculate RS for each row
-    rs_values = []
-    
-    for idx in range(len(stock_df)):
-        # Get stock data up to current point
-        stock_prices = stock_df['Close'].iloc[:idx+1]
-        
-        # Get corresponding market data
-        stock_date = stock_df['Date'].iloc[idx]
-        market_subset = market_df[market_df['date'] <= stock_date]
-        
-        if len(market_subset) < 2:
-            rs_values.append(50)  # Not enough data
-            continue
-        
-        market_prices = market_subset['close']
-        
-        # Calculate performance for stock and market
-        stock_perf = calculate_performance(stock_prices, list(periods.values()))
-        market_perf = calculate_performance(market_prices, list(periods.values()))
-        
-        # Calculate relative performance (stock vs market) for each period
-        rel_perf = {}
-        for period_name, period_days in periods.items():
-            if stock_perf[period_days] == 0 and market_perf[period_days] == 0:
-                rel_perf[period_name] = 0
-            else:
-                # Relative strength = Stock performance - Market performance
-                rel_perf[period_name] = stock_perf[period_days] - market_perf[period_days]
-        
-        # Calculate weighted RS score using IBD methodology
-        # 40% last year, 20% last 6mo, 20% last 3mo, 20% last month
-        weighted_rs = (
-            rel_perf['year'] * 0.40 +
-            rel_perf['6month'] * 0.20 +
-            rel_perf['3month'] * 0.20 +
-            rel_perf['month'] * 0.20
-        )
-        
-        # Convert to percentile-like score (0-99)
-        # Normalize around 0, where positive = outperforming market
-        # Map to 0-99 scale where:
-        #   - RS = 99: Stock significantly outperforming (+50% better than market)
-        #   - RS = 50: Stock matching market performance (neutral)
-        #   - RS = 1: Stock significantly underperforming (-50% worse than market)
-        
-        if weighted_rs >= 50:
-            rs_score = 99  # Capped at 99
-        elif weighted_rs <= -50:
-            rs_score = 1   # Floored at 1
-        else:
-            # Linear mapping: -50 to +50 maps to 1 to 99
-            rs_score = ((weighted_rs + 50) / 100) * 98 + 1
-        
-        rs_values.append(round(rs_score, 1))
+    # Align stock and market closes once (as-of: market bars on/before each stock date)
+    market_sorted = market_df.assign(date=pd.to_datetime(market_df['date'])).sort_values('date', kind='stable')
+    market_count = align_to_market(stock_df['Date'], market_sorted['date'])
+    
+    # Shared vectorized IBD engine (same as tr_enhanced), with this module's
+    # lookback convention: past price is `period - 1` bars back, and a period
+    # only counts once there are MORE than `period` bars of history
+    weighted_rs = calculate_ibd_rs_composite(
+        stock_df['Close'].to_numpy(dtype=float),
+        market_sorted['close'].to_numpy(dtype=float),
+        market_count,
+        list(periods.values()),
+        stock_lag=1,
+        strict=True
+    )
+    
+    # Convert to percentile-like score (0-99)
+    # Map to 0-99 scale where:
+    #   - RS = 99: Stock significantly outperforming (+50% better than market)
+    #   - RS = 50: Stock matching market performance (neutral)
+    #   - RS = 1: Stock significantly underperforming (-50% worse than market)
+    rs_values = rs_composite_to_rating(weighted_rs)
+    
+    # Not enough market data yet
+    rs_values = np.where(market_count < 2, 50, rs_values)
     
     return pd.Series(rs_values, index=stock_df.index)
 
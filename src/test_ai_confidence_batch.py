@@ -0,0 +1,89 @@
+"""
+AI Confidence Batch Test
+The vectorized feature extraction / outcome labeling match the per-pattern
+extract_features / label_pattern_outcome, and the stored training dataset
+is reused for tickers whose bars did not change
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ai_confidence as ac
+from pattern_detection import PatternDetector
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+TICKERS = ['NVDA', 'XOM', 'AAPL', 'GOOGL']
+
+BARS = {
+    ticker: pd.read_csv(DATA_DIR / f'{ticker}_Daily_Complete_TR.csv', parse_dates=['Date'])
+    [['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+    for ticker in TICKERS
+}
+
+
+@pytest.fixture
+def scorer(tmp_path):
+    return ac.AIConfidenceScorer(model_dir=str(tmp_path / 'models'))
+
+
+def test_batch_matches_per_pattern(scorer):
+    for df in BARS.values():
+        patterns = PatternDetector(df).detect_all_patterns()
+
+        expected = pd.DataFrame([scorer.extract_features(p, df) for p in patterns])
+        features = scorer.extract_features_batch(patterns, df)
+        pd.testing.assert_frame_equal(features, expected[ac.FEATURE_COLUMNS], check_dtype=False, rtol=1e-8)
+
+        for lookforward in [5, 30]:
+            labels = scorer.label_outcomes_batch(patterns, df, lookforward_days=lookforward)
+            assert list(labels) == [scorer.label_pattern_outcome(p, df, lookforward_days=lookforward)
+                                    for p in patterns]
+
+
+def test_dataset_is_reused(scorer, monkeypatch):
+    bars = dict(BARS)
+    monkeypatch.setattr(ac, 'fetch_training_histories',
+                        lambda tickers, days, timeframe, workers: {t: bars[t] for t in tickers})
+    built = []
+    original = scorer._ticker_training_rows
+
+    def tracked(ticker, df, lookforward_days=30):
+        built.append(ticker)
+        return original(ticker, df, lookforward_days)
+
+    monkeypatch.setattr(scorer, '_ticker_training_rows', tracked)
+
+    features, labels = scorer.collect_training_data(TICKERS, timeframe='daily')
+    assert list(features.columns) == ac.FEATURE_COLUMNS
+    assert len(features) == len(labels) > 0 and set(labels) <= {0, 1}
+
+    # Unchanged bars: nothing recomputed, same data from the stored dataset
+    again, again_labels = scorer.collect_training_data(TICKERS, timeframe='daily')
+    assert built == TICKERS
+    pd.testing.assert_frame_equal(again, features)
+
+    # New bars for one ticker - only that ticker is rebuilt
+    bars['XOM'] = pd.concat([bars['XOM'], bars['XOM'].iloc[[-1]].assign(Date=pd.Timestamp('2025-11-10'))],
+                            ignore_index=True)
+    subset = scorer.build_training_dataset(['XOM', 'NVDA'], timeframe='daily')
+    assert built == TICKERS + ['XOM']
+    assert set(subset['ticker']) <= {'XOM', 'NVDA'}
+
+    # Dataset stored by another detection/feature version - everything is rebuilt
+    monkeypatch.setattr(ac, 'DATASET_KEY', 'v0:' + ac.DATASET_KEY)
+    scorer.build_training_dataset(['XOM', 'NVDA'], timeframe='daily')
+    assert built == TICKERS + ['XOM', 'XOM', 'NVDA']
+
+
+def test_no_labeled_patterns(scorer, monkeypatch):
+    # One ticker without history - empty frames, not a KeyError
+    monkeypatch.setattr(ac, 'fetch_training_histories', lambda tickers, days, timeframe, workers: {})
+
+    features, labels = scorer.collect_training_data(['NODATA'], timeframe='daily')
+
+    assert list(features.columns) == ac.FEATURE_COLUMNS
+    assert len(features) == len(labels) == 0
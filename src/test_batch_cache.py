@@ -0,0 +1,70 @@
+"""
+Batch Cache Test
+Batch fetches read and write per-symbol entries: a list that gains a
+symbol only downloads that symbol, and overlapping lists share data
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_fetcher as bf
+import universal_cache as uc
+
+DATES = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=300)
+
+
+def yahoo_frame(symbol):
+    """Yahoo batch layout: DatetimeIndex, padded with NaN rows"""
+    seed = sum(map(ord, symbol))
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, len(DATES)))
+    df = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1e6},
+                      index=pd.DatetimeIndex(DATES, name='Date'))
+    df.iloc[:5] = np.nan
+    return df
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(uc, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(uc, 'HISTORY_DIR', tmp_path / 'history')
+    uc.HISTORY_DIR.mkdir()
+    uc.clear_memory_cache()
+
+    requested = []
+
+    def fake_batch_fetch(symbols, api_source='yahoo', duration_days=365, timeframe='daily', tiingo_api_key=None):
+        requested.append(list(symbols))
+        return {s: yahoo_frame(s) for s in symbols}
+
+    monkeypatch.setattr(bf, 'batch_fetch_stocks', fake_batch_fetch)
+    yield requested
+    uc.clear_memory_cache()
+
+
+def test_only_missing_symbols_are_downloaded(downloads):
+    first = bf.fetch_watchlist_data_batch(['AAPL', 'MSFT'], duration_days=200)
+    second = bf.fetch_watchlist_data_batch(['AAPL', 'MSFT', 'NVDA'], duration_days=200)
+    ideas = bf.fetch_watchlist_data_batch(['NVDA', 'AAPL'], duration_days=200)
+
+    assert downloads == [['AAPL', 'MSFT'], ['NVDA']]
+    assert list(second) == ['AAPL', 'MSFT', 'NVDA']
+
+    # Cached and downloaded symbols come back in the same layout
+    for symbol in ['AAPL', 'MSFT']:
+        pd.testing.assert_frame_equal(first[symbol], second[symbol])
+    pd.testing.assert_frame_equal(second['NVDA'], ideas['NVDA'])
+
+    expected = yahoo_frame('NVDA').dropna().rename_axis('Date').reset_index()
+    expected = expected[expected['Date'] >= (pd.Timestamp.now() - pd.Timedelta(days=200)).normalize()]
+    pd.testing.assert_frame_equal(ideas['NVDA'], expected.reset_index(drop=True))
+
+
+def test_long_lists_and_weekly_views(downloads):
+    symbols = [f'SYM{i:03d}' for i in range(120)]
+
+    bf.fetch_watchlist_data_batch(symbols, duration_days=200)
+    weekly = bf.fetch_watchlist_data_batch(symbols, duration_days=200, timeframe='weekly')
+
+    assert len(downloads) == 1
+    assert weekly['SYM000']['Date'].dt.dayofweek.eq(6).all()
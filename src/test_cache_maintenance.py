@@ -0,0 +1,166 @@
+"""
+Cache Maintenance Test
+Disk budget / age eviction, compaction and migration of legacy range
+pickles into the per-ticker histories, and get_cache_stats
+"""
+
+import os
+import pickle
+import time
+
+import pandas as pd
+import pytest
+
+import cache_storage
+import universal_cache as uc
+
+DATES = pd.bdate_range('2024-01-02', '2024-06-28')
+BARS = pd.DataFrame({'Date': DATES, 'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 100.0})
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(uc, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(uc, 'HISTORY_DIR', tmp_path / 'history')
+    uc.HISTORY_DIR.mkdir()
+    uc.clear_memory_cache()
+    yield tmp_path
+    uc.clear_memory_cache()
+
+
+def save(ticker, idle_days=0):
+    uc._save_history(ticker, '1d', {'data': BARS, 'start': DATES[0], 'end': DATES[-1]})
+    used = time.time() - idle_days * 86400
+    for path in uc.HISTORY_DIR.glob(f'{ticker}_*'):
+        os.utime(path, (used, used))
+
+
+def tickers():
+    return sorted({p.name.split('_')[0] for p in uc.HISTORY_DIR.iterdir()})
+
+
+def test_evicts_stale_then_least_recently_used(cache_dir):
+    save('OLD', idle_days=200)
+    save('AAA', idle_days=10)
+    save('BBB', idle_days=5)
+    save('CCC', idle_days=1)
+
+    entry_bytes = max(e['bytes'] for e in uc._cache_entries())
+
+    # OLD is past the age limit; the budget leaves room for two entries
+    result = uc.enforce_cache_budget(max_bytes=int(entry_bytes * 2.5), max_age_days=90)
+
+    assert result['evicted'] == 2
+    assert tickers() == ['BBB', 'CCC']
+
+
+def test_budget_only_evicts_owned_files(cache_dir):
+    save('AAA', idle_days=200)
+    legacy = cache_dir / f"SPY_{DATES[0]:%Y-%m-%d}_{DATES[-1]:%Y-%m-%d}_1d.pkl"
+    with open(legacy, 'wb') as f:
+        pickle.dump(BARS, f)
+
+    # Stores other modules keep in the cache directory (SQLite index + WAL files)
+    derived = [cache_dir / name for name in
+               ('pattern_index.sqlite', 'pattern_index.sqlite-wal', 'pattern_index.sqlite-shm')]
+    for path in derived:
+        path.write_bytes(b'index')
+        os.utime(path, (0, 0))
+
+    result = uc.enforce_cache_budget(max_bytes=0)
+
+    assert result['evicted'] == 2
+    assert tickers() == [] and not legacy.exists()
+    assert all(path.exists() for path in derived)
+
+
+def test_reading_refreshes_lru_position(cache_dir):
+    save('AAA', idle_days=10)
+    save('BBB', idle_days=5)
+
+    uc.clear_memory_cache()
+    uc.get_stock_data('AAA', DATES[10], DATES[20])
+
+    entry_bytes = max(e['bytes'] for e in uc._cache_entries())
+    uc.enforce_cache_budget(max_bytes=int(entry_bytes * 1.5))
+
+    assert tickers() == ['AAA']
+
+
+def test_compaction_merges_legacy_ranges(cache_dir):
+    # Two overlapping legacy ranges and one disjoint range
+    for start, end in [(0, 60), (40, 100), (110, 128)]:
+        legacy = cache_dir / f"SPY_{DATES[start]:%Y-%m-%d}_{DATES[end]:%Y-%m-%d}_1d.pkl"
+        with open(legacy, 'wb') as f:
+            pickle.dump(BARS.iloc[start:end], f)
+
+    stale_tmp = uc.HISTORY_DIR / 'SPY_1d.feather.123.tmp'
+    stale_tmp.write_bytes(b'partial')
+    os.utime(stale_tmp, (0, 0))
+
+    result = uc.compact_cache()
+
+    assert result['merged_ranges'] == 3 and result['temp_files'] == 1
+    assert list(cache_dir.glob('*.pkl')) == []
+
+    history = uc._load_history('SPY')
+    pd.testing.assert_frame_equal(
+        history['data'].reset_index(drop=True),
+        pd.concat([BARS.iloc[0:100], BARS.iloc[110:128]], ignore_index=True)
+    )
+
+    # Coverage only spans the overlapping ranges - the gap is not claimed
+    assert (history['start'], history['end']) == (DATES[0], DATES[100])
+
+
+def test_migration_keeps_gaps_between_disjoint_ranges(cache_dir, monkeypatch):
+    bars = pd.DataFrame({'Date': pd.bdate_range('2024-01-01', '2024-10-31'),
+                         'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 100.0})
+
+    written = time.time() - 30 * 86400
+    for start, end in [('2024-01-01', '2024-03-01'), ('2024-09-01', '2024-11-01')]:
+        legacy = cache_dir / f"NVDA_{start}_{end}_1d.pkl"
+        with open(legacy, 'wb') as f:
+            pickle.dump(bars[(bars['Date'] >= start) & (bars['Date'] < end)], f)
+        os.utime(legacy, (written, written))
+
+    # Resampled bars are not a history (NVDA_1wk_resampled is not ticker_interval)
+    resampled = uc.HISTORY_DIR / 'NVDA_1wk_resampled.pkl'
+    with open(resampled, 'wb') as f:
+        pickle.dump(BARS, f)
+
+    assert cache_storage.migrate_universal_cache() == 2
+    assert resampled.exists() and not (uc.HISTORY_DIR / 'NVDA_1wk_resampled.json').exists()
+
+    history = uc._load_history('NVDA')
+    assert (history['start'], history['end']) == (pd.Timestamp('2024-01-01'), pd.Timestamp('2024-03-01'))
+    assert history['fetched_at'] == pd.Timestamp(written, unit='s', tz='UTC').tz_convert(uc.MARKET_TZ)
+
+    # The gap between the two ranges was never downloaded
+    fetched = []
+
+    def fake_fetch(ticker, start_date, end_date, interval, api_source):
+        fetched.append((pd.Timestamp(start_date), pd.Timestamp(end_date)))
+        return bars[(bars['Date'] >= start_date) & (bars['Date'] < end_date)].reset_index(drop=True)
+
+    monkeypatch.setattr(uc, '_fetch_range', fake_fetch)
+    uc.clear_memory_cache()
+    df = uc.get_stock_data('NVDA', '2024-05-01', '2024-07-01')
+
+    assert fetched and fetched[0][0] <= pd.Timestamp('2024-05-01')
+    expected = bars[(bars['Date'] >= '2024-05-01') & (bars['Date'] < '2024-07-01')].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df.reset_index(drop=True), expected, check_dtype=False)
+
+
+def test_cache_stats(cache_dir):
+    save('AAA', idle_days=30)
+    save('BBB')
+
+    uc.get_stock_data('BBB', DATES[10], DATES[20])
+    stats = uc.get_cache_stats()
+
+    assert stats['entries'] == 2
+    assert stats['bytes'] == sum(p.stat().st_size for p in uc.HISTORY_DIR.iterdir())
+    assert stats['oldest_entries'][0]['name'] == 'history/AAA'
+    assert stats['oldest_entries'][0]['idle_days'] >= 29
+    assert stats['hit_rate'] > 0
@@ -0,0 +1,109 @@
+"""
+Ichimoku Batch Test
+predict_batch scores a frame of signals with one model call and returns
+exactly what predict returns per signal; build_signal_frame reproduces
+the per-index signal dicts the Indicator Chart page used to build
+"""
+
+import pickle
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from ml_ichimoku_predictor import IchimokuMLPredictor, build_signal_frame
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+FEATURE_COLS = [
+    'max_loss_pct', 'max_gain_pct', 'distance_to_ema200_pct', 'ema_30_200_spread_pct',
+    'cloud_thickness_pct', 'distance_to_ema30_pct', 'distance_to_ema13_pct',
+    'ema_13_30_spread_pct', 'distance_to_cloud_top_pct', 'distance_to_cloud_bottom_pct',
+    'trend_strength', 'price_above_ema200', 'price_position_numeric', 'ema_alignment_bullish',
+    'cloud_as_support', 'cloud_as_resistance', 'price_above_ema30', 'ema_alignment_bearish',
+    'price_above_ema13'
+]
+
+bars = pd.read_csv(DATA_DIR / 'NVDA_Daily_Complete_TR.csv')
+close = bars['Close']
+EMAS = {span: close.ewm(span=span, adjust=False).mean() for span in (13, 30, 200)}
+tenkan = (bars['High'].rolling(9).max() + bars['Low'].rolling(9).min()) / 2
+kijun = (bars['High'].rolling(26).max() + bars['Low'].rolling(26).min()) / 2
+SENKOU_A = ((tenkan + kijun) / 2).shift(26)
+SENKOU_B = ((bars['High'].rolling(52).max() + bars['Low'].rolling(52).min()) / 2).shift(26)
+
+INDICES = list(range(80, len(bars), 7))
+
+
+def legacy_signal_data(idx):
+    """Per-signal dict as built by the old get_ml_confidence_for_signals loop"""
+    entry_price = float(close.iloc[idx])
+    cloud_top = max(float(SENKOU_A.iloc[idx]), float(SENKOU_B.iloc[idx]))
+    cloud_bottom = min(float(SENKOU_A.iloc[idx]), float(SENKOU_B.iloc[idx]))
+
+    if entry_price > cloud_top:
+        price_position = 'above'
+    elif entry_price < cloud_bottom:
+        price_position = 'below'
+    else:
+        price_position = 'inside'
+
+    return {
+        'entry_price': entry_price,
+        'ema_13': float(EMAS[13].iloc[idx]),
+        'ema_30': float(EMAS[30].iloc[idx]),
+        'ema_200': float(EMAS[200].iloc[idx]),
+        'cloud_top': cloud_top,
+        'cloud_bottom': cloud_bottom,
+        'price_position': price_position,
+    }
+
+
+@pytest.fixture(scope='module')
+def predictor(tmp_path_factory):
+    """Predictor over small sklearn models saved in the training pickle layout"""
+    model_dir = tmp_path_factory.mktemp('ml_models')
+    helper = IchimokuMLPredictor.__new__(IchimokuMLPredictor)
+
+    frame = build_signal_frame(close, EMAS[13], EMAS[30], EMAS[200], SENKOU_A, SENKOU_B,
+                               range(60, len(bars)))
+    frame['max_gain_pct'] = close.pct_change(10).shift(-10).iloc[60:].fillna(0).values * 100
+    frame['max_loss_pct'] = -frame['max_gain_pct'].abs() / 2
+    X = helper._engineer_feature_frame(frame)[FEATURE_COLS]
+    y = (frame['max_gain_pct'] > 0).astype(int)
+
+    models = {
+        'daily': ('Random Forest', RandomForestClassifier(n_estimators=20, max_depth=4, random_state=0)),
+        'weekly': ('Logistic Regression', LogisticRegression(max_iter=2000)),
+    }
+    for timeframe, (name, model) in models.items():
+        with open(model_dir / f'ichimoku_{timeframe}_20250101_000000.pkl', 'wb') as f:
+            pickle.dump({'best_model': model.fit(X, y), 'feature_cols': FEATURE_COLS,
+                         'accuracy': model.score(X, y), 'best_model_name': name,
+                         'test_data': None}, f)
+
+    return IchimokuMLPredictor(str(model_dir))
+
+
+def test_signal_frame_matches_legacy_dicts():
+    frame = build_signal_frame(close, EMAS[13], EMAS[30], EMAS[200], SENKOU_A, SENKOU_B, INDICES)
+
+    assert frame.to_dict('records') == [legacy_signal_data(idx) for idx in INDICES]
+    assert set(frame['price_position']) == {'above', 'inside', 'below'}
+
+
+def test_batch_matches_single_predictions(predictor):
+    signals = build_signal_frame(close, EMAS[13], EMAS[30], EMAS[200], SENKOU_A, SENKOU_B, INDICES)
+
+    for timeframe in ['Daily', 'Weekly']:
+        batch = predictor.predict_batch(signals, timeframe=timeframe)
+        single = [predictor.predict({**legacy_signal_data(idx), 'timeframe': timeframe})
+                  for idx in INDICES]
+
+        assert batch == single
+
+    assert predictor.predict_batch(signals.iloc[:0]) == []
+    with pytest.raises(ValueError):
+        predictor.predict_batch(signals.drop(columns=['ema_200']))
@@ -0,0 +1,154 @@
+"""
+Market Calendar Test
+NYSE sessions/early closes and the cache freshness policy used by
+universal_cache: final bars are never refetched, the running session
+gets a short TTL, weekends never refetch
+"""
+
+import pandas as pd
+import pytest
+
+import market_calendar as mc
+import universal_cache as uc
+
+
+def et(value):
+    return pd.Timestamp(value, tz=mc.MARKET_TZ)
+
+
+def test_sessions_and_closes():
+    assert not mc.is_session('2024-03-29')   # Good Friday
+    assert not mc.is_session('2024-06-19')   # Juneteenth
+    assert mc.is_session('2021-06-18')       # before Juneteenth was a holiday
+    assert mc.is_session('2024-10-14')       # Columbus Day - NYSE open
+    assert not mc.is_session('2022-12-26')   # Christmas observed
+    assert not mc.is_session('2025-01-09')   # national day of mourning
+
+    assert mc.session_close('2024-11-29') == et('2024-11-29 13:00')
+    assert mc.session_close('2024-07-03') == et('2024-07-03 13:00')
+    assert mc.session_close('2024-07-05') == et('2024-07-05 16:00')
+
+
+def test_latest_session():
+    assert mc.latest_session(now=et('2024-06-22 12:00')) == pd.Timestamp('2024-06-21')   # Saturday
+    assert mc.latest_session(now=et('2024-06-24 09:00')) == pd.Timestamp('2024-06-21')   # before open
+    assert mc.latest_session(now=et('2024-06-24 10:00')) == pd.Timestamp('2024-06-24')
+    assert mc.latest_session(until='2024-06-24', now=et('2024-06-24 10:00')) == pd.Timestamp('2024-06-21')
+
+
+def test_is_fresh():
+    friday_close = et('2024-06-21 16:45')
+
+    assert mc.is_fresh(friday_close, now=et('2024-06-23 12:00'))
+    assert mc.is_fresh(friday_close, now=et('2024-06-24 09:00'))
+    assert not mc.is_fresh(friday_close, now=et('2024-06-24 09:45'))
+
+    # Intraday snapshot: TTL during the session, refetch once it is final
+    assert mc.is_fresh(et('2024-06-21 11:00'), now=et('2024-06-21 11:10'))
+    assert not mc.is_fresh(et('2024-06-21 11:00'), now=et('2024-06-21 11:30'))
+    assert not mc.is_fresh(et('2024-06-21 11:00'), now=et('2024-06-22 12:00'))
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    """History of daily bars through Friday 2024-06-21 and a settable 'now'"""
+    monkeypatch.setattr(uc, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(uc, 'HISTORY_DIR', tmp_path / 'history')
+    uc.HISTORY_DIR.mkdir()
+    uc.clear_memory_cache()
+
+    dates = pd.bdate_range('2024-01-02', '2024-06-21')
+    bars = pd.DataFrame({'Date': dates, 'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0})
+
+    fetches = []
+
+    def fake_fetch(ticker, start, end, interval, api_source):
+        fetches.append((start, end))
+        return bars[bars['Date'] >= start.normalize()].copy()
+
+    monkeypatch.setattr(uc, '_fetch_range', fake_fetch)
+
+    def set_now(value):
+        monkeypatch.setattr(mc, 'market_now', lambda: et(value))
+        monkeypatch.setattr(uc, 'market_now', lambda: et(value))
+
+    def save(fetched_at):
+        uc._save_history('SPY', '1d', {
+            'data': bars, 'start': dates[0], 'end': pd.Timestamp('2024-06-21 18:00'),
+            'fetched_at': et(fetched_at)
+        })
+        uc.clear_memory_cache()
+
+    yield set_now, save, fetches
+    uc.clear_memory_cache()
+
+
+def test_weekend_never_refetches(clock):
+    set_now, save, fetches = clock
+    save('2024-06-21 17:00')
+
+    set_now('2024-06-23 12:00')
+    uc.get_stock_data('SPY', '2024-03-01', pd.Timestamp('2024-06-23 12:00'))
+    assert fetches == []
+
+    set_now('2024-06-24 10:00')
+    uc.get_stock_data('SPY', '2024-03-01', pd.Timestamp('2024-06-24 10:00'))
+    assert len(fetches) == 1
+
+
+def test_intraday_bar_is_refetched_after_close(clock):
+    set_now, save, fetches = clock
+    save('2024-06-21 11:00')
+
+    set_now('2024-06-21 11:05')
+    uc.get_stock_data('SPY', '2024-03-01', pd.Timestamp('2024-06-21 18:00'))
+    assert fetches == []
+
+    set_now('2024-06-22 09:00')
+    uc.get_stock_data('SPY', '2024-03-01', pd.Timestamp('2024-06-22 09:00'))
+    assert len(fetches) == 1
+
+    # Now final - nothing more until Monday's session
+    uc.get_stock_data('SPY', '2024-03-01', pd.Timestamp('2024-06-23 09:00'))
+    assert len(fetches) == 1
+
+
+def test_empty_tail_counts_as_fetched(clock, monkeypatch):
+    set_now, save, fetches = clock
+    save('2024-06-21 17:00')
+
+    # Symbol delisted over the weekend: Monday's tail request returns no bars
+    def empty_fetch(ticker, start, end, interval, api_source):
+        fetches.append((start, end))
+        return pd.DataFrame()
+
+    monkeypatch.setattr(uc, '_fetch_range', empty_fetch)
+    set_now('2024-06-24 17:00')
+
+    for _ in range(3):
+        df = uc.get_stock_data('SPY', '2024-03-01', pd.Timestamp('2024-06-24 17:00'))
+    assert len(fetches) == 1
+    assert df['Date'].iloc[-1] == pd.Timestamp('2024-06-21')
+
+
+def test_readjusted_history_is_refetched(clock, monkeypatch):
+    set_now, save, fetches = clock
+    save('2024-06-21 17:00')
+
+    # 2:1 split on Monday: Yahoo now serves every past bar at half the price
+    def split_fetch(ticker, start, end, interval, api_source):
+        fetches.append((start, end))
+        dates = pd.bdate_range(start.normalize(), '2024-06-24')
+        return pd.DataFrame({'Date': dates, 'Open': 0.5, 'High': 0.5, 'Low': 0.5, 'Close': 0.5, 'Volume': 2.0})
+
+    monkeypatch.setattr(uc, '_fetch_range', split_fetch)
+    set_now('2024-06-24 17:00')
+
+    df = uc.get_stock_data('SPY', '2024-03-01', pd.Timestamp('2024-06-24 17:00'))
+
+    # Tail request, then the full range from the stored start
+    assert [start for start, _ in fetches] == [pd.Timestamp('2024-06-21'), pd.Timestamp('2024-01-02')]
+    assert (df['Close'] == 0.5).all() and df['Date'].iloc[-1] == pd.Timestamp('2024-06-24')
+
+    uc.clear_memory_cache()
+    assert (uc._load_history('SPY')['data']['Close'] == 0.5).all()
@@ -0,0 +1,99 @@
+"""
+Memory Tier Test
+Checks the in-memory LRU in front of the universal_cache history files:
+hits skip the disk, hand out read-only views, see writes by other
+processes and stay inside the byte budget
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import universal_cache as uc
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+DAILY = pd.read_csv(DATA_DIR / 'NVDA_Daily_Complete_TR.csv')[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+DAILY['Date'] = pd.to_datetime(DAILY['Date'])
+
+START, END = DAILY['Date'].iloc[100], DAILY['Date'].iloc[300]
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(uc, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(uc, 'HISTORY_DIR', tmp_path / 'history')
+    uc.HISTORY_DIR.mkdir()
+    uc.clear_memory_cache()
+
+    for ticker in ['NVDA', 'SPY']:
+        uc._save_history(ticker, '1d', {
+            'data': DAILY,
+            'start': DAILY['Date'].iloc[0],
+            'end': DAILY['Date'].iloc[-1] + pd.Timedelta(days=1)
+        })
+
+    uc.clear_memory_cache()
+    yield
+    uc.clear_memory_cache()
+
+
+def test_hits_are_read_only_views(history, monkeypatch):
+    backend_class = type(uc.get_backend())
+    disk_reads = []
+
+    def counting_read(self, path, columns=None):
+        disk_reads.append(path)
+        return read(self, path, columns)
+
+    # get_backend() returns a new instance per call - patch the class
+    read = backend_class.read
+    monkeypatch.setattr(backend_class, 'read', counting_read)
+
+    first = uc.get_stock_data('NVDA', START, END)
+    misses = len(disk_reads)
+    assert misses > 0
+
+    second = uc.get_stock_data('NVDA', START, END)
+    assert len(disk_reads) == misses
+
+    expected = DAILY[(DAILY['Date'] >= START) & (DAILY['Date'] < END)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(second, expected)
+    assert np.shares_memory(first['Close'].to_numpy(), second['Close'].to_numpy())
+    assert uc.get_memory_cache_stats()['hits'] == 1
+    assert uc.get_memory_cache_stats()['misses'] == 1
+
+    # In-place writes cannot reach the cached frame
+    with pytest.raises(ValueError):
+        second.iloc[0, second.columns.get_loc('Close')] = -1.0
+    assert uc.get_stock_data('NVDA', START, END)['Close'].iloc[0] == expected['Close'].iloc[0]
+
+    writable = uc.get_stock_data('NVDA', START, END, copy=True)
+    writable.iloc[0, writable.columns.get_loc('Close')] = -1.0
+    assert uc.get_stock_data('NVDA', START, END)['Close'].iloc[0] == expected['Close'].iloc[0]
+
+
+def test_rewritten_file_is_reloaded(history):
+    uc.get_stock_data('NVDA', START, END)
+
+    # Another process extends the history (bypassing this process' tier)
+    changed = DAILY.copy()
+    changed['Close'] = changed['Close'] * 2
+    uc.get_backend().write(changed, uc._get_history_file('NVDA', '1d'))
+
+    assert uc.get_stock_data('NVDA', START, END)['Close'].iloc[0] == changed['Close'].iloc[100]
+
+
+def test_byte_budget(history, monkeypatch):
+    uc.get_stock_data('NVDA', START, END)
+    entry_bytes = uc.get_memory_cache_stats()['bytes']
+
+    # Room for one history only - loading SPY evicts NVDA
+    monkeypatch.setattr(uc, 'MEMORY_CACHE_BYTES', int(entry_bytes * 1.5))
+    uc.get_stock_data('SPY', START, END)
+
+    stats = uc.get_memory_cache_stats()
+    assert stats['entries'] == 1 and stats['evictions'] >= 1
+    assert stats['bytes'] <= uc.MEMORY_CACHE_BYTES
@@ -0,0 +1,41 @@
+"""
+ML Predictor Batch Test
+Checks that predict_confidence_batch scores a DataFrame of signals exactly
+like calling predict_confidence once per signal, and that the model
+registry does not reload an unchanged model
+"""
+
+import pandas as pd
+
+import ml_tr_predictor_hybrid as ml
+
+SIGNALS = pd.DataFrame([
+    {'tr_stage': 1, 'entry_price': 150.5, 'ema_3': 149.8, 'ema_9': 148.2, 'ema_20': 145.8,
+     'ema_34': 142.0, 'ppo_value': 2.1, 'ppo_histogram': 0.5, 'pmo_value': 3.2,
+     'quality_level': 1, 'has_buy_point': 0, 'has_uptrend': 0, 'has_rs_chaikin': 0},
+    {'tr_stage': 2, 'entry_price': 42.0, 'ema_3': 43.1, 'ema_9': 41.0, 'ema_20': 44.2,
+     'ema_34': 40.5, 'ppo_value': -0.7, 'ppo_histogram': -0.2, 'pmo_value': 0.4,
+     'quality_level': 0, 'has_buy_point': 1, 'has_uptrend': 0, 'has_rs_chaikin': 0},
+    {'tr_stage': 1, 'entry_price': 88.0, 'ema_3': 87.5, 'ema_9': 86.0, 'ema_20': 84.0,
+     'ema_34': 80.0, 'ppo_value': 3.0, 'ppo_histogram': 1.0, 'pmo_value': 4.0,
+     'quality_level': 3, 'has_buy_point': 1, 'has_uptrend': 1, 'has_rs_chaikin': 1}
+])
+
+
+def test_batch_matches_single_predictions():
+    for timeframe in ['Daily', 'Weekly']:
+        batch = ml.predict_confidence_batch(SIGNALS, timeframe=timeframe)
+        single = [ml.predict_confidence(row, timeframe=timeframe)
+                  for row in SIGNALS.to_dict('records')]
+
+        assert batch == single
+
+
+def test_model_is_loaded_once():
+    assert ml.get_model('Daily') is ml.get_model('Daily')
+
+
+if __name__ == '__main__':
+    test_batch_matches_single_predictions()
+    test_model_is_loaded_once()
+    print("✅ ML predictor batch OK")
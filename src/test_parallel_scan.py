@@ -0,0 +1,118 @@
+"""
+Parallel Scan Test
+A parallel scan that crashed between appending a symbol's rows and
+recording it in the '.done' progress file resumes without re-scanning
+finished symbols and without duplicate signal rows; the serial and the
+parallel scan analyze the same window and return the same signals
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import tr_signal_scanner_v3 as scanner
+import universal_cache as uc
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+SYMBOLS = ['NVDA', 'AAPL', 'GOOGL']
+
+ANALYZED = {
+    symbol: pd.read_csv(DATA_DIR / f'{symbol}_Daily_Complete_TR.csv', parse_dates=['Date'])
+    for symbol in SYMBOLS
+}
+
+KEYS = ['stock_symbol', 'timeframe', 'signal_date']
+
+
+@pytest.fixture
+def scan(tmp_path, monkeypatch):
+    """Runs scan_multiple_stocks_parallel on the analyzed CSVs; returns (run, output file, analyzed symbols)"""
+    analyzed = []
+
+    def fake_analyze(raw_df, symbol, timeframe, market_df=None, end_date=None):
+        analyzed.append(symbol)
+        return ANALYZED[symbol]
+
+    # Threads instead of processes so the stubs are seen by the workers
+    monkeypatch.setattr(scanner, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(scanner, 'analyze_prefetched_tr', fake_analyze)
+    monkeypatch.setattr(scanner, '_fetch_scan_batch', lambda symbols, start, end: {s: ANALYZED[s] for s in symbols})
+    monkeypatch.setattr(scanner, '_fetch_scan_market_data', lambda start, end, timeframes: {tf: None for tf in timeframes})
+
+    output_file = str(tmp_path / 'signals.csv')
+
+    def run(resume=False):
+        return scanner.scan_multiple_stocks_parallel(
+            SYMBOLS, '2020-01-01', '2025-01-01', scan_both_timeframes=False,
+            output_file=output_file, workers=2, resume=resume, batch_size=2
+        )
+
+    return run, output_file, analyzed
+
+
+def sort_signals(df):
+    return df.sort_values(KEYS).reset_index(drop=True)
+
+
+def test_resume_after_crash_has_no_duplicates(scan):
+    run, output_file, analyzed = scan
+
+    expected = sort_signals(run())
+    assert set(expected['stock_symbol']) == set(SYMBOLS)
+    assert not expected.duplicated(subset=KEYS).any()
+
+    # Crash: NVDA finished, AAPL's rows were appended but it was never marked
+    # done, GOOGL was not reached
+    rows = pd.read_csv(output_file)
+    rows[rows['stock_symbol'] != 'GOOGL'].to_csv(output_file, index=False)
+    with open(scanner.get_progress_file(output_file), 'w') as f:
+        f.write('NVDA\n')
+
+    analyzed.clear()
+    resumed = sort_signals(run(resume=True))
+
+    assert sorted(analyzed) == ['AAPL', 'GOOGL']
+    assert scanner.load_scan_progress(output_file) == set(SYMBOLS)
+    assert not resumed.duplicated(subset=KEYS).any()
+    pd.testing.assert_frame_equal(resumed, expected)
+
+
+def test_worker_reports_errors(monkeypatch):
+    def failing(raw_df, symbol, timeframe, market_df=None, end_date=None):
+        raise ValueError('bad bars')
+
+    monkeypatch.setattr(scanner, 'analyze_prefetched_tr', failing)
+
+    assert scanner._scan_symbol_worker('NVDA', ANALYZED['NVDA'], ['Daily']) == ('NVDA', [], 'bad bars')
+
+
+def test_serial_and_parallel_scans_match(tmp_path, monkeypatch):
+    # Raw bars run past end_date (and end a year before today)
+    raw = {symbol: df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']] for symbol, df in ANALYZED.items()}
+    raw['SPY'] = pd.read_csv(DATA_DIR / 'FTI_Daily_Complete_TR.csv', parse_dates=['Date'])[raw['NVDA'].columns]
+    start_date, end_date = '2021-06-01', '2024-06-01'
+    requested = []
+
+    def window(symbol, start, end):
+        requested.append((symbol, str(pd.Timestamp(start).date()), str(pd.Timestamp(end).date())))
+        df = raw[symbol]
+        return df[(df['Date'] >= start) & (df['Date'] < end)].reset_index(drop=True)
+
+    monkeypatch.setattr(scanner, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(uc, 'get_stock_data', lambda ticker, start, end, **kwargs: window(ticker, start, end))
+    monkeypatch.setattr(scanner, '_fetch_scan_batch',
+                        lambda symbols, start, end: {s: window(s, start, end) for s in symbols})
+
+    results = {}
+    for workers in [1, 2]:
+        output_file = str(tmp_path / f'signals_{workers}.csv')
+        scanner.scan_multiple_stocks(SYMBOLS, start_date, end_date, output_file=output_file, workers=workers)
+        results[workers] = sort_signals(pd.read_csv(output_file)).reindex(columns=scanner.SIGNAL_COLUMNS)
+
+    # Analysis window start..end, outcome labels through the forward window
+    assert {r[1:] for r in requested} == {(start_date, end_date), (start_date, scanner.outcome_history_end(end_date))}
+    assert set(results[1]['stock_symbol']) == set(SYMBOLS)
+    pd.testing.assert_frame_equal(results[1], results[2])
@@ -0,0 +1,111 @@
+"""
+Pattern Screener Test
+The universe screener indexes every pattern PatternDetector finds (and
+flags the ones kept after overlap removal), only rescans symbols whose
+bars changed, drops symbols that left the universe, and answers type /
+recency / confidence queries from the SQLite index
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import pattern_screener as ps
+from pattern_detection import PatternDetector, remove_overlapping_patterns
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+SYMBOLS = ['NVDA', 'XOM', 'AAPL']
+
+BARS = {
+    symbol: pd.read_csv(DATA_DIR / f'{symbol}_Daily_Complete_TR.csv', parse_dates=['Date'])
+    [['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+    for symbol in SYMBOLS
+}
+
+
+@pytest.fixture
+def universe(tmp_path, monkeypatch):
+    """Bars served from the CSVs instead of the batch fetcher; returns the bar dict"""
+    bars = dict(BARS)
+    fetched = []
+
+    def fake_fetch(symbols, duration_days):
+        fetched.append(list(symbols))
+        return {s: bars[s] for s in symbols if s in bars}
+
+    monkeypatch.setattr(ps, '_fetch_screener_batch', fake_fetch)
+    monkeypatch.setattr(ps, 'INDEX_FILE', tmp_path / 'patterns.sqlite')
+    return bars
+
+
+def test_index_matches_detector(universe):
+    stats = ps.run_pattern_screener(SYMBOLS + ['NODATA'], workers=1, batch_size=2)
+
+    assert stats['scanned'] == 3 and stats['errors'] == 0
+    indexed = ps.query_patterns()
+
+    for symbol in SYMBOLS:
+        expected = PatternDetector(BARS[symbol]).detect_all_patterns()
+        rows = indexed[indexed['symbol'] == symbol].sort_values(['start_idx', 'end_idx', 'type'])
+        assert len(rows) == len(expected)
+        assert sorted(zip(rows['type'], rows['end_idx'], rows['confidence'])) == \
+            sorted((p['type'], p['end_idx'], p['confidence']) for p in expected)
+
+        kept = remove_overlapping_patterns(expected)
+        assert rows['selected'].sum() == len(kept)
+        assert len(ps.query_patterns(symbols=[symbol], selected_only=True)) == len(kept)
+
+
+def test_only_changed_symbols_are_rescanned(universe):
+    ps.run_pattern_screener(SYMBOLS, workers=1)
+
+    stats = ps.run_pattern_screener(SYMBOLS, workers=1)
+    assert (stats['scanned'], stats['unchanged']) == (0, 3)
+
+    # One new bar for XOM
+    xom = universe['XOM']
+    new_bar = xom.iloc[[-1]].assign(Date=xom['Date'].iloc[-1] + pd.Timedelta(days=3), Close=120.0)
+    universe['XOM'] = pd.concat([xom, new_bar], ignore_index=True)
+
+    stats = ps.run_pattern_screener(SYMBOLS, workers=2)
+    assert (stats['scanned'], stats['unchanged']) == (1, 2)
+
+    conn = ps.connect_index()
+    last_bars = dict(conn.execute('SELECT symbol, last_bar FROM scanned'))
+    conn.close()
+    assert last_bars['XOM'] == universe['XOM']['Date'].iloc[-1].strftime('%Y-%m-%d')
+
+
+def test_symbols_outside_universe_are_removed(universe):
+    ps.run_pattern_screener(SYMBOLS, workers=1)
+    assert 'XOM' in set(ps.query_patterns()['symbol'])
+
+    # XOM dropped from the stock list
+    stats = ps.run_pattern_screener(['NVDA', 'AAPL'], workers=1)
+    assert (stats['scanned'], stats['unchanged'], stats['removed']) == (0, 2, 1)
+
+    assert set(ps.query_patterns()['symbol']) == {'NVDA', 'AAPL'}
+    conn = ps.connect_index()
+    assert set(ps.load_fingerprints(conn)) == {'NVDA', 'AAPL'}
+    conn.close()
+
+
+def test_query_filters(universe):
+    ps.run_pattern_screener(SYMBOLS, workers=1)
+    everything = ps.query_patterns()
+
+    # Monday after NVDA's last bar (Friday 2025-11-14)
+    now = pd.Timestamp('2025-11-17 18:00', tz='America/New_York')
+    recent = ps.query_patterns(within_bars=40, min_confidence=60, now=now)
+
+    assert ps.session_cutoff(10, now) == pd.Timestamp('2025-11-04')
+
+    cutoff = ps.session_cutoff(40, now)
+    expected = everything[(everything['end_date'] >= cutoff) & (everything['confidence'] >= 60)]
+    assert 0 < len(recent) == len(expected) < (everything['end_date'] >= cutoff).sum()
+
+    cups = ps.query_patterns(pattern_type='Cup & Handle', symbols=['nvda'])
+    assert set(cups['type']) <= {'Cup & Handle'} and set(cups['symbol']) <= {'NVDA'}
+    assert len(cups) == ((everything['type'] == 'Cup & Handle') & (everything['symbol'] == 'NVDA')).sum()
@@ -0,0 +1,73 @@
+"""
+Resampled Cache Test
+Checks that weekly/monthly bars served from the cached daily history equal
+resample_ohlcv of the same daily range, before and after the daily store
+is extended (incremental update of the cached resampled bars)
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+import universal_cache as uc
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+DAILY = pd.read_csv(DATA_DIR / 'NVDA_Daily_Complete_TR.csv')[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+DAILY['Date'] = pd.to_datetime(DAILY['Date'])
+
+
+def fake_fetch(ticker, start, end, interval, api_source):
+    """Daily bars from the CSV instead of the API"""
+    return DAILY[(DAILY['Date'] >= start.normalize()) & (DAILY['Date'] < end)].copy()
+
+
+def seed_history(tmp_path, monkeypatch, rows):
+    monkeypatch.setattr(uc, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(uc, 'HISTORY_DIR', tmp_path / 'history')
+    uc.HISTORY_DIR.mkdir()
+    monkeypatch.setattr(uc, '_fetch_range', fake_fetch)
+
+    data = DAILY.iloc[:rows].reset_index(drop=True)
+    uc._save_history('NVDA', '1d', {
+        'data': data,
+        'start': data['Date'].iloc[0],
+        'end': data['Date'].iloc[-1] + pd.Timedelta(days=1)
+    })
+
+
+def expected_bars(start, end, timeframe):
+    daily = DAILY[(DAILY['Date'] >= start) & (DAILY['Date'] < end)]
+    return uc.resample_ohlcv(daily, timeframe).reset_index(drop=True)
+
+
+def test_resampled_matches_daily_slice(tmp_path, monkeypatch):
+    seed_history(tmp_path, monkeypatch, 600)
+
+    # Mid-week / mid-month edges, so the first and last periods are partial
+    start, end = DAILY['Date'].iloc[47], DAILY['Date'].iloc[551]
+
+    for timeframe, interval in [('weekly', '1wk'), ('monthly', '1mo')]:
+        bars = uc.get_stock_data('NVDA', start, end, interval)
+        pd.testing.assert_frame_equal(bars, expected_bars(start, end, timeframe), check_freq=False)
+
+
+def test_incremental_extension(tmp_path, monkeypatch):
+    seed_history(tmp_path, monkeypatch, 400)
+    start = DAILY['Date'].iloc[10]
+
+    for timeframe in ['weekly', 'monthly']:
+        uc.get_resampled_data('NVDA', start, DAILY['Date'].iloc[399], timeframe)
+
+    # New daily bars arrive - only the trailing periods are recomputed
+    for rows in [403, 450, 700]:
+        end = DAILY['Date'].iloc[rows - 1] + pd.Timedelta(days=1)
+
+        for timeframe in ['weekly', 'monthly']:
+            bars = uc.get_resampled_data('NVDA', start, end, timeframe)
+            pd.testing.assert_frame_equal(bars, expected_bars(start, end, timeframe), check_freq=False)
+
+            # The cached bars cover the whole daily store
+            cached = uc.get_backend().read(uc._get_resampled_file('NVDA', timeframe))
+            full = uc.resample_ohlcv(uc._load_history('NVDA')['data'], timeframe).reset_index(drop=True)
+            pd.testing.assert_frame_equal(cached, full, check_freq=False)
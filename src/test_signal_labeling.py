@@ -0,0 +1,83 @@
+"""
+Signal Labeling Parity Test
+Checks that label_signal_outcomes_batch (one pass over the analyzed frame)
+labels every Strong Buy signal exactly like the per-signal
+label_signal_outcome, when both see the same price history, and that
+signals near the end of the analysis window are labeled from the bars
+after it
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+import tr_signal_scanner_v3 as scanner
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+def load_analyzed(csv_name):
+    df = pd.read_csv(DATA_DIR / csv_name)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def test_batch_labels_match_per_signal_labels(monkeypatch):
+    df = load_analyzed('NVDA_Daily_Complete_TR.csv')
+    prices = df.set_index('Date')[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+    # Serve the whole history up to the window end, so both labelers
+    # compute the 200 EMA from the same first bar
+    def fake_download(symbol, start=None, end=None, progress=False):
+        return prices[prices.index < end].copy()
+
+    monkeypatch.setattr('yfinance.download', fake_download)
+
+    indices = scanner.get_strong_buy_indices(df)
+    signals = scanner.extract_tr_signals(df, 'NVDA')
+    assert len(signals) == len(indices) > 0
+
+    batch = scanner.label_signal_outcomes_batch(
+        df,
+        indices,
+        [s['entry_price'] for s in signals],
+        [s['target_price'] for s in signals],
+        [s['stop_loss'] for s in signals]
+    )
+
+    for signal, outcome in zip(signals, batch):
+        expected = scanner.label_signal_outcome(
+            'NVDA',
+            signal['signal_date'],
+            signal['entry_price'],
+            signal['target_price'],
+            signal['stop_loss']
+        )
+        assert outcome == expected, f"Outcome mismatch on {signal['signal_date']}"
+
+
+def test_signals_near_end_date_use_later_bars():
+    df = load_analyzed('NVDA_Daily_Complete_TR.csv')
+    indices = scanner.get_strong_buy_indices(df)
+    signals = scanner.extract_tr_signals(df, 'NVDA')
+    levels = [[s[key] for s in signals] for key in ('entry_price', 'target_price', 'stop_loss')]
+
+    full = scanner.label_signal_outcomes_batch(df, indices, *levels)
+
+    # Analysis window ends one bar after a signal whose outcome is decided
+    last = max(i for i, outcome in enumerate(full)
+               if outcome['outcome'] in ('SUCCESS', 'FAILURE') and indices[i] < len(df) - 130)
+    analyzed = df.iloc[:indices[last] + 2]
+
+    without_history = scanner.label_signal_outcomes_batch(analyzed, indices[:last + 1],
+                                                          *[values[:last + 1] for values in levels])
+    assert without_history[last]['outcome'] == 'INSUFFICIENT_DATA'
+
+    labeled = scanner.label_signal_outcomes_batch(analyzed, indices[:last + 1],
+                                                  *[values[:last + 1] for values in levels], history=df)
+    assert labeled == full[:last + 1]
+
+
+if __name__ == '__main__':
+    import pytest
+    pytest.main([__file__, '-q'])
@@ -0,0 +1,58 @@
+"""
+Stock Data Cache Test
+Round-trips a complete TR analysis (object columns like Peak_Date mix ''
+with Timestamps) through StockDataCache with each storage backend
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import cache_storage
+import tr_enhanced as te
+
+ROOT_DIR = Path(__file__).parent.parent
+DATA_DIR = ROOT_DIR / 'data'
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from stock_cache import StockDataCache
+
+
+def load_ohlc(csv_name):
+    df = pd.read_csv(DATA_DIR / csv_name)[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+@pytest.mark.parametrize('storage_format', ['feather', 'parquet', 'pickle'])
+def test_tr_analysis_round_trip(tmp_path, storage_format):
+    if storage_format != 'pickle' and not cache_storage.PYARROW_AVAILABLE:
+        pytest.skip("pyarrow is not installed")
+
+    market_df = te.prepare_market_data(load_ohlc('AAPL_Daily_Complete_TR.csv'))
+    result = te.analyze_prefetched_tr(load_ohlc('NVDA_Daily_Complete_TR.csv'), 'NVDA', market_df=market_df)
+
+    blank = result['Peak_Date'].eq('')
+    assert blank.any() and not blank.all()
+
+    cache = StockDataCache(cache_dir=str(tmp_path), storage_format=storage_format)
+    cache.save_to_cache('NVDA', 'Daily', '1 Year', result)
+    loaded = cache.load_from_cache('NVDA', 'Daily', '1 Year')
+
+    assert loaded is not None
+    assert list(loaded.columns) == list(result.columns)
+
+    if storage_format == 'pickle':
+        pd.testing.assert_frame_equal(loaded, result)
+        return
+
+    # '' (no peak) comes back as NaT, peak dates unchanged
+    peak_dates = pd.to_datetime(result['Peak_Date'].mask(blank))
+    pd.testing.assert_series_equal(loaded['Peak_Date'], peak_dates, check_dtype=False)
+
+    other = result.columns.drop('Peak_Date')
+    pd.testing.assert_frame_equal(loaded[other], result[other], check_dtype=False)
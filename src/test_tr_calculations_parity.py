@@ -0,0 +1,194 @@
+"""
+TR Calculations Parity Test
+Checks that the vectorized primitives in tr_calculations return the same
+values as the original per-bar implementations, on the CSVs in data/:
+rolling percentile rank (Chaikin A/D) and the IBD RS composite with the
+tr_enhanced (stock_lag=0) and rs_calculator (stock_lag=1, strict) lookbacks
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import tr_calculations as tc
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+def load_close(csv_name):
+    df = pd.read_csv(DATA_DIR / csv_name)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df[['Date', 'Close']].dropna().reset_index(drop=True)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ROLLING PERCENTILE RANK (CHAIKIN A/D RANKING)
+# ═══════════════════════════════════════════════════════════════════
+
+def legacy_percentile_rank(series, window, min_periods=None):
+    """Original rolling().apply with one pandas rank per window"""
+    return series.rolling(window, min_periods=min_periods).apply(
+        lambda x: pd.Series(x).rank(pct=True).iloc[-1] * 100, raw=False
+    )
+
+
+def test_rolling_percentile_rank_matches_rolling_apply():
+    close = load_close('NVDA_Daily_Complete_TR.csv')['Close']
+
+    # Whole-dollar closes: many ties within each window
+    rounded = close.round()
+    gapped = close.copy()
+    gapped.iloc[[30, 31, 400]] = np.nan
+
+    for series in [close, rounded, gapped]:
+        for window, min_periods in [(20, None), (252, 63), (52, 13)]:
+            expected = legacy_percentile_rank(series, window, min_periods)
+            actual = tc.rolling_percentile_rank(series, window, min_periods, chunk_size=100)
+
+            pd.testing.assert_series_equal(actual, expected, check_names=False)
+
+    # Full windows only: the first window - 1 bars have no rank
+    actual = tc.rolling_percentile_rank(rounded, 20)
+    assert actual.iloc[:19].isna().all() and actual.iloc[19:].notna().all()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# IBD RELATIVE STRENGTH (tr_enhanced / rs_calculator CONVENTIONS)
+# ═══════════════════════════════════════════════════════════════════
+
+DAILY_PERIODS = {'1yr': 252, '6mo': 126, '3mo': 63, '1mo': 21}
+WEEKLY_PERIODS = {'1yr': 52, '6mo': 26, '3mo': 13, '1mo': 4}
+
+
+WEIGHTS = {'1yr': 0.4, '6mo': 0.2, '3mo': 0.2, '1mo': 0.2}
+
+
+def legacy_tr_enhanced_composite(df, market_data, periods):
+    """Original tr_enhanced per-row loop: past price `period` bars back (NaN = neutral 50)"""
+    composites = []
+    for idx in range(len(df)):
+        if idx < periods['1mo']:
+            composites.append(np.nan)
+            continue
+
+        stock_close = df['Close'].iloc[idx]
+        stock_perf = {}
+        for name, period in periods.items():
+            if idx >= period:
+                past_price = df['Close'].iloc[idx - period]
+                stock_perf[name] = ((stock_close - past_price) / past_price) * 100 if past_price > 0 else 0
+            else:
+                stock_perf[name] = 0
+
+        market_subset = market_data[pd.to_datetime(market_data['Date']) <= df['Date'].iloc[idx]]
+        if len(market_subset) < periods['1mo']:
+            composites.append(np.nan)
+            continue
+
+        market_close = market_subset['Close'].iloc[-1]
+        market_perf = {}
+        for name, period in periods.items():
+            if len(market_subset) >= period:
+                past_market = market_subset['Close'].iloc[-period]
+                market_perf[name] = ((market_close - past_market) / past_market) * 100 if past_market > 0 else 0
+            else:
+                market_perf[name] = 0
+
+        composites.append(sum((stock_perf[k] - market_perf[k]) * WEIGHTS[k] for k in periods))
+
+    return np.array(composites)
+
+
+def legacy_performance(prices, period):
+    """Original rs_calculator.calculate_performance: MORE than `period` bars, `period - 1` back"""
+    if len(prices) > period:
+        past_price = prices.iloc[-period]
+        return ((prices.iloc[-1] - past_price) / past_price) * 100 if past_price > 0 else 0
+    return 0
+
+
+def legacy_rs_calculator_composite(stock_df, market_df, periods):
+    """Original rs_calculator per-row loop (NaN = neutral 50)"""
+    composites = []
+    for idx in range(len(stock_df)):
+        stock_prices = stock_df['Close'].iloc[:idx + 1]
+        market_subset = market_df[market_df['date'] <= stock_df['Date'].iloc[idx]]
+
+        if len(market_subset) < 2:
+            composites.append(np.nan)
+            continue
+
+        composites.append(sum(
+            (legacy_performance(stock_prices, period) - legacy_performance(market_subset['close'], period))
+            * WEIGHTS[name] for name, period in periods.items()
+        ))
+
+    return np.array(composites)
+
+
+def rs_cases():
+    """(stock, market, periods) - the market starts later and misses some bars"""
+    cases = []
+    for stock_csv, market_csv, periods in [
+        ('AAPL_Daily_Complete_TR.csv', 'FTI_Daily_Complete_TR.csv', DAILY_PERIODS),
+        ('IDXX_Weekly_Complete_TR.csv', 'FTI_Weekly_Complete_TR.csv', WEEKLY_PERIODS),
+    ]:
+        stock = load_close(stock_csv)
+        market = load_close(market_csv)
+        market = market.iloc[10:][market.index[10:] % 7 != 3].reset_index(drop=True)
+        cases.append((stock, market, periods))
+    return cases
+
+
+def assert_rs_matches(stock, market, periods, expected, actual_rating, stock_lag, strict):
+    """Composite pinned to the loop's lookback convention, rating on the same rows"""
+    composite = tc.calculate_ibd_rs_composite(
+        stock['Close'].to_numpy(dtype=float), market['Close'].to_numpy(dtype=float),
+        tc.align_to_market(stock['Date'], market['Date']), list(periods.values()),
+        stock_lag=stock_lag, strict=strict
+    )
+    rated = ~np.isnan(expected)
+    assert rated.any() and not rated.all()
+
+    np.testing.assert_allclose(composite[rated], expected[rated], rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(actual_rating[~rated], 50)
+    np.testing.assert_array_equal(actual_rating[rated], tc.rs_composite_to_rating(composite)[rated])
+
+
+def test_ibd_rs_matches_tr_enhanced_loop():
+    import tr_enhanced as te
+
+    for stock, market, periods in rs_cases():
+        if periods is WEEKLY_PERIODS:
+            stock = stock.assign(TimeFrame='Weekly')
+
+        expected = legacy_tr_enhanced_composite(stock, market, periods)
+        actual = te.calculate_relative_strength_ibd(stock, market).to_numpy(dtype=float)
+
+        assert_rs_matches(stock, market, periods, expected, actual, stock_lag=0, strict=False)
+
+
+def test_ibd_rs_matches_rs_calculator_loop():
+    import rs_calculator as rc
+
+    for stock, market, periods in rs_cases():
+        timeframe = 'weekly' if periods is WEEKLY_PERIODS else 'daily'
+
+        expected = legacy_rs_calculator_composite(
+            stock, market.rename(columns={'Date': 'date', 'Close': 'close'}), periods)
+        actual = rc.calculate_relative_strength_ibd(
+            stock, market.rename(columns={'Date': 'date', 'Close': 'close'}), timeframe).to_numpy(dtype=float)
+
+        assert_rs_matches(stock, market, periods, expected, actual, stock_lag=1, strict=True)
+
+
+def test_lookback_returns():
+    close = np.array([10.0, 0.0, 12.0, 15.0, 9.0])
+    positions = np.arange(len(close))
+    valid = positions >= 2
+
+    returns = tc.calculate_lookback_returns(close, positions, 2, valid)
+
+    # 12 vs 10, 15 vs a zero price (skipped), 9 vs 12
+    np.testing.assert_allclose(returns, [0.0, 0.0, 20.0, 0.0, -25.0])
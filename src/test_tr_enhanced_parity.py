@@ -0,0 +1,349 @@
+"""
+TR Enhanced Parity Test
+Checks that the vectorized enhancement stages in tr_enhanced return exactly
+the same columns as the original per-row loops, on the CSVs in data/ and
+on synthetic prices with many ties
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import tr_enhanced as te
+import tr_indicator as ti
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+def load_ohlc(csv_path):
+    """Load only the raw OHLCV columns"""
+    df = pd.read_csv(csv_path)
+    cols = [c for c in ['Date', 'Open', 'High', 'Low', 'Close', 'Volume'] if c in df.columns]
+    df = df[cols].dropna(subset=['Close']).reset_index(drop=True)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def synthetic_ohlc(n=600, seed=7):
+    """Prices rounded to whole dollars (lots of equal highs/lows) with a few gaps"""
+    rng = np.random.default_rng(seed)
+    close = np.round(100 + np.cumsum(rng.normal(0, 2, n)))
+    high = close + rng.integers(0, 3, n)
+    low = close - rng.integers(0, 3, n)
+    if n > 400:
+        high[[50, 51, 300]] = np.nan
+        low[[120, 400]] = np.nan
+    return pd.DataFrame({
+        'Date': pd.bdate_range('2020-01-01', periods=n),
+        'Open': close, 'High': high, 'Low': low, 'Close': close,
+        'Volume': rng.integers(1_000, 10_000, n)
+    })
+
+
+def all_frames():
+    frames = [load_ohlc(p) for p in sorted(DATA_DIR.glob('*.csv'))]
+    frames = [df for df in frames if {'High', 'Low'} <= set(df.columns)]
+    frames.append(synthetic_ohlc())
+    return frames
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ORIGINAL PER-ROW IMPLEMENTATIONS
+# ═══════════════════════════════════════════════════════════════════
+
+def legacy_identify_peaks(df, lookback=5, threshold=0.02):
+    peaks = pd.Series([False] * len(df), index=df.index)
+    for i in range(lookback, len(df) - lookback):
+        window_before = df['High'].iloc[i - lookback:i]
+        window_after = df['High'].iloc[i + 1:i + lookback + 1]
+        current_high = df['High'].iloc[i]
+        if all(current_high >= window_before) and all(current_high >= window_after):
+            window_low = df['Low'].iloc[i - lookback:i + lookback + 1].min()
+            if window_low > 0:
+                if (current_high - window_low) / window_low >= threshold:
+                    peaks.iloc[i] = True
+    return peaks
+
+
+def legacy_identify_valleys(df, lookback=5, threshold=0.02):
+    valleys = pd.Series([False] * len(df), index=df.index)
+    for i in range(lookback, len(df) - lookback):
+        window_before = df['Low'].iloc[i - lookback:i]
+        window_after = df['Low'].iloc[i + 1:i + lookback + 1]
+        current_low = df['Low'].iloc[i]
+        if all(current_low <= window_before) and all(current_low <= window_after):
+            window_high = df['High'].iloc[i - lookback:i + lookback + 1].max()
+            if current_low > 0:
+                if (window_high - current_low) / current_low >= threshold:
+                    valleys.iloc[i] = True
+    return valleys
+
+
+def legacy_calculate_buy_points(df, lookback=50):
+    buy_points = pd.Series([np.nan] * len(df), index=df.index)
+    days_from_peak = pd.Series([np.nan] * len(df), index=df.index)
+    peak_dates = pd.Series([''] * len(df), index=df.index, dtype=object)
+    for i in range(len(df)):
+        search_window = df.iloc[max(0, i - lookback):i]
+        peaks_in_window = search_window[search_window['Peak'] == True]
+        if not peaks_in_window.empty:
+            most_recent_peak = peaks_in_window.iloc[-1]
+            buy_points.iloc[i] = most_recent_peak['High']
+            days_from_peak.iloc[i] = i - df.index.get_loc(peaks_in_window.index[-1])
+            peak_dates.iloc[i] = most_recent_peak['Date']
+    return buy_points, days_from_peak, peak_dates
+
+
+def legacy_add_buy_zone_indicator(df, threshold=5.0):
+    in_buy_zone = []
+    distance_from_bp = []
+    buy_zone_lower = []
+    buy_zone_upper = []
+    for i in range(len(df)):
+        buy_point = df.iloc[i].get('Buy_Point', np.nan)
+        current_price = df.iloc[i]['Close']
+        if pd.notna(buy_point) and buy_point > 0:
+            distance_pct = ((current_price - buy_point) / buy_point) * 100
+            in_zone = -threshold <= distance_pct <= threshold
+            lower_bound = buy_point * (1 - threshold / 100)
+            upper_bound = buy_point * (1 + threshold / 100)
+            in_buy_zone.append(in_zone)
+            distance_from_bp.append(distance_pct)
+            buy_zone_lower.append(lower_bound)
+            buy_zone_upper.append(upper_bound)
+        else:
+            in_buy_zone.append(False)
+            distance_from_bp.append(np.nan)
+            buy_zone_lower.append(np.nan)
+            buy_zone_upper.append(np.nan)
+    df['In_Buy_Zone'] = in_buy_zone
+    df['Distance_From_BP'] = distance_from_bp
+    df['Buy_Zone_Lower'] = buy_zone_lower
+    df['Buy_Zone_Upper'] = buy_zone_upper
+    return df
+
+
+def legacy_calculate_stop_loss(df, stop_percentage=8.0):
+    stop_loss = pd.Series([np.nan] * len(df), index=df.index)
+    risk_per_share = pd.Series([np.nan] * len(df), index=df.index)
+    risk_percentage = pd.Series([np.nan] * len(df), index=df.index)
+    for i in range(len(df)):
+        buy_point = df.iloc[i].get('Buy_Point', np.nan)
+        if pd.notna(buy_point) and buy_point > 0:
+            stop_price = buy_point * (1 - stop_percentage / 100)
+            stop_loss.iloc[i] = stop_price
+            risk_per_share.iloc[i] = buy_point - stop_price
+            risk_percentage.iloc[i] = stop_percentage
+    df['Stop_Loss'] = stop_loss
+    df['Risk_Per_Share'] = risk_per_share
+    df['Risk_Percentage'] = risk_percentage
+    return df
+
+
+def legacy_identify_buy_and_exit_signals(df):
+    buy_signals = []
+    exit_signals = []
+    exit_reasons = []
+    for i in range(len(df)):
+        buy_signal = False
+        exit_signal = False
+        exit_reason = ''
+        current_status = df.iloc[i]['TR_Status']
+        current_price = df.iloc[i]['Close']
+        in_buy_zone = df.iloc[i].get('In_Buy_Zone', False)
+        stop_loss = df.iloc[i].get('Stop_Loss', np.nan)
+        if in_buy_zone and current_status in ['Buy', 'Strong Buy']:
+            if i > 0:
+                prev_status = df.iloc[i - 1]['TR_Status']
+                prev_in_zone = df.iloc[i - 1].get('In_Buy_Zone', False)
+                just_entered_uptrend = (
+                    current_status in ['Buy', 'Strong Buy'] and
+                    prev_status not in ['Buy', 'Strong Buy'] and
+                    in_buy_zone
+                )
+                just_entered_zone = (
+                    in_buy_zone and 
+                    not prev_in_zone and
+                    current_status in ['Buy', 'Strong Buy']
+                )
+                upgraded_to_stage3 = (
+                    current_status == 'Strong Buy' and
+                    prev_status == 'Buy' and
+                    in_buy_zone
+                )
+                if just_entered_uptrend or just_entered_zone or upgraded_to_stage3:
+                    buy_signal = True
+            else:
+                if in_buy_zone and current_status in ['Buy', 'Strong Buy']:
+                    buy_signal = True
+        if i > 0:
+            prev_status = df.iloc[i - 1]['TR_Status']
+            if pd.notna(stop_loss) and current_price <= stop_loss:
+                exit_signal = True
+                exit_reason = f'Stop Loss Hit (${stop_loss:.2f})'
+            elif current_status in ['Sell', 'Strong Sell'] and prev_status not in ['Sell', 'Strong Sell']:
+                exit_signal = True
+                exit_reason = f'TR Sell Signal ({current_status})'
+            elif current_status == 'Neutral Sell' and prev_status in ['Buy', 'Strong Buy', 'Neutral Buy']:
+                exit_signal = True
+                exit_reason = 'Downtrend Starting (Neutral Sell)'
+        buy_signals.append(buy_signal)
+        exit_signals.append(exit_signal)
+        exit_reasons.append(exit_reason)
+    df['Buy_Signal'] = buy_signals
+    df['Exit_Signal'] = exit_signals
+    df['Exit_Reason'] = exit_reasons
+    return df
+
+
+def legacy_add_tr_enhancements(df):
+    enhanced_status = []
+    for idx in range(len(df)):
+        base_status = df.iloc[idx]['TR_Status']
+        status = base_status
+        arrow = te.detect_fresh_trend_start(df, idx)
+        if arrow:
+            status = f"{status} {arrow}"
+        if te.check_near_buy_point(df, idx):
+            status = f"{status} ✓"
+        enhanced_status.append(status)
+    df['TR_Status_Enhanced'] = enhanced_status
+    return df
+
+
+def legacy_add_star_for_strong_stocks(df):
+    enhanced_status = []
+    for idx in range(len(df)):
+        status = df.iloc[idx]['TR_Status_Enhanced']
+        if te.check_strong_stock(df, idx):
+            status = f"{status} *"
+        enhanced_status.append(status)
+    df['TR_Status_Enhanced'] = enhanced_status
+    return df
+
+
+def legacy_add_signal_markers(df):
+    enhanced_status = []
+    for i in range(len(df)):
+        status = df.iloc[i]['TR_Status_Enhanced']
+        if df.iloc[i]['Buy_Signal']:
+            status = f"{status} 🔵BUY"
+        if df.iloc[i]['Exit_Signal']:
+            status = f"{status} 🔴EXIT"
+        enhanced_status.append(status)
+    df['TR_Status_Enhanced'] = enhanced_status
+    return df
+
+
+LEGACY_STAGES = [
+    legacy_add_buy_zone_indicator,
+    legacy_calculate_stop_loss,
+    legacy_identify_buy_and_exit_signals,
+    legacy_add_tr_enhancements,
+    legacy_add_star_for_strong_stocks,
+    legacy_add_signal_markers
+]
+
+STAGES = [
+    te.add_buy_zone_indicator,
+    te.calculate_stop_loss,
+    te.identify_buy_and_exit_signals,
+    te.add_tr_enhancements,
+    te.add_star_for_strong_stocks,
+    te.add_signal_markers
+]
+
+
+FLAG_COLUMNS = ['Fresh_Uptrend', 'Fresh_Downtrend', 'Near_Buy_Point', 'Strong_Stock']
+
+
+def as_legacy(df):
+    """Drop the stage flag columns and decode the categorical status columns"""
+    df = df.drop(columns=[c for c in FLAG_COLUMNS if c in df.columns])
+    for column in ['TR_Status', 'TR_Status_Enhanced']:
+        if column in df.columns:
+            df[column] = df[column].astype(object)
+    return df
+
+
+def analyzed_frame(df, seed=3):
+    """TR status, buy points and RS/Chaikin (random, with values at 95) ready for the signal stages"""
+    rng = np.random.default_rng(seed)
+    df = ti.analyze_tr_indicator(df.copy())
+    df = te.calculate_buy_points(te.add_peaks_and_valleys(df))
+    df['RS'] = rng.choice([50.0, 94.9, 95.0, 99.0, np.nan], len(df))
+    df['Chaikin_AD'] = rng.choice([50.0, 95.0, 97.5], len(df))
+    return df
+
+
+# ═══════════════════════════════════════════════════════════════════
+# TESTS
+# ═══════════════════════════════════════════════════════════════════
+
+def test_peaks_and_valleys_parity():
+    for df in all_frames():
+        for lookback in (3, 5):
+            assert te.identify_peaks(df, lookback).tolist() == legacy_identify_peaks(df, lookback).tolist()
+            assert te.identify_valleys(df, lookback).tolist() == legacy_identify_valleys(df, lookback).tolist()
+
+
+def test_short_frames_have_no_peaks():
+    df = synthetic_ohlc(n=8)
+    assert not te.identify_peaks(df).any()
+    assert not te.identify_valleys(df).any()
+
+
+def test_buy_points_parity():
+    for df in all_frames():
+        for lookback in (10, 50):
+            df = te.add_peaks_and_valleys(df)
+            buy_points, days_from_peak, peak_dates = legacy_calculate_buy_points(df, lookback)
+            result = te.calculate_buy_points(df.copy(), lookback)
+
+            pd.testing.assert_series_equal(result['Buy_Point'], buy_points, check_names=False)
+            pd.testing.assert_series_equal(result['Days_From_Peak'], days_from_peak, check_names=False)
+            assert result['Peak_Date'].tolist() == peak_dates.tolist()
+
+
+def test_signal_stages_parity():
+    for df in all_frames():
+        df = analyzed_frame(df)
+        expected, actual = df.copy(), df.copy()
+
+        for legacy_stage, stage in zip(LEGACY_STAGES, STAGES):
+            expected = legacy_stage(expected)
+            actual = stage(actual)
+            pd.testing.assert_frame_equal(as_legacy(actual), as_legacy(expected), obj=stage.__name__)
+
+
+
+def test_stage_codes_without_stage_column():
+    df = analyzed_frame(synthetic_ohlc())
+    with_codes = df.copy()
+    without_codes = df.drop(columns=['TR_Stage'])
+
+    for stage in STAGES:
+        with_codes = stage(with_codes)
+        without_codes = stage(without_codes)
+
+    pd.testing.assert_frame_equal(without_codes, with_codes.drop(columns=['TR_Stage']))
+
+
+def test_stage_parsed_from_enhanced_status():
+    assert ti.tr_stage_from_status('Strong Buy ↑ ✓ * 🔵BUY') == 3
+    assert ti.tr_stage_from_status('Neutral Buy ↑') == 1
+    assert ti.tr_stage_from_status('Sell 🔴EXIT') == -2
+    assert ti.tr_stage_from_status('Neutral') == 0
+    assert ti.tr_stage_from_status('N/A') is None
+    assert ti.tr_stage_from_status(None) is None
+
+
+if __name__ == '__main__':
+    test_peaks_and_valleys_parity()
+    test_short_frames_have_no_peaks()
+    test_buy_points_parity()
+    test_signal_stages_parity()
+    test_stage_codes_without_stage_column()
+    test_stage_parsed_from_enhanced_status()
+    print("✅ TR enhanced parity OK")
@@ -0,0 +1,104 @@
+"""
+TR Streaming State Test
+Checks that TRState.update (one bar at a time) gives exactly the last row
+of analyze_prefetched_tr on the same history, for daily and weekly bars,
+through intraday revisions and a checkpoint round trip
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+import tr_enhanced as te
+from tr_state import TRState
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+
+
+def load_ohlcv(csv_name):
+    df = pd.read_csv(DATA_DIR / csv_name)[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+STOCK = load_ohlcv('NVDA_Daily_Complete_TR.csv')
+MARKET = load_ohlcv('XOM_Daily_Complete_TR.csv')
+
+
+def market_bar(date):
+    bars = MARKET[MARKET['Date'] == date]
+    return bars.iloc[0] if len(bars) else None
+
+
+def assert_matches_full(state, k, timeframe):
+    """state.latest == last row of the full analysis of the first k+1 bars"""
+    date = STOCK['Date'].iloc[k]
+    market = te.prepare_market_data(MARKET[MARKET['Date'] <= date], timeframe)
+    expected = te.analyze_prefetched_tr(STOCK.iloc[:k + 1], timeframe=timeframe, market_df=market).iloc[-1]
+
+    for column, value in state.latest.items():
+        if pd.isna(value) and pd.isna(expected[column]):
+            continue
+        assert value == expected[column], f"{timeframe} bar {k}: {column} {value!r} != {expected[column]!r}"
+
+
+def test_streaming_matches_full_recompute():
+    for timeframe in ['daily', 'weekly']:
+        state = TRState.from_history(STOCK.iloc[:300], timeframe, market_df=MARKET)
+
+        for k in range(300, 620):
+            bar = STOCK.iloc[k]
+            state.update(bar, market_bar=market_bar(bar['Date']))
+
+            if k % 40 == 0:
+                assert_matches_full(state, k, timeframe)
+
+
+def test_revising_latest_bar():
+    for timeframe in ['daily', 'weekly']:
+        state = TRState.from_history(STOCK.iloc[:400], timeframe, market_df=MARKET)
+
+        for k in range(400, 430):
+            bar = STOCK.iloc[k]
+
+            # Intraday snapshot first, then the final bar for the same date
+            intraday = bar.copy()
+            intraday[['High', 'Close']] = bar['Close'] * 1.04
+            intraday['Volume'] = bar['Volume'] / 3
+            state.update(intraday, market_bar=market_bar(bar['Date']))
+            state.update(bar, market_bar=market_bar(bar['Date']))
+
+        assert_matches_full(state, 429, timeframe)
+
+
+def test_checkpoint_round_trip():
+    for timeframe in ['daily', 'weekly']:
+        state = TRState.from_history(STOCK.iloc[:500], timeframe, market_df=MARKET)
+        restored = TRState.from_checkpoint(json.loads(json.dumps(state.to_checkpoint())))
+
+        for k in range(500, 540):
+            bar = STOCK.iloc[k]
+            expected = state.update(bar, market_bar=market_bar(bar['Date']))
+            assert restored.update(bar, market_bar=market_bar(bar['Date'])) == expected
+
+        for column, value in restored.latest.items():
+            assert value == state.latest[column] or (pd.isna(value) and pd.isna(state.latest[column])), column
+
+
+def test_split_requires_rebuild():
+    state = TRState.from_history(STOCK.iloc[:300])
+    bar = STOCK.iloc[300].copy()
+    bar[['Open', 'High', 'Low', 'Close']] = bar[['Open', 'High', 'Low', 'Close']] / 4
+    bar['Volume'] = bar['Volume'] * 4
+
+    assert state.update(bar) is None
+    assert state.needs_rebuild
+
+
+if __name__ == '__main__':
+    test_streaming_matches_full_recompute()
+    test_revising_latest_bar()
+    test_checkpoint_round_trip()
+    test_split_requires_rebuild()
+    print("✅ TR streaming state OK")
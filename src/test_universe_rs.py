@@ -0,0 +1,73 @@
+"""
+Universe RS Test
+Cross-sectional ranking of the IBD composite, delisted symbols dropping
+out of the ranking, and the as-of lookup of persisted ratings (stale
+ratings are not used)
+"""
+
+import numpy as np
+import pandas as pd
+
+import universe_rs as ur
+
+DATES = pd.bdate_range('2023-01-02', periods=300)
+
+
+def test_rank_cross_sectional():
+    composite = np.array([
+        [10.0, 20.0, 30.0, np.nan],
+        [5.0, 5.0, -1.0, 7.0]
+    ])
+    ratings = ur.rank_cross_sectional(composite)
+
+    # 3 ranked symbols: 1/3, 2/3, 3/3 of the universe
+    np.testing.assert_allclose(ratings[0, :3], np.round(1 + np.array([1, 2, 3]) / 3 * 98, 1))
+    assert np.isnan(ratings[0, 3])
+
+    # Ties share the average rank
+    assert ratings[1, 0] == ratings[1, 1] == np.round(1 + 2.5 / 4 * 98, 1)
+    assert ratings[1, 2] < ratings[1, 0] < ratings[1, 3]
+
+
+def test_delisted_symbol_drops_out():
+    growth = np.linspace(1.0, 2.0, len(DATES))
+    closes = pd.DataFrame({'AAA': 100 * growth, 'BBB': 50 * growth ** 2, 'CCC': 80 / growth}, index=DATES)
+    closes.iloc[260:, 1] = np.nan  # BBB delisted
+
+    ratings = ur.compute_universe_rs(closes)
+    limit = ur.MAX_FILL_BARS['daily']
+
+    # Carried over for a few bars, then no longer ranked
+    assert ratings['BBB'].iloc[260:260 + limit].notna().all()
+    assert ratings['BBB'].iloc[260 + limit:].isna().all()
+    assert ratings[['AAA', 'CCC']].iloc[-1].notna().all()
+
+    # Stronger composite -> higher rating
+    assert ratings['BBB'].iloc[255] > ratings['AAA'].iloc[255] > ratings['CCC'].iloc[255]
+
+
+def test_lookup_is_as_of_and_skips_stale_ratings(tmp_path, monkeypatch):
+    monkeypatch.setattr(ur, 'RS_DIR', tmp_path)
+
+    rating_dates = DATES[:200]
+    ratings = pd.DataFrame({'AAA': np.arange(200, dtype=float) % 99 + 1}, index=pd.Index(rating_dates, name='Date'))
+    ur.save_universe_rs(ratings)
+
+    # Bars before, inside and long after the stored ratings (job stopped)
+    bars = pd.DataFrame({'Date': pd.date_range('2022-12-28', periods=300, freq='D')})
+    rs = ur.lookup_universe_rs(bars, 'aaa')
+
+    position = np.searchsorted(rating_dates.to_numpy(), bars['Date'].to_numpy(), side='right') - 1
+    age = bars['Date'].to_numpy() - rating_dates.to_numpy()[np.maximum(position, 0)]
+    expected = np.where((position >= 0) & (age <= ur.MAX_RATING_AGE['daily'].to_timedelta64()),
+                        ratings['AAA'].to_numpy()[np.maximum(position, 0)], np.nan)
+
+    np.testing.assert_array_equal(rs.to_numpy(), expected)
+    assert rs.iloc[:5].isna().all()     # before the first rating
+    assert rs.iloc[-1:].isna().all()    # weeks after the last rating
+
+    # Saturday bar -> Friday's rating
+    assert rs.iloc[10] == ratings['AAA'].loc[:bars['Date'].iloc[10]].iloc[-1]
+
+    assert ur.lookup_universe_rs(bars, 'ZZZ') is None
+
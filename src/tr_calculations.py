@@ -150,4 +150,165 @@ def is_series1_above_series2(series1, series2):
 
 def is_series1_below_series2(series1, series2):
     """Check if series1 is below series2"""
-    return series1 < series2
\ No newline at end of file
+    return series1 < series2
+
+def rolling_percentile_rank(series, window, min_periods=None, chunk_size=4096):
+    """
+    Percentile rank (0-100) of each value within its trailing window
+    
+    Same result as
+        series.rolling(window, min_periods).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1] * 100)
+    (average rank for ties, NaNs ignored) without building a Series per window:
+    each window is compared against its last value with a vectorized
+    sliding-window count.
+    
+    Args:
+        series (pd.Series): Data series
+        window (int): Window length
+        min_periods (int): Minimum non-NaN values in the window (default: window)
+        chunk_size (int): Windows compared per batch (bounds memory to chunk_size x window)
+    
+    Returns:
+        pd.Series: Percentile rank 0-100 (NaN where not enough data)
+    """
+    if min_periods is None:
+        min_periods = window
+    
+    values = series.to_numpy(dtype=float)
+    n = len(values)
+    result = np.full(n, np.nan)
+    
+    if n == 0 or window <= 0:
+        return pd.Series(result, index=series.index)
+    
+    # Pad the front so the first bars get partial windows, like rolling()
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    
+    for start in range(0, n, chunk_size):
+        chunk = windows[start:start + chunk_size]
+        current = chunk[:, -1:]
+        
+        less = np.sum(chunk < current, axis=1)
+        equal = np.sum(chunk == current, axis=1)
+        valid = np.sum(~np.isnan(chunk), axis=1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = (less + (equal + 1) / 2) / valid * 100
+        
+        ok = (valid >= min_periods) & ~np.isnan(current[:, 0])
+        result[start:start + len(chunk)] = np.where(ok, pct, np.nan)
+    
+    return pd.Series(result, index=series.index)
+
+
+# IBD RS weights: 40% last year, 20% last 6mo, 20% last 3mo, 20% last month
+IBD_RS_WEIGHTS = (0.40, 0.20, 0.20, 0.20)
+
+
+def align_to_market(stock_dates, market_dates):
+    """
+    As-of alignment of stock bars to market bars
+    
+    Args:
+        stock_dates: Stock dates (any type pd.to_datetime understands)
+        market_dates: Market dates, sorted ascending
+    
+    Returns:
+        np.ndarray: For each stock bar, the number of market bars on or
+                    before its date (0 = no market data yet)
+    """
+    stock_dates = pd.to_datetime(pd.Series(stock_dates)).to_numpy()
+    market_dates = pd.to_datetime(pd.Series(market_dates)).to_numpy()
+    
+    return np.searchsorted(market_dates, stock_dates, side='right')
+
+
+def calculate_lookback_returns(close, positions, period, valid):
+    """
+    Percent return from close[positions - period] to close[positions]
+    for every position at once
+    
+    Args:
+        close (np.ndarray): Close prices
+        positions (np.ndarray): Index of the "current" bar for each row
+        period (int): Lookback length in bars
+        valid (np.ndarray): Rows where the lookback is allowed
+    
+    Returns:
+        np.ndarray: % returns (0 where not valid or past price <= 0)
+    """
+    if len(close) == 0:
+        return np.zeros(len(positions))
+    
+    past_idx = np.clip(positions - period, 0, len(close) - 1)
+    cur_idx = np.clip(positions, 0, len(close) - 1)
+    
+    past = close[past_idx]
+    current = close[cur_idx]
+    ok = valid & (past > 0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        perf = (current - past) / past * 100
+    
+    return np.where(ok, perf, 0.0)
+
+
+def calculate_ibd_rs_composite(stock_close, market_close, market_count, periods, stock_lag=0, strict=False):
+    """
+    Weighted IBD composite of stock-vs-market outperformance for every bar
+    
+    Args:
+        stock_close (np.ndarray): Stock closes
+        market_close (np.ndarray): Market closes, sorted by date
+        market_count (np.ndarray): From align_to_market
+        periods (list): Lookbacks in bars, ordered 1yr, 6mo, 3mo, 1mo
+        stock_lag (int): Stock past bar is (idx + stock_lag - period)
+        strict (bool): Require MORE than `period` bars of history
+                       (instead of at least `period`)
+    
+    Returns:
+        np.ndarray: Weighted composite (% outperformance)
+    """
+    stock_close = np.asarray(stock_close, dtype=float)
+    market_close = np.asarray(market_close, dtype=float)
+    market_count = np.asarray(market_count)
+    
+    stock_pos = np.arange(len(stock_close))
+    stock_bars = stock_pos + stock_lag
+    market_cur = market_count - 1
+    
+    composite = np.zeros(len(stock_close))
+    
+    for period, weight in zip(periods, IBD_RS_WEIGHTS):
+        stock_valid = stock_bars > period if strict else stock_bars >= period
+        market_valid = market_count > period if strict else market_count >= period
+        
+        # Stock: close[idx] vs close[idx + stock_lag - period]
+        stock_perf = calculate_lookback_returns(stock_close, stock_pos, period - stock_lag, stock_valid)
+        
+        # Market: latest bar on/before the stock date vs `period - 1` bars earlier
+        market_perf = calculate_lookback_returns(market_close, market_cur, period - 1, market_valid)
+        
+        composite += (stock_perf - market_perf) * weight
+    
+    return composite
+
+
+def rs_composite_to_rating(composite):
+    """
+    Convert composite outperformance to the 0-99 RS scale
+    
+    -50% or worse -> 1, +50% or better -> 99, linear in between
+    
+    Args:
+        composite (np.ndarray): Weighted composite
+    
+    Returns:
+        np.ndarray: RS rating rounded to 0.1
+    """
+    composite = np.asarray(composite, dtype=float)
+    rating = ((composite + 50) / 100) * 98 + 1
+    rating = np.where(composite >= 50, 99, np.where(composite <= -50, 1, rating))
+    
+    return np.round(rating, 1)
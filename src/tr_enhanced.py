@@ -25,8 +25,14 @@ from tr_calculations import (
     calculate_pmo,
     calculate_slope,
     detect_crossover,
-    detect_crossunder
+    detect_crossunder,
+    align_to_market,
+    calculate_ibd_rs_composite,
+    rs_composite_to_rating,
+    rolling_percentile_rank
 )
+from tr_indicator import TR_STAGE_NAMES, tr_stage_from_status
+from universal_cache import RESAMPLE_RULES, resample_ohlcv
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -103,49 +109,22 @@ def calculate_relative_strength_ibd(df, market_data=None):
     # Set periods based on timeframe
     periods = {'1yr': 252, '6mo': 126, '3mo': 63, '1mo': 21} if timeframe == 'daily' else {'1yr': 52, '6mo': 26, '3mo': 13, '1mo': 4}
     
-    # Calculate RS for each row
-    rs_values = []
-    for idx in range(len(df)):
-        if idx < periods['1mo']:
-            rs_values.append(50)
-            continue
-        
-        # Stock performance
-        stock_close = df['Close'].iloc[idx]
-        stock_perf = {}
-        for period_name, period_len in periods.items():
-            if idx >= period_len:
-                past_price = df['Close'].iloc[idx - period_len]
-                stock_perf[period_name] = ((stock_close - past_price) / past_price) * 100 if past_price > 0 else 0
-            else:
-                stock_perf[period_name] = 0
-        
-        # Market performance
-        stock_date = pd.to_datetime(df['Date'].iloc[idx])
-        market_subset = market_data[pd.to_datetime(market_data['Date']) <= stock_date]
-        
-        if len(market_subset) < periods['1mo']:
-            rs_values.append(50)
-            continue
-        
-        market_close = market_subset['Close'].iloc[-1]
-        market_perf = {}
-        for period_name, period_len in periods.items():
-            if len(market_subset) >= period_len:
-                past_market = market_subset['Close'].iloc[-period_len]
-                market_perf[period_name] = ((market_close - past_market) / past_market) * 100 if past_market > 0 else 0
-            else:
-                market_perf[period_name] = 0
-        
-        # Relative performance (stock vs market)
-        rel_perf = {k: stock_perf[k] - market_perf[k] for k in periods.keys()}
-        
-        # Weighted composite (IBD method)
-        composite = rel_perf['1yr'] * 0.4 + rel_perf['6mo'] * 0.2 + rel_perf['3mo'] * 0.2 + rel_perf['1mo'] * 0.2
-        
-        # Convert to 0-99 scale
-        rs_score = 99 if composite >= 50 else (1 if composite <= -50 else ((composite + 50) / 100) * 98 + 1)
-        rs_values.append(round(rs_score, 1))
+    # Align stock and market closes ONCE (as-of: last market bar on/before each stock date)
+    market_sorted = market_data.assign(Date=pd.to_datetime(market_data['Date'])).sort_values('Date', kind='stable')
+    market_count = align_to_market(df['Date'], market_sorted['Date'])
+    
+    # Weighted composite (IBD method) of the four lookback returns, all rows at once
+    composite = calculate_ibd_rs_composite(
+        df['Close'].to_numpy(dtype=float),
+        market_sorted['Close'].to_numpy(dtype=float),
+        market_count,
+        list(periods.values())
+    )
+    
+    # Convert to 0-99 scale (neutral 50 until a month of stock and market history)
+    rs_values = rs_composite_to_rating(composite)
+    warmup = (np.arange(len(df)) < periods['1mo']) | (market_count < periods['1mo'])
+    rs_values = np.where(warmup, 50, rs_values)
     
     return pd.Series(rs_values, index=df.index)
 
@@ -200,21 +179,24 @@ def calculate_chaikin_ad(df):
     # Percentile rank over appropriate period
     min_periods = max(10, ranking_period // 4)
     
-    ad_percentile = ad_line.rolling(ranking_period, min_periods=min_periods).apply(
-        lambda x: (pd.Series(x).rank(pct=True).iloc[-1] * 100) if len(x) >= min_periods else 50,
-        raw=False
-    )
+    ad_percentile = rolling_percentile_rank(ad_line, ranking_period, min_periods)
     
     return ad_percentile.fillna(50).clip(0, 100)
 
 
-def add_strength_indicators(df, market_data=None):
+def add_strength_indicators(df, market_data=None, ticker=None, timeframe='daily'):
     """
     Add Relative Strength and Chaikin A/D to dataframe
     
+    RS uses the universe-wide percentile rating (universe_rs job) when it
+    has been computed for this ticker, and the stock-vs-market IBD
+    calculation for bars it does not cover.
+    
     Args:
         df (pd.DataFrame): Stock data
         market_data (pd.DataFrame): Market data (optional)
+        ticker (str): Stock symbol for the universe RS lookup (optional)
+        timeframe (str): 'daily' or 'weekly'
     
     Returns:
         pd.DataFrame: Data with RS and Chaikin_AD columns
@@ -222,6 +204,13 @@ def add_strength_indicators(df, market_data=None):
     # Calculate RS using IBD method (timeframe-aware)
     df['RS'] = calculate_relative_strength_ibd(df, market_data)
     
+    # Prefer the cross-sectional RS Rating (ranked against all stocks)
+    if ticker is not None:
+        from universe_rs import lookup_universe_rs
+        universe_rs = lookup_universe_rs(df, ticker, timeframe)
+        if universe_rs is not None:
+            df['RS'] = universe_rs.fillna(df['RS'])
+    
     # Calculate Chaikin A/D
     df['Chaikin_AD'] = calculate_chaikin_ad(df)
     
@@ -260,18 +249,13 @@ def add_star_for_strong_stocks(df):
     Returns:
         pd.DataFrame: Data with updated TR_Status_Enhanced
     """
-    enhanced_status = []
-    
-    for idx in range(len(df)):
-        status = df.iloc[idx]['TR_Status_Enhanced']
-        
-        # Add star if strong stock
-        if check_strong_stock(df, idx):
-            status = f"{status} *"
-        
-        enhanced_status.append(status)
+    # Add star if strong stock
+    if 'RS' in df.columns and 'Chaikin_AD' in df.columns:
+        df['Strong_Stock'] = (df['RS'].to_numpy(dtype=float) >= 95) & (df['Chaikin_AD'].to_numpy(dtype=float) >= 95)
+    else:
+        df['Strong_Stock'] = False
     
-    df['TR_Status_Enhanced'] = enhanced_status
+    df['TR_Status_Enhanced'] = compose_tr_status_enhanced(df)
     
     return df
 
@@ -296,25 +280,18 @@ def identify_peaks(df, lookback=5, threshold=0.02):
     Returns:
         pd.Series: Boolean series (True = peak)
     """
-    peaks = pd.Series([False] * len(df), index=df.index)
+    window = 2 * lookback + 1
+    high = df['High']
     
-    for i in range(lookback, len(df) - lookback):
-        # Get window around current point
-        window_before = df['High'].iloc[i - lookback:i]
-        window_after = df['High'].iloc[i + 1:i + lookback + 1]
-        current_high = df['High'].iloc[i]
-        
-        # Check if current is highest in window
-        is_highest_before = all(current_high >= window_before)
-        is_highest_after = all(current_high >= window_after)
-        
-        if is_highest_before and is_highest_after:
-            # Check if move is significant enough
-            window_low = df['Low'].iloc[i - lookback:i + lookback + 1].min()
-            if window_low > 0:
-                pct_move = (current_high - window_low) / window_low
-                if pct_move >= threshold:
-                    peaks.iloc[i] = True
+    # Highest within lookback on both sides (>=, so equal highs all qualify).
+    # Centered windows are incomplete at the edges -> NaN -> never a peak
+    is_highest = high >= high.rolling(window, center=True).max()
+    
+    # Check if move is significant enough
+    window_low = df['Low'].rolling(window, center=True, min_periods=1).min()
+    pct_move = (high - window_low) / window_low
+    
+    peaks = is_highest & (window_low > 0) & (pct_move >= threshold)
     
     return peaks
 
@@ -335,25 +312,18 @@ def identify_valleys(df, lookback=5, threshold=0.02):
     Returns:
         pd.Series: Boolean series (True = valley)
     """
-    valleys = pd.Series([False] * len(df), index=df.index)
+    window = 2 * lookback + 1
+    low = df['Low']
     
-    for i in range(lookback, len(df) - lookback):
-        # Get window around current point
-        window_before = df['Low'].iloc[i - lookback:i]
-        window_after = df['Low'].iloc[i + 1:i + lookback + 1]
-        current_low = df['Low'].iloc[i]
-        
-        # Check if current is lowest in window
-        is_lowest_before = all(current_low <= window_before)
-        is_lowest_after = all(current_low <= window_after)
-        
-        if is_lowest_before and is_lowest_after:
-            # Check if move is significant enough
-            window_high = df['High'].iloc[i - lookback:i + lookback + 1].max()
-            if current_low > 0:
-                pct_move = (window_high - current_low) / current_low
-                if pct_move >= threshold:
-                    valleys.iloc[i] = True
+    # Lowest within lookback on both sides (<=, so equal lows all qualify).
+    # Centered windows are incomplete at the edges -> NaN -> never a valley
+    is_lowest = low <= low.rolling(window, center=True).min()
+    
+    # Check if move is significant enough
+    window_high = df['High'].rolling(window, center=True, min_periods=1).max()
+    pct_move = (window_high - low) / low
+    
+    valleys = is_lowest & (low > 0) & (pct_move >= threshold)
     
     return valleys
 
@@ -401,9 +371,9 @@ def calculate_buy_points(df, lookback=50):
     Returns:
         pd.DataFrame: Data with Buy_Point and Days_From_Peak columns
     """
-    buy_points = pd.Series([np.nan] * len(df), index=df.index)
-    days_from_peak = pd.Series([np.nan] * len(df), index=df.index)
-    peak_dates = pd.Series([''] * len(df), index=df.index)
+    buy_points = np.full(len(df), np.nan)
+    days_from_peak = np.full(len(df), np.nan)
+    peak_dates = np.full(len(df), '', dtype=object)
     
     if 'Peak' not in df.columns:
         df['Buy_Point'] = buy_points
@@ -411,28 +381,20 @@ def calculate_buy_points(df, lookback=50):
         df['Peak_Date'] = peak_dates
         return df
     
-    for i in range(len(df)):
-        # Find the most recent peak before current bar
-        search_start = max(0, i - lookback)
-        search_window = df.iloc[search_start:i]
-        
-        # Get all peaks in the window
-        peaks_in_window = search_window[search_window['Peak'] == True]
-        
-        if not peaks_in_window.empty:
-            # Get the most recent peak
-            most_recent_peak = peaks_in_window.iloc[-1]
-            peak_high = most_recent_peak['High']
-            peak_date = most_recent_peak['Date']
-            
-            # Calculate days from peak
-            peak_position = df.index.get_loc(peaks_in_window.index[-1])
-            days_since = i - peak_position
-            
-            # Set buy point as the peak high
-            buy_points.iloc[i] = peak_high
-            days_from_peak.iloc[i] = days_since
-            peak_dates.iloc[i] = peak_date
+    # Position of the most recent peak BEFORE each bar (-1 = none yet)
+    positions = np.arange(len(df))
+    peak_positions = np.where(df['Peak'].to_numpy() == True, positions, -1)
+    last_peak = np.maximum.accumulate(np.concatenate(([-1], peak_positions[:-1])))[:len(df)]
+    
+    # Only peaks within the lookback window count
+    days_since = positions - last_peak
+    has_peak = (last_peak >= 0) & (days_since <= lookback)
+    peak_idx = last_peak[has_peak]
+    
+    # Set buy point as the peak high
+    buy_points[has_peak] = df['High'].to_numpy(dtype=float)[peak_idx]
+    days_from_peak[has_peak] = days_since[has_peak]
+    peak_dates[has_peak] = df['Date'].to_numpy(dtype=object)[peak_idx]
     
     df['Buy_Point'] = buy_points
     df['Days_From_Peak'] = days_from_peak
@@ -458,40 +420,18 @@ def add_buy_zone_indicator(df, threshold=5.0):
     Returns:
         pd.DataFrame: Data with In_Buy_Zone and Distance_From_BP columns
     """
-    in_buy_zone = []
-    distance_from_bp = []
-    buy_zone_lower = []
-    buy_zone_upper = []
-    
-    for i in range(len(df)):
-        buy_point = df.iloc[i].get('Buy_Point', np.nan)
-        current_price = df.iloc[i]['Close']
-        
-        if pd.notna(buy_point) and buy_point > 0:
-            # Calculate distance from buy point
-            distance_pct = ((current_price - buy_point) / buy_point) * 100
-            
-            # Check if in buy zone
-            in_zone = -threshold <= distance_pct <= threshold
-            
-            # Calculate zone boundaries
-            lower_bound = buy_point * (1 - threshold / 100)
-            upper_bound = buy_point * (1 + threshold / 100)
-            
-            in_buy_zone.append(in_zone)
-            distance_from_bp.append(distance_pct)
-            buy_zone_lower.append(lower_bound)
-            buy_zone_upper.append(upper_bound)
-        else:
-            in_buy_zone.append(False)
-            distance_from_bp.append(np.nan)
-            buy_zone_lower.append(np.nan)
-            buy_zone_upper.append(np.nan)
-    
-    df['In_Buy_Zone'] = in_buy_zone
-    df['Distance_From_BP'] = distance_from_bp
-    df['Buy_Zone_Lower'] = buy_zone_lower
-    df['Buy_Zone_Upper'] = buy_zone_upper
+    buy_point = _valid_buy_points(df)
+    
+    # Calculate distance from buy point
+    distance_pct = ((df['Close'].to_numpy(dtype=float) - buy_point) / buy_point) * 100
+    
+    # Check if in buy zone
+    df['In_Buy_Zone'] = (distance_pct >= -threshold) & (distance_pct <= threshold)
+    df['Distance_From_BP'] = distance_pct
+    
+    # Calculate zone boundaries
+    df['Buy_Zone_Lower'] = buy_point * (1 - threshold / 100)
+    df['Buy_Zone_Upper'] = buy_point * (1 + threshold / 100)
     
     return df
 
@@ -550,25 +490,16 @@ def calculate_stop_loss(df, stop_percentage=8.0):
     Returns:
         pd.DataFrame: Data with Stop_Loss column
     """
-    stop_loss = pd.Series([np.nan] * len(df), index=df.index)
-    risk_per_share = pd.Series([np.nan] * len(df), index=df.index)
-    risk_percentage = pd.Series([np.nan] * len(df), index=df.index)
+    buy_point = _valid_buy_points(df)
     
-    for i in range(len(df)):
-        buy_point = df.iloc[i].get('Buy_Point', np.nan)
-        
-        if pd.notna(buy_point) and buy_point > 0:
-            # Stop loss = Buy point - 8%
-            stop_price = buy_point * (1 - stop_percentage / 100)
-            stop_loss.iloc[i] = stop_price
-            
-            # Calculate risk metrics
-            risk_per_share.iloc[i] = buy_point - stop_price
-            risk_percentage.iloc[i] = stop_percentage
+    # Stop loss = Buy point - 8%
+    stop_price = buy_point * (1 - stop_percentage / 100)
     
-    df['Stop_Loss'] = stop_loss
-    df['Risk_Per_Share'] = risk_per_share
-    df['Risk_Percentage'] = risk_percentage
+    df['Stop_Loss'] = stop_price
+    
+    # Calculate risk metrics
+    df['Risk_Per_Share'] = buy_point - stop_price
+    df['Risk_Percentage'] = np.where(np.isnan(buy_point), np.nan, float(stop_percentage))
     
     return df
 
@@ -597,83 +528,54 @@ def identify_buy_and_exit_signals(df):
     Returns:
         pd.DataFrame: Data with Buy_Signal and Exit_Signal columns
     """
-    buy_signals = []
-    exit_signals = []
-    exit_reasons = []
-    
-    for i in range(len(df)):
-        buy_signal = False
-        exit_signal = False
-        exit_reason = ''
-        
-        current_status = df.iloc[i]['TR_Status']
-        current_price = df.iloc[i]['Close']
-        in_buy_zone = df.iloc[i].get('In_Buy_Zone', False)
-        stop_loss = df.iloc[i].get('Stop_Loss', np.nan)
-        
-        # ═══════════════════════════════════════════════════════
-        # BUY SIGNAL LOGIC
-        # ═══════════════════════════════════════════════════════
-        if in_buy_zone and current_status in ['Buy', 'Strong Buy']:
-            if i > 0:
-                prev_status = df.iloc[i - 1]['TR_Status']
-                prev_in_zone = df.iloc[i - 1].get('In_Buy_Zone', False)
-                
-                # Scenario 1: Just entered Stage 2 or 3 while in buy zone
-                just_entered_uptrend = (
-                    current_status in ['Buy', 'Strong Buy'] and
-                    prev_status not in ['Buy', 'Strong Buy'] and
-                    in_buy_zone
-                )
-                
-                # Scenario 2: Just entered buy zone while already in uptrend
-                just_entered_zone = (
-                    in_buy_zone and 
-                    not prev_in_zone and
-                    current_status in ['Buy', 'Strong Buy']
-                )
-                
-                # Scenario 3: Upgraded from Buy to Strong Buy while in zone
-                upgraded_to_stage3 = (
-                    current_status == 'Strong Buy' and
-                    prev_status == 'Buy' and
-                    in_buy_zone
-                )
-                
-                if just_entered_uptrend or just_entered_zone or upgraded_to_stage3:
-                    buy_signal = True
-            else:
-                # First bar - check if conditions already met
-                if in_buy_zone and current_status in ['Buy', 'Strong Buy']:
-                    buy_signal = True
-        
-        # ═══════════════════════════════════════════════════════
-        # EXIT SIGNAL LOGIC
-        # ═══════════════════════════════════════════════════════
-        if i > 0:
-            prev_status = df.iloc[i - 1]['TR_Status']
-            
-            # Exit 1: Hit stop loss (8% below buy point)
-            if pd.notna(stop_loss) and current_price <= stop_loss:
-                exit_signal = True
-                exit_reason = f'Stop Loss Hit (${stop_loss:.2f})'
-            
-            # Exit 2: TR status changed to Sell or Strong Sell
-            elif current_status in ['Sell', 'Strong Sell'] and prev_status not in ['Sell', 'Strong Sell']:
-                exit_signal = True
-                exit_reason = f'TR Sell Signal ({current_status})'
-            
-            # Exit 3: Dropped to Neutral Sell (conservative exit)
-            elif current_status == 'Neutral Sell' and prev_status in ['Buy', 'Strong Buy', 'Neutral Buy']:
-                exit_signal = True
-                exit_reason = 'Downtrend Starting (Neutral Sell)'
-        
-        buy_signals.append(buy_signal)
-        exit_signals.append(exit_signal)
-        exit_reasons.append(exit_reason)
+    n = len(df)
+    stage = _tr_stages(df)
+    prev_stage = _previous_stage(stage)
+    close = df['Close'].to_numpy(dtype=float)
+    in_buy_zone = df['In_Buy_Zone'].to_numpy(dtype=bool) if 'In_Buy_Zone' in df.columns else np.zeros(n, dtype=bool)
+    prev_in_zone = np.concatenate(([False], in_buy_zone[:-1]))[:n]
+    stop_loss = df['Stop_Loss'].to_numpy(dtype=float) if 'Stop_Loss' in df.columns else np.full(n, np.nan)
+    
+    has_prev = np.arange(n) > 0
+    
+    uptrend = stage >= 2
+    prev_uptrend = prev_stage >= 2
+    
+    # ═══════════════════════════════════════════════════════
+    # BUY SIGNAL LOGIC
+    # ═══════════════════════════════════════════════════════
+    # Scenario 1: Just entered Stage 2 or 3 while in buy zone
+    just_entered_uptrend = ~prev_uptrend
+    
+    # Scenario 2: Just entered buy zone while already in uptrend
+    just_entered_zone = ~prev_in_zone
+    
+    # Scenario 3: Upgraded from Buy to Strong Buy while in zone
+    upgraded_to_stage3 = (stage == 3) & (prev_stage == 2)
+    
+    # First bar - conditions already met is enough
+    df['Buy_Signal'] = in_buy_zone & uptrend & (
+        ~has_prev | just_entered_uptrend | just_entered_zone | upgraded_to_stage3
+    )
+    
+    # ═══════════════════════════════════════════════════════
+    # EXIT SIGNAL LOGIC (first match wins)
+    # ═══════════════════════════════════════════════════════
+    # Exit 1: Hit stop loss (8% below buy point)
+    stop_hit = has_prev & (close <= stop_loss)
+    
+    # Exit 2: TR status changed to Sell or Strong Sell
+    sell_signal = has_prev & ~stop_hit & (stage <= -2) & (prev_stage > -2)
+    
+    # Exit 3: Dropped to Neutral Sell (conservative exit)
+    downtrend_start = has_prev & ~stop_hit & ~sell_signal & (stage == -1) & (prev_stage > 0)
+    
+    exit_reasons = np.full(n, '', dtype=object)
+    exit_reasons[stop_hit] = [f'Stop Loss Hit (${stop:.2f})' for stop in stop_loss[stop_hit]]
+    exit_reasons[sell_signal] = [f'TR Sell Signal ({TR_STAGE_NAMES[s]})' for s in stage[sell_signal]]
+    exit_reasons[downtrend_start] = 'Downtrend Starting (Neutral Sell)'
     
-    df['Buy_Signal'] = buy_signals
-    df['Exit_Signal'] = exit_signals
+    df['Exit_Signal'] = stop_hit | sell_signal | downtrend_start
     df['Exit_Reason'] = exit_reasons
     
     return df
@@ -771,33 +673,30 @@ def add_tr_enhancements(df):
     - ↓ = Fresh downtrend started  
     - ✓ = In buy zone (±5% of buy point) AND in Stage 2/3 uptrend
     
+    Each enhancement is stored as a boolean column (Fresh_Uptrend,
+    Fresh_Downtrend, Near_Buy_Point) so filters can use the flags instead
+    of searching the status string.
+    
     Args:
         df (pd.DataFrame): Data with TR_Status
     
     Returns:
-        pd.DataFrame: Data with TR_Status_Enhanced
+        pd.DataFrame: Data with enhancement flags and TR_Status_Enhanced
     """
-    enhanced_status = []
+    stage = _tr_stages(df)
+    prev_stage = _previous_stage(stage)
     
-    for idx in range(len(df)):
-        base_status = df.iloc[idx]['TR_Status']
-        
-        # Start with base status
-        status = base_status
-        
-        # Add arrow if fresh trend start
-        arrow = detect_fresh_trend_start(df, idx)
-        if arrow:
-            status = f"{status} {arrow}"
-        
-        # Add checkmark if in buy zone with uptrend
-        # This now correctly uses ±5% logic
-        if check_near_buy_point(df, idx):
-            status = f"{status} ✓"
-        
-        enhanced_status.append(status)
+    # Add arrow if fresh trend start (never on the first bar)
+    has_prev = np.arange(len(df)) > 0
+    df['Fresh_Uptrend'] = has_prev & (stage > 0) & (prev_stage <= 0)
+    df['Fresh_Downtrend'] = has_prev & (stage < 0) & (prev_stage >= 0)
+    
+    # Add checkmark if in buy zone (±5% of buy point) with Stage 2/3 uptrend
+    buy_point = _valid_buy_points(df)
+    distance_pct = ((df['Close'].to_numpy(dtype=float) - buy_point) / buy_point) * 100
+    df['Near_Buy_Point'] = (stage >= 2) & (distance_pct >= -5.0) & (distance_pct <= 5.0)
     
-    df['TR_Status_Enhanced'] = enhanced_status
+    df['TR_Status_Enhanced'] = compose_tr_status_enhanced(df)
     
     return df
 
@@ -812,24 +711,98 @@ def add_signal_markers(df):
     Returns:
         pd.DataFrame: Data with updated TR_Status_Enhanced
     """
-    enhanced_status = []
+    df['TR_Status_Enhanced'] = compose_tr_status_enhanced(df, signal_markers=True)
     
-    for i in range(len(df)):
-        status = df.iloc[i]['TR_Status_Enhanced']
-        
-        # Add buy signal marker
-        if df.iloc[i]['Buy_Signal']:
-            status = f"{status} 🔵BUY"
-        
-        # Add exit signal marker
-        if df.iloc[i]['Exit_Signal']:
-            status = f"{status} 🔴EXIT"
-        
-        enhanced_status.append(status)
+    return df
+
+
+# Flag column -> marker, in display order
+STATUS_MARKERS = [
+    ('Fresh_Uptrend', ' ↑'),
+    ('Fresh_Downtrend', ' ↓'),
+    ('Near_Buy_Point', ' ✓'),
+    ('Strong_Stock', ' *')
+]
+SIGNAL_MARKERS = [
+    ('Buy_Signal', ' 🔵BUY'),
+    ('Exit_Signal', ' 🔴EXIT')
+]
+
+
+def format_tr_status(stage, markers=()):
+    """
+    Build one enhanced status string, e.g. 'Strong Buy ↑ ✓ *'
     
-    df['TR_Status_Enhanced'] = enhanced_status
+    Args:
+        stage (int): TR stage code
+        markers (iterable): Marker suffixes, in display order
     
-    return df
+    Returns:
+        str: Enhanced TR status
+    """
+    return TR_STAGE_NAMES[stage] + ''.join(markers)
+
+
+def compose_tr_status_enhanced(df, signal_markers=False):
+    """
+    Derive TR_Status_Enhanced from the stage code and the marker flags
+    
+    Only a few dozen stage/flag combinations occur, so each distinct
+    combination is formatted once and the column is returned as a
+    categorical of those strings.
+    
+    Args:
+        df (pd.DataFrame): Data with TR_Stage (or TR_Status) and any of
+                           the STATUS_MARKERS flag columns
+        signal_markers (bool): Also add 🔵BUY / 🔴EXIT from Buy_Signal / Exit_Signal
+    
+    Returns:
+        pd.Categorical: Enhanced TR status for each row
+    """
+    markers = STATUS_MARKERS + (SIGNAL_MARKERS if signal_markers else [])
+    markers = [(column, marker) for column, marker in markers if column in df.columns]
+    
+    # Stage code (+3) in the low 3 bits, one bit per flag above it
+    key = _tr_stages(df).astype(np.int64) + 3
+    for bit, (column, _) in enumerate(markers, start=3):
+        key |= df[column].to_numpy(dtype=bool).astype(np.int64) << bit
+    
+    combos, inverse = np.unique(key, return_inverse=True)
+    labels = [
+        format_tr_status(
+            int(combo & 7) - 3,
+            [marker for bit, (_, marker) in enumerate(markers, start=3) if combo >> bit & 1]
+        )
+        for combo in combos
+    ]
+    
+    return pd.Categorical.from_codes(inverse.ravel(), labels)
+
+
+def _tr_stages(df):
+    """TR_Stage as an int8 array, parsed from TR_Status when the column is missing"""
+    if 'TR_Stage' in df.columns:
+        return df['TR_Stage'].to_numpy(dtype=np.int8)
+    
+    status = df['TR_Status'].astype('category')
+    lookup = [tr_stage_from_status(name) or 0 for name in status.cat.categories]
+    
+    # Trailing 0 catches code -1 (missing status)
+    return np.array(lookup + [0], dtype=np.int8)[status.cat.codes.to_numpy()]
+
+
+def _previous_stage(stage):
+    """Stage codes shifted one bar forward (Neutral on the first bar)"""
+    return np.concatenate(([0], stage[:-1]))[:len(stage)].astype(np.int8)
+
+
+def _valid_buy_points(df):
+    """Buy_Point as a float array, NaN where missing or not positive"""
+    if 'Buy_Point' not in df.columns:
+        return np.full(len(df), np.nan)
+    
+    buy_point = df['Buy_Point'].to_numpy(dtype=float)
+    return np.where(buy_point > 0, buy_point, np.nan)
 
 
 def format_tr_display(status):
@@ -932,125 +905,123 @@ def detect_and_adjust_splits(df):
     return df
 
 
-@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
-def analyze_stock_complete_tr(ticker, timeframe='daily', duration_days=180, market_ticker='SPY', api_source='yahoo'):
+def prepare_ohlcv_data(df, timeframe='daily', start_date=None, end_date=None):
     """
-    Complete TR analysis with all enhancements
+    Normalize raw OHLCV data (yfinance, batch fetch or cache) for TR analysis
+    
+    - Flattens multi-index columns
+    - Moves a DatetimeIndex into a 'Date' column
+    - Drops empty rows (batch downloads pad every symbol to the union of dates)
+    - Trims bars before start_date (batch periods like '2y' are longer)
+      and from end_date on (scanner fetches run past the analysis window)
+    - Resamples to weekly/monthly bars if needed (universal_cache.resample_ohlcv)
     
     Args:
-        ticker (str): Stock symbol
-        timeframe (str): 'daily' or 'weekly'
-        duration_days (int): History duration
-        market_ticker (str): Market index for RS calculation
-        api_source (str): 'yahoo' or 'tiingo' (Note: currently uses yahoo regardless)
+        df (pd.DataFrame): Raw daily OHLCV data
+        timeframe (str): 'daily', 'weekly' or 'monthly'
+        start_date: Drop bars before this date (optional)
+        end_date: Drop bars on/after this date (optional)
     
     Returns:
-        pd.DataFrame: Complete TR analysis
+        pd.DataFrame: Data with Date column and OHLCV, or None if empty
     """
-    import yfinance as yf
-    from datetime import datetime, timedelta
-    from tr_indicator import analyze_tr_indicator
-    
-    print(f"\n{'='*80}")
-    print(f"🔍 COMPLETE TR ANALYSIS: {ticker}")
-    print(f"📡 Data Source: YAHOO FINANCE")
-    print(f"{'='*80}\n")
-    
-    # Calculate date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=duration_days)
-    
-    # Fetch stock data using yfinance directly
-    print(f"📡 Fetching {ticker} data from Yahoo Finance...")
-    df = yf.download(ticker, start=start_date, end=end_date, progress=False)
-    
     if df is None or df.empty:
-        print(f"❌ No data for {ticker}")
         return None
     
+    df = df.copy()
+    
     # Handle multi-index columns (yfinance sometimes returns these)
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.get_level_values(0)
     
     # CRITICAL: yfinance returns DatetimeIndex
     # Reset to create Date column - DO NOT set back as index
-    df = df.reset_index()
-    if 'index' in df.columns:
-        df = df.rename(columns={'index': 'Date'})
+    if 'Date' not in df.columns and 'date' not in df.columns:
+        df = df.reset_index()
+        if 'index' in df.columns:
+            df = df.rename(columns={'index': 'Date'})
+    
+    # Tiingo batch data uses lowercase column names
+    df = df.rename(columns={c: c.capitalize() for c in df.columns
+                            if c in ('date', 'open', 'high', 'low', 'close', 'volume')})
     
     # Ensure Date column exists and is datetime type
     if 'Date' not in df.columns:
         df['Date'] = df.index
     df['Date'] = pd.to_datetime(df['Date'])
     
-    # Resample to weekly if needed
-    if timeframe.lower() == 'weekly':
-        print(f"📊 Converting to weekly timeframe...")
-        df = df.set_index('Date')
-        df = df.resample('W').agg({
-            'Open': 'first',
-            'High': 'max',
-            'Low': 'min',
-            'Close': 'last',
-            'Volume': 'sum'
-        }).dropna()
-        # Reset index to column
-        df = df.reset_index()
-        df['Date'] = pd.to_datetime(df['Date'])
+    df = df.dropna(subset=['Close'])
     
-    if df is None or df.empty:
-        print(f"❌ No data for {ticker}")
+    if start_date is not None:
+        df = df[df['Date'] >= pd.Timestamp(start_date).normalize()]
+    
+    if end_date is not None:
+        df = df[df['Date'] < pd.Timestamp(end_date).normalize()]
+    
+    df = df.reset_index(drop=True)
+    
+    # Resample to weekly/monthly if needed - same rule as the cached bars
+    if timeframe.lower() in RESAMPLE_RULES:
+        df = resample_ohlcv(df, timeframe)
+    
+    if df.empty:
         return None
     
-    # CRITICAL: Detect and adjust for stock splits
-    df = detect_and_adjust_splits(df)
+    return df
+
+
+def prepare_market_data(market_df, timeframe='daily'):
+    """
+    Prepare market (SPY) data for RS calculation
     
-    # Fetch market data for RS calculation - USE UNIVERSAL CACHE!
-    print(f"📡 Fetching {market_ticker} data for RS calculation (checking cache, {api_source})...")
+    Call once and pass the result to analyze_prefetched_tr for every stock
+    in a watchlist/scan instead of re-fetching SPY per symbol.
     
-    # Import universal_cache
-    from universal_cache import get_stock_data
+    Args:
+        market_df (pd.DataFrame): Raw market OHLCV data
+        timeframe (str): 'daily' or 'weekly'
     
-    # Use cached fetch instead of direct yf.download - pass api_source!
-    market_df = get_stock_data(
-        ticker=market_ticker,
-        start_date=start_date,
-        end_date=end_date,
-        interval='1d',
-        api_source=api_source,  # Pass through the API source!
-        force_refresh=False
-    )
+    Returns:
+        pd.DataFrame: Split-adjusted market data, or None
+    """
+    market_df = prepare_ohlcv_data(market_df, timeframe)
     
-    # Handle the market data carefully - universal_cache returns clean data
-    if market_df is not None and not market_df.empty:
-        # Make a copy to avoid modifying cached data
-        market_df = market_df.copy()
-        
-        # Check if Date is index or column
-        if 'Date' not in market_df.columns:
-            # Date is in index, need to reset
-            market_df = market_df.reset_index()
-            if 'index' in market_df.columns:
-                market_df = market_df.rename(columns={'index': 'Date'})
-        
-        # Ensure Date column is datetime
-        market_df['Date'] = pd.to_datetime(market_df['Date'])
-        
-        # Resample market data to weekly if needed
-        if timeframe.lower() == 'weekly':
-            market_df = market_df.set_index('Date')
-            market_df = market_df.resample('W').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last',
-                'Volume': 'sum'
-            }).dropna()
-            market_df = market_df.reset_index()
-            market_df['Date'] = pd.to_datetime(market_df['Date'])
-        
-        # Adjust market data for splits too
-        market_df = detect_and_adjust_splits(market_df)
+    if market_df is None:
+        return None
+    
+    # Adjust market data for splits too
+    return detect_and_adjust_splits(market_df)
+
+
+def analyze_prefetched_tr(df, ticker=None, timeframe='daily', market_df=None, start_date=None, end_date=None):
+    """
+    Complete TR analysis on ALREADY-FETCHED OHLCV data
+    
+    Same pipeline as analyze_stock_complete_tr without any network calls,
+    so one batch download can cover a whole watchlist.
+    
+    Args:
+        df (pd.DataFrame): Raw daily OHLCV data for one stock
+        ticker (str): Stock symbol (for log output only)
+        timeframe (str): 'daily' or 'weekly'
+        market_df (pd.DataFrame): Market data from prepare_market_data
+                                  (shared across all stocks)
+        start_date: Drop bars before this date (optional)
+        end_date: Drop bars on/after this date (optional)
+    
+    Returns:
+        pd.DataFrame: Complete TR analysis, or None if no data
+    """
+    from tr_indicator import analyze_tr_indicator
+    
+    df = prepare_ohlcv_data(df, timeframe, start_date, end_date)
+    
+    if df is None:
+        print(f"❌ No data for {ticker}")
+        return None
+    
+    # CRITICAL: Detect and adjust for stock splits
+    df = detect_and_adjust_splits(df)
     
     # Run base TR analysis
     print(f"📊 Calculating TR indicators...")
@@ -1078,13 +1049,76 @@ def analyze_stock_complete_tr(ticker, timeframe='daily', duration_days=180, mark
     df = add_tr_enhancements(df)
     
     # Phase 7: RS & Chaikin
-    df = add_strength_indicators(df, market_df)
+    df = add_strength_indicators(df, market_df, ticker, timeframe)
     df = add_star_for_strong_stocks(df)
     
     # Phase 8: Signal Markers
     df = add_signal_markers(df)
     
-    print(f"✅ Complete TR analysis finished!\n")
+    return df
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
+def analyze_stock_complete_tr(ticker, timeframe='daily', duration_days=180, market_ticker='SPY', api_source='yahoo'):
+    """
+    Complete TR analysis with all enhancements
+    
+    Args:
+        ticker (str): Stock symbol
+        timeframe (str): 'daily' or 'weekly'
+        duration_days (int): History duration
+        market_ticker (str): Market index for RS calculation
+        api_source (str): 'yahoo' or 'tiingo'
+    
+    Returns:
+        pd.DataFrame: Complete TR analysis
+    """
+    from datetime import datetime, timedelta
+    from universal_cache import get_stock_data
+    
+    print(f"\n{'='*80}")
+    print(f"🔍 COMPLETE TR ANALYSIS: {ticker}")
+    print(f"📡 Data Source: {api_source.upper()}")
+    print(f"{'='*80}\n")
+    
+    # Calculate date range
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=duration_days)
+    
+    # Daily bars from the universal cache - the weekly analysis resamples
+    # the same bars, so daily + weekly cost one download
+    print(f"📡 Fetching {ticker} data (checking cache, {api_source})...")
+    df = get_stock_data(
+        ticker=ticker,
+        start_date=start_date,
+        end_date=end_date,
+        interval='1d',
+        api_source=api_source,
+        force_refresh=False
+    )
+    
+    if df is None or df.empty:
+        print(f"❌ No data for {ticker}")
+        return None
+    
+    # Fetch market data for RS calculation - USE UNIVERSAL CACHE!
+    print(f"📡 Fetching {market_ticker} data for RS calculation (checking cache, {api_source})...")
+    
+    market_df = get_stock_data(
+        ticker=market_ticker,
+        start_date=start_date,
+        end_date=end_date,
+        interval='1d',
+        api_source=api_source,  # Pass through the API source!
+        force_refresh=False
+    )
+    
+    market_df = prepare_market_data(market_df, timeframe)
+    
+    df = analyze_prefetched_tr(df, ticker, timeframe, market_df)
+    
+    if df is not None:
+        print(f"✅ Complete TR analysis finished!\n")
     
     return df
 
@@ -1248,7 +1282,8 @@ def save_tr_results(result, output_folder='data', ticker=None, timeframe=None):
         'EMA_3', 'EMA_9', 'EMA_20', 'EMA_34',
         'PPO_Line', 'PPO_Signal', 
         'PMO_Line', 'PMO_Signal',
-        'TR_Status', 'TR_Status_Enhanced',
+        'TR_Stage', 'TR_Status', 'TR_Status_Enhanced',
+        'Fresh_Uptrend', 'Fresh_Downtrend', 'Near_Buy_Point', 'Strong_Stock',
         'RS', 'Chaikin_AD',
         'Peak', 'Valley',
         'Buy_Point', 'Buy_Zone_Lower', 'Buy_Zone_Upper',
@@ -13,6 +13,10 @@ def ensure_numeric_data(df):
     
     for col in price_cols:
         if col in df.columns:
+            # Numeric columns cannot contain apostrophes - skip the string scan
+            if pd.api.types.is_numeric_dtype(df[col]):
+                continue
+
             # Convert to string, remove apostrophes, convert to float
             if df[col].dtype == 'object' or df[col].astype(str).str.contains("'").any():
                 df[col] = df[col].astype(str).str.replace("'", "").astype(float)
@@ -295,6 +299,196 @@ def get_tr_status(df, idx):
     return "Neutral"
 
 
+def calculate_stage_masks(df):
+    """
+    Compute all six TR stage conditions as boolean arrays in one pass
+    
+    Columnar equivalent of the check_* functions above: each mask[i]
+    equals check_<stage>(df, i), but the crossover series is built once
+    instead of once per row.
+    
+    Args:
+        df (pd.DataFrame): Data with indicators (from calculate_all_indicators)
+    
+    Returns:
+        dict: Stage name -> np.ndarray of bool
+    """
+    n = len(df)
+    
+    ppo = df['PPO_Line'].to_numpy(dtype=float)
+    ppo_signal = df['PPO_Signal'].to_numpy(dtype=float)
+    pmo = df['PMO_Line'].to_numpy(dtype=float)
+    pmo_signal = df['PMO_Signal'].to_numpy(dtype=float)
+    ema_9 = df['EMA_9'].to_numpy(dtype=float)
+    ema_20 = df['EMA_20'].to_numpy(dtype=float)
+    ema_34 = df['EMA_34'].to_numpy(dtype=float)
+    
+    ppo_rising = df['PPO_Rising'].to_numpy(dtype=bool)
+    ema_9_rising = df['EMA_9_Rising'].to_numpy(dtype=bool)
+    ema_34_rising = df['EMA_34_Rising'].to_numpy(dtype=bool)
+    ppo_declining = df['PPO_Declining'].to_numpy(dtype=bool)
+    ema_9_declining = df['EMA_9_Declining'].to_numpy(dtype=bool)
+    ema_34_declining = df['EMA_34_Declining'].to_numpy(dtype=bool)
+    pmo_declining = df['PMO_Declining'].to_numpy(dtype=bool)
+    
+    # Stage 2/3 need enough data for EMA 34, Stage 1 needs a previous bar
+    warm_34 = np.arange(n) >= 34
+    warm_1 = np.arange(n) >= 1
+    
+    uptrend_stage1 = warm_1 & tc.detect_crossover(df['EMA_3'], df['EMA_9']).to_numpy(dtype=bool)
+    downtrend_stage1 = warm_1 & tc.detect_crossunder(df['EMA_3'], df['EMA_9']).to_numpy(dtype=bool)
+    
+    uptrend_stage2 = (
+        warm_34 &
+        (ppo > 0) &
+        ppo_rising &
+        ema_34_rising &
+        (ppo > ppo_signal) &
+        (ema_9 > ema_20)
+    )
+    
+    uptrend_stage3 = (
+        warm_34 &
+        (ppo > 0) &
+        ppo_rising &
+        ema_9_rising &
+        ema_34_rising &
+        (pmo > 0) &
+        (ppo > ppo_signal)
+    )
+    
+    downtrend_stage2 = (
+        warm_34 &
+        (ppo < 0) &
+        ppo_declining &
+        (ppo < ppo_signal) &
+        ema_9_declining &
+        ema_34_declining &
+        (ema_9 < ema_20)
+    )
+    
+    downtrend_stage3 = (
+        warm_34 &
+        (ppo <= 0) &
+        ppo_declining &
+        ema_9_declining &
+        ema_34_declining &
+        pmo_declining &
+        (pmo < pmo_signal) &
+        (ema_9 < ema_34)
+    )
+    
+    return {
+        'uptrend_stage1': uptrend_stage1,
+        'uptrend_stage2': uptrend_stage2,
+        'uptrend_stage3': uptrend_stage3,
+        'downtrend_stage1': downtrend_stage1,
+        'downtrend_stage2': downtrend_stage2,
+        'downtrend_stage3': downtrend_stage3
+    }
+
+
+# TR stage codes: sign is the trend direction, magnitude is the stage
+TR_STAGE_NAMES = {
+    3: "Strong Buy",
+    2: "Buy",
+    1: "Neutral Buy",
+    0: "Neutral",
+    -1: "Neutral Sell",
+    -2: "Sell",
+    -3: "Strong Sell"
+}
+TR_STAGE_CODES = {name: code for code, name in TR_STAGE_NAMES.items()}
+
+# TR_Status categorical: all stage names, whether or not a frame has them
+TR_STATUS_DTYPE = pd.CategoricalDtype(list(TR_STAGE_NAMES.values()))
+_STAGE_POSITIONS = {code: position for position, code in enumerate(TR_STAGE_NAMES)}
+
+# Longest names first, so 'Strong Buy ✓' is not read as 'Buy'
+_STAGE_PARSE_ORDER = ["Strong Buy", "Strong Sell", "Neutral Buy", "Neutral Sell", "Buy", "Sell", "Neutral"]
+
+
+def classify_tr_stage(df):
+    """
+    Get TR stage code for every row at once
+    
+    Same priority as get_tr_status (Stage 2 -> Stage 3 upgrade -> Stage 1
+    -> Neutral), resolved with np.select over the stage masks.
+    
+    Args:
+        df (pd.DataFrame): Data with indicators
+    
+    Returns:
+        pd.Series: int8 stage code for each row (see TR_STAGE_NAMES)
+    """
+    masks = calculate_stage_masks(df)
+    
+    conditions = [
+        masks['uptrend_stage2'] & masks['uptrend_stage3'],
+        masks['uptrend_stage2'],
+        masks['downtrend_stage2'] & masks['downtrend_stage3'],
+        masks['downtrend_stage2'],
+        masks['uptrend_stage1'],
+        masks['downtrend_stage1']
+    ]
+    choices = [3, 2, -3, -2, 1, -1]
+    
+    stage = np.select(conditions, choices, default=0)
+    
+    return pd.Series(stage.astype(np.int8), index=df.index)
+
+
+def tr_status_from_stage(stage):
+    """
+    Convert stage codes to a categorical of status names
+    
+    Args:
+        stage (pd.Series): Stage codes (from classify_tr_stage)
+    
+    Returns:
+        pd.Series: Categorical TR status for each row (TR_STATUS_DTYPE, so
+                   any stage name can be assigned and frames concat cleanly)
+    """
+    codes, inverse = np.unique(np.asarray(stage, dtype=np.int8), return_inverse=True)
+    positions = np.array([_STAGE_POSITIONS[int(code)] for code in codes], dtype=np.int8)
+    
+    return pd.Series(pd.Categorical.from_codes(positions[inverse.ravel()], dtype=TR_STATUS_DTYPE),
+                     index=stage.index)
+
+
+def tr_stage_from_status(status):
+    """
+    Parse a TR status string (plain or enhanced) back to its stage code
+    
+    Args:
+        status (str): e.g. 'Buy', 'Strong Buy ↑ ✓ *'
+    
+    Returns:
+        int: Stage code, or None if status is not a TR status (e.g. 'N/A')
+    """
+    if not isinstance(status, str):
+        return None
+    
+    for name in _STAGE_PARSE_ORDER:
+        if name in status:
+            return TR_STAGE_CODES[name]
+    
+    return None
+
+
+def classify_tr_status(df):
+    """
+    Get TR status for every row at once
+    
+    Args:
+        df (pd.DataFrame): Data with indicators
+    
+    Returns:
+        pd.Series: Categorical TR status for each row
+    """
+    return tr_status_from_stage(classify_tr_stage(df))
+
+
 def analyze_tr_indicator(data):
     """
     Main function: Calculate TR indicator for entire dataset
@@ -308,12 +502,8 @@ def analyze_tr_indicator(data):
     # Calculate all indicators (now includes dtype fixing!)
     df = calculate_all_indicators(data)
     
-    # Calculate TR status for each row
-    tr_status = []
-    for idx in range(len(df)):
-        status = get_tr_status(df, idx)
-        tr_status.append(status)
-    
-    df['TR_Status'] = tr_status
+    # Calculate TR stage for all rows in one pass, status names derived from it
+    df['TR_Stage'] = classify_tr_stage(df)
+    df['TR_Status'] = tr_status_from_stage(df['TR_Stage'])
     
     return df
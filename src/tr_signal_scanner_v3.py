@@ -10,10 +10,13 @@ Author: MJ Software LLC
 Date: November 2025
 """
 
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict, List
+from universal_cache import resample_ohlcv
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,14 +25,16 @@ warnings.filterwarnings('ignore')
 # ============================================================================
 
 USING_EXISTING_CODE = False
+PARALLEL_SCAN_AVAILABLE = False
 import_error_message = ""
 
 try:
     # Try to import tr_enhanced (YOUR complete TR with quality markers)
-    from tr_enhanced import analyze_stock_complete_tr
+    from tr_enhanced import analyze_prefetched_tr, prepare_market_data
     print("✅ Successfully imported tr_enhanced.py (complete TR analysis)")
     
     USING_EXISTING_CODE = True
+    PARALLEL_SCAN_AVAILABLE = True
     print("✅ Using YOUR tr_enhanced.py - ONE source of truth!")
     
 except ImportError as e:
@@ -83,7 +88,8 @@ def fallback_analyze_stock_tr(symbol: str, start_date: str, end_date: str) -> pd
 # MAIN ANALYSIS FUNCTION
 # ============================================================================
 
-def analyze_stock_tr_for_scanner(symbol: str, start_date: str, end_date: str, timeframe: str = 'Daily') -> pd.DataFrame:
+def analyze_stock_tr_for_scanner(symbol: str, start_date: str, end_date: str, timeframe: str = 'Daily',
+                                 market_df: pd.DataFrame = None) -> pd.DataFrame:
     """
     Analyze stock using YOUR existing tr_enhanced.py
     
@@ -92,6 +98,8 @@ def analyze_stock_tr_for_scanner(symbol: str, start_date: str, end_date: str, ti
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
         timeframe: 'Daily' or 'Weekly'
+        market_df: Prepared market data from _fetch_scan_market_data
+                   (fetched here if not given)
     
     Returns:
         DataFrame with TR analysis from YOUR tr_enhanced.py
@@ -101,20 +109,18 @@ def analyze_stock_tr_for_scanner(symbol: str, start_date: str, end_date: str, ti
     
     if USING_EXISTING_CODE:
         try:
-            # Try to use YOUR tr_enhanced.py (complete analysis)
-            from tr_enhanced import analyze_stock_complete_tr
+            # Use YOUR tr_enhanced.py (complete analysis, imported above)
+            from universal_cache import get_stock_data
             
-            # Calculate duration in days
-            start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-            end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-            duration_days = (end_dt - start_dt).days
+            # Same window and pipeline as the parallel scan: daily bars for
+            # start_date..end_date (not a duration ending today)
+            raw_df = get_stock_data(symbol, start_date, end_date, interval='1d')
+            
+            if market_df is None:
+                market_df = _fetch_scan_market_data(start_date, end_date, [timeframe])[timeframe]
             
             # CALL YOUR EXISTING FUNCTION!
-            result = analyze_stock_complete_tr(
-                ticker=symbol,
-                timeframe=timeframe.lower(),
-                duration_days=duration_days
-            )
+            result = analyze_prefetched_tr(raw_df, symbol, timeframe.lower(), market_df=market_df)
             
             if result is None or result.empty:
                 print(f"  ⚠️  No data returned for {symbol}")
@@ -129,28 +135,16 @@ def analyze_stock_tr_for_scanner(symbol: str, start_date: str, end_date: str, ti
             
             # Fallback to basic TR
             try:
-                import yfinance as yf
                 from tr_indicator import analyze_tr_indicator
+                from universal_cache import get_stock_data
                 
-                # Download stock data
-                if timeframe == 'Weekly':
-                    df_daily = yf.download(symbol, start=start_date, end=end_date, progress=False)
-                    df = df_daily.resample('W').agg({
-                        'Open': 'first',
-                        'High': 'max',
-                        'Low': 'min',
-                        'Close': 'last',
-                        'Volume': 'sum'
-                    }).dropna()
-                else:
-                    df = yf.download(symbol, start=start_date, end=end_date, progress=False)
+                # Weekly bars are resampled from the cached daily history
+                interval = '1wk' if timeframe == 'Weekly' else '1d'
+                df = get_stock_data(symbol, start_date, end_date, interval=interval)
                 
-                if df.empty or len(df) < 100:
+                if df is None or df.empty or len(df) < 100:
                     return pd.DataFrame()
                 
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = df.columns.get_level_values(0)
-                
                 result = analyze_tr_indicator(df)
                 print(f"  ✅ Using basic TR indicator")
                 return result
@@ -167,6 +161,22 @@ def analyze_stock_tr_for_scanner(symbol: str, start_date: str, end_date: str, ti
 # SIGNAL EXTRACTION
 # ============================================================================
 
+def get_strong_buy_indices(df: pd.DataFrame) -> np.ndarray:
+    """Row positions of all Strong Buy bars (any quality level)"""
+    # Stage code when available, otherwise search the status text
+    if 'TR_Stage' in df.columns:
+        return np.flatnonzero(df['TR_Stage'].to_numpy() == 3)
+    
+    # Use enhanced status if available, otherwise fall back to basic
+    status_column = 'TR_Status_Enhanced' if 'TR_Status_Enhanced' in df.columns else 'TR_Status'
+    
+    if status_column not in df.columns:
+        return np.array([], dtype=int)
+    
+    is_strong_buy = df[status_column].astype(str).str.contains('Strong Buy', regex=False)
+    return np.flatnonzero(is_strong_buy.to_numpy())
+
+
 def extract_tr_signals(df: pd.DataFrame, symbol: str) -> List[Dict]:
     """
     Extract Strong Buy signals from TR analysis
@@ -183,13 +193,18 @@ def extract_tr_signals(df: pd.DataFrame, symbol: str) -> List[Dict]:
     # Use enhanced status if available, otherwise fall back to basic
     status_column = 'TR_Status_Enhanced' if 'TR_Status_Enhanced' in df.columns else 'TR_Status'
     
-    for i in range(len(df)):
+    # Only collect Strong Buy signals (all quality levels)
+    for i in get_strong_buy_indices(df):
         row = df.iloc[i]
+        tr_status = str(row[status_column])
         
-        # Only collect Strong Buy signals (all quality levels)
-        tr_status = str(row.get(status_column, 'Neutral'))
-        if 'Strong Buy' not in tr_status:
-            continue
+        # Marker flags when available, otherwise read the markers from the text
+        if 'Near_Buy_Point' in df.columns and 'Strong_Stock' in df.columns:
+            has_buy_point = bool(row['Near_Buy_Point'])
+            has_rs_chaikin = bool(row['Strong_Stock'])
+        else:
+            has_buy_point = '✓' in tr_status
+            has_rs_chaikin = '*' in tr_status
         
         # Extract signal date from Date column (not row.name)
         if 'Date' in df.columns:
@@ -207,9 +222,9 @@ def extract_tr_signals(df: pd.DataFrame, symbol: str) -> List[Dict]:
             'entry_price': float(row['Close']),
             
             # Quality indicators
-            'has_buy_point': '✓' in tr_status,
-            'has_rs_chaikin': '*' in tr_status,
-            'quality_level': calculate_quality_level(tr_status),
+            'has_buy_point': has_buy_point,
+            'has_rs_chaikin': has_rs_chaikin,
+            'quality_level': quality_level_from_flags(has_buy_point, has_rs_chaikin),
             
             # TR Features (if available in your code)
             'ppo_value': float(row.get('PPO_Line', 0)),
@@ -252,25 +267,225 @@ def calculate_quality_level(tr_status: str) -> int:
     2 = "Strong Buy✓" (buy point)
     3 = "Strong Buy*" (RS + Chaikin)
     4 = "Strong Buy✓*" (all criteria - BEST!)
+    
+    Arrows and signal markers between the words are ignored, so
+    "Strong Buy ↑ ✓ *" is level 4.
     """
-    if tr_status == "Strong Buy":
-        return 1
-    elif tr_status == "Strong Buy✓":
-        return 2
-    elif tr_status == "Strong Buy*":
-        return 3
-    elif tr_status == "Strong Buy✓*" or "Strong Buy*✓" in tr_status:
-        return 4
-    else:
-        return 1
+    return quality_level_from_flags('✓' in tr_status, '*' in tr_status)
+
+
+def quality_level_from_flags(has_buy_point: bool, has_rs_chaikin: bool) -> int:
+    """
+    Signal quality level from the Near_Buy_Point / Strong_Stock flags
+    
+    1 = basic, 2 = buy point (✓), 3 = RS + Chaikin (*), 4 = both
+    """
+    return 1 + int(has_buy_point) + 2 * int(has_rs_chaikin)
 
 # ============================================================================
 # SIGNAL LABELING
 # ============================================================================
 
+# Failure EMA per timeframe: (span, label)
+OUTCOME_EMA = {
+    'Daily': (200, '200-day EMA'),
+    'Weekly': (30, '30-week EMA')
+}
+
+# Forward window of the outcome labels (calendar days)
+OUTCOME_WINDOW_DAYS = 180
+
+
+def _label_outcomes(dates: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    close: np.ndarray, ema: np.ndarray, signal_dates: np.ndarray,
+                    entry_prices: np.ndarray, target_prices: np.ndarray,
+                    stop_losses: np.ndarray, window_ends: np.ndarray,
+                    max_days: int, ema_label: str) -> List[Dict]:
+    """
+    Label many signals of one stock against its price history at once
+    
+    Each signal gets a row of its forward window (bars after the signal date
+    and before its window end), and the first target / stop / EMA breach is
+    a first-true search along that row. Ties go to the target, then the stop.
+    
+    Args:
+        dates: Bar dates (datetime64, ascending)
+        high, low, close, ema: Bar values aligned with dates
+        signal_dates: Signal dates (datetime64)
+        entry_prices, target_prices, stop_losses: Per-signal levels
+        window_ends: First bar date past each signal's window (datetime64)
+        max_days: Forward window in calendar days (for the PENDING reason)
+        ema_label: e.g. '200-day EMA'
+    
+    Returns:
+        List of outcome dicts (same keys as label_signal_outcome)
+    """
+    n_bars = len(dates)
+    start = np.searchsorted(dates, signal_dates, side='right')
+    stop = np.searchsorted(dates, window_ends, side='left')
+    n_future = np.maximum(stop - start, 0)
+    
+    # Forward windows: one row per signal, padded past each signal's window
+    width = max(int(n_future.max()) if len(n_future) else 0, 1)
+    offsets = np.arange(width)
+    in_window = offsets[None, :] < n_future[:, None]
+    positions = np.minimum(start[:, None] + offsets[None, :], max(n_bars - 1, 0))
+    
+    high_w = high[positions]
+    low_w = low[positions]
+    
+    max_price = np.where(in_window & ~np.isnan(high_w), high_w, -np.inf).max(axis=1)
+    min_price = np.where(in_window & ~np.isnan(low_w), low_w, np.inf).min(axis=1)
+    
+    # First bar of each event (width = never happened)
+    hits = np.stack([
+        (high_w >= target_prices[:, None]) & in_window,
+        (low_w <= stop_losses[:, None]) & in_window,
+        (close[positions] < ema[positions]) & in_window
+    ], axis=1)
+    first_bar = np.where(hits.any(axis=2), hits.argmax(axis=2), width)
+    
+    # argmin keeps the first of equal dates: TARGET, STOP, EMA
+    first_event = first_bar.argmin(axis=1)
+    event_bar = first_bar.min(axis=1)
+    
+    ema_reason = f'CLOSED_BELOW_{ema_label.upper().replace("-", "_").replace(" ", "_")}'
+    
+    outcomes = []
+    for i in range(len(signal_dates)):
+        if n_future[i] < 2:
+            outcomes.append({
+                'outcome': 'INSUFFICIENT_DATA',
+                'days_to_target': None,
+                'max_gain_pct': None,
+                'max_drawdown_pct': None
+            })
+            continue
+        
+        entry_price = entry_prices[i]
+        max_gain_pct = float((max_price[i] - entry_price) / entry_price * 100)
+        max_drawdown_pct = float((min_price[i] - entry_price) / entry_price * 100)
+        
+        if event_bar[i] == width:
+            # Nothing happened
+            outcomes.append({
+                'outcome': 'PENDING',
+                'reason': f'NO_EVENT_WITHIN_{max_days}_DAYS',
+                'days_to_target': None,
+                'max_gain_pct': max_gain_pct,
+                'max_drawdown_pct': max_drawdown_pct
+            })
+            continue
+        
+        pos = start[i] + event_bar[i]
+        days_elapsed = int((dates[pos] - signal_dates[i]) // np.timedelta64(1, 'D'))
+        
+        if first_event[i] == 0:
+            # Target reached first = SUCCESS
+            outcomes.append({
+                'outcome': 'SUCCESS',
+                'days_to_target': days_elapsed,
+                'max_gain_pct': max_gain_pct,
+                'max_drawdown_pct': max_drawdown_pct,
+                'win_reason': 'TARGET_REACHED_FIRST'
+            })
+        elif first_event[i] == 1:
+            # Stop loss hit first = FAILURE
+            outcomes.append({
+                'outcome': 'FAILURE',
+                'reason': 'STOP_LOSS_HIT_FIRST',
+                'days_to_failure': days_elapsed,
+                'days_to_target': None,
+                'max_gain_pct': max_gain_pct,
+                'max_drawdown_pct': max_drawdown_pct
+            })
+        else:
+            # Closed below EMA first = FAILURE
+            outcomes.append({
+                'outcome': 'FAILURE',
+                'reason': ema_reason,
+                'days_to_failure': days_elapsed,
+                'days_to_target': None,
+                'max_gain_pct': max_gain_pct,
+                'max_drawdown_pct': max_drawdown_pct,
+                'ema_breach_price': float(close[pos]),
+                'ema_value': float(ema[pos])
+            })
+    
+    return outcomes
+
+
+def _bar_dates(df: pd.DataFrame) -> np.ndarray:
+    """Bar dates from the Date column (analyzed frames) or the DatetimeIndex (raw yfinance)"""
+    dates = df['Date'] if 'Date' in df.columns else df.index
+    return pd.to_datetime(dates).to_numpy(dtype='datetime64[ns]')
+
+
+def label_signal_outcomes_batch(df: pd.DataFrame, signal_indices, entry_prices,
+                                target_prices, stop_losses, timeframe: str = 'Daily',
+                                max_days: int = OUTCOME_WINDOW_DAYS,
+                                history: pd.DataFrame = None) -> List[Dict]:
+    """
+    Label ALL signals of one stock from its already-analyzed history
+    
+    Same rules as label_signal_outcome, but no per-signal download: the
+    failure EMA and the forward windows come from one price history, so a
+    stock with 40 signals costs at most one extra (cached) fetch instead of 40.
+    
+    Args:
+        df: Analyzed frame for one stock (Date, High, Low, Close)
+        signal_indices: Row positions of the signals in df
+        entry_prices: Entry price per signal
+        target_prices: Target price per signal (+15%)
+        stop_losses: Stop loss per signal (-10%)
+        timeframe: 'Daily' or 'Weekly'
+        max_days: Max days to check (default 180)
+        history: Bars of the same timeframe from df's first bar past the
+                 analysis window (default: df - signals near its end stay
+                 PENDING)
+    
+    Returns:
+        List of outcome dicts, one per signal
+    """
+    if len(signal_indices) == 0:
+        return []
+    
+    span, ema_label = OUTCOME_EMA.get(timeframe, OUTCOME_EMA['Daily'])
+    
+    signal_dates = _bar_dates(df)[np.asarray(signal_indices, dtype=int)]
+    
+    if history is None:
+        history = df
+    
+    dates = _bar_dates(history)
+    close = history['Close'].to_numpy(dtype=float)
+    ema = history['Close'].ewm(span=span, adjust=False).mean().to_numpy(dtype=float)
+    
+    # Weekly bars are dated by the week's last day: keep the week that
+    # contains the last day of the window
+    window_ends = signal_dates + np.timedelta64(max_days, 'D')
+    if timeframe == 'Weekly':
+        window_ends = window_ends + np.timedelta64(6, 'D')
+    
+    return _label_outcomes(
+        dates,
+        history['High'].to_numpy(dtype=float),
+        history['Low'].to_numpy(dtype=float),
+        close,
+        ema,
+        signal_dates,
+        np.asarray(entry_prices, dtype=float),
+        np.asarray(target_prices, dtype=float),
+        np.asarray(stop_losses, dtype=float),
+        window_ends,
+        max_days,
+        ema_label
+    )
+
+
 def label_signal_outcome(symbol: str, signal_date: str, entry_price: float, 
                          target_price: float, stop_loss: float, timeframe: str = 'Daily',
-                         max_days: int = 180) -> Dict:
+                         max_days: int = OUTCOME_WINDOW_DAYS) -> Dict:
     """
     Label signal as SUCCESS or FAILURE based on future price action
     
@@ -281,6 +496,9 @@ def label_signal_outcome(symbol: str, signal_date: str, entry_price: float,
       - Daily: Price closes below 200-day EMA
       - Weekly: Price closes below 30-week EMA
     
+    Downloads the history for ONE signal - the scanner uses
+    label_signal_outcomes_batch on the frame it already analyzed.
+    
     Args:
         symbol: Stock symbol
         signal_date: Signal date
@@ -322,120 +540,26 @@ def label_signal_outcome(symbol: str, signal_date: str, entry_price: float,
         
         # Resample to weekly if needed
         if timeframe == 'Weekly':
-            full_df = full_df.resample('W').agg({
-                'Open': 'first',
-                'High': 'max',
-                'Low': 'min',
-                'Close': 'last',
-                'Volume': 'sum'
-            }).dropna()
-        
-        # Calculate EMA
-        if timeframe == 'Daily':
-            full_df['EMA'] = full_df['Close'].ewm(span=200, adjust=False).mean()
-            ema_label = '200-day EMA'
-        else:  # Weekly
-            full_df['EMA'] = full_df['Close'].ewm(span=30, adjust=False).mean()
-            ema_label = '30-week EMA'
-        
-        # Get data AFTER signal date
-        future_df = full_df[full_df.index > signal_dt]
-        
-        if len(future_df) < 2:
-            return {
-                'outcome': 'INSUFFICIENT_DATA',
-                'days_to_target': None,
-                'max_gain_pct': None,
-                'max_drawdown_pct': None
-            }
+            full_df = resample_ohlcv(full_df, 'weekly')
         
-        # Calculate metrics
-        max_price = float(future_df['High'].max())
-        min_price = float(future_df['Low'].min())
+        span, ema_label = OUTCOME_EMA.get(timeframe, OUTCOME_EMA['Daily'])
+        dates = _bar_dates(full_df)
         
-        max_gain_pct = ((max_price - entry_price) / entry_price) * 100
-        max_drawdown_pct = ((min_price - entry_price) / entry_price) * 100
-        
-        # Find FIRST occurrence of:
-        # 1. Target reached (SUCCESS)
-        # 2. Stop loss hit (FAILURE)
-        # 3. Close below EMA (FAILURE)
-        
-        target_reached_series = future_df['High'] >= target_price
-        stop_hit_series = future_df['Low'] <= stop_loss
-        ema_breach_series = future_df['Close'] < future_df['EMA']
-        
-        target_reached = target_reached_series.any()
-        stop_hit = stop_hit_series.any()
-        ema_breached = ema_breach_series.any()
-        
-        # Collect all events with their dates
-        events = []
-        
-        if target_reached:
-            target_day = future_df.index[target_reached_series][0]
-            events.append(('TARGET', target_day))
-        
-        if stop_hit:
-            stop_day = future_df.index[stop_hit_series][0]
-            events.append(('STOP', stop_day))
-        
-        if ema_breached:
-            ema_day = future_df.index[ema_breach_series][0]
-            events.append(('EMA', ema_day))
-        
-        if not events:
-            # Nothing happened
-            return {
-                'outcome': 'PENDING',
-                'reason': f'NO_EVENT_WITHIN_{max_days}_DAYS',
-                'days_to_target': None,
-                'max_gain_pct': float(max_gain_pct),
-                'max_drawdown_pct': float(max_drawdown_pct)
-            }
-        
-        # Sort by date to find what happened FIRST
-        events.sort(key=lambda x: x[1])
-        first_event, first_date = events[0]
-        
-        days_elapsed = (first_date - signal_dt).days
-        
-        if first_event == 'TARGET':
-            # Target reached first = SUCCESS
-            return {
-                'outcome': 'SUCCESS',
-                'days_to_target': int(days_elapsed),
-                'max_gain_pct': float(max_gain_pct),
-                'max_drawdown_pct': float(max_drawdown_pct),
-                'win_reason': 'TARGET_REACHED_FIRST'
-            }
-        
-        elif first_event == 'STOP':
-            # Stop loss hit first = FAILURE
-            return {
-                'outcome': 'FAILURE',
-                'reason': 'STOP_LOSS_HIT_FIRST',
-                'days_to_failure': int(days_elapsed),
-                'days_to_target': None,
-                'max_gain_pct': float(max_gain_pct),
-                'max_drawdown_pct': float(max_drawdown_pct)
-            }
-        
-        else:  # first_event == 'EMA'
-            # Closed below EMA first = FAILURE
-            ema_value = float(future_df.loc[first_date, 'EMA'])
-            close_value = float(future_df.loc[first_date, 'Close'])
-            
-            return {
-                'outcome': 'FAILURE',
-                'reason': f'CLOSED_BELOW_{ema_label.upper().replace("-", "_").replace(" ", "_")}',
-                'days_to_failure': int(days_elapsed),
-                'days_to_target': None,
-                'max_gain_pct': float(max_gain_pct),
-                'max_drawdown_pct': float(max_drawdown_pct),
-                'ema_breach_price': float(close_value),
-                'ema_value': float(ema_value)
-            }
+        # The download already ends at the window end - use every bar
+        return _label_outcomes(
+            dates,
+            full_df['High'].to_numpy(dtype=float),
+            full_df['Low'].to_numpy(dtype=float),
+            full_df['Close'].to_numpy(dtype=float),
+            full_df['Close'].ewm(span=span, adjust=False).mean().to_numpy(dtype=float),
+            np.array([signal_dt], dtype='datetime64[ns]'),
+            np.array([entry_price], dtype=float),
+            np.array([target_price], dtype=float),
+            np.array([stop_loss], dtype=float),
+            dates[-1:] + np.timedelta64(1, 'D'),
+            max_days,
+            ema_label
+        )[0]
     
     except Exception as e:
         print(f"  ⚠️  Error labeling signal: {str(e)[:100]}")
@@ -446,11 +570,109 @@ def label_signal_outcome(symbol: str, signal_date: str, entry_price: float,
 # BATCH SCANNER
 # ============================================================================
 
+# Fixed column order so per-symbol rows can be appended to one CSV
+SIGNAL_COLUMNS = [
+    'stock_symbol', 'signal_date', 'tr_status', 'entry_price',
+    'has_buy_point', 'has_rs_chaikin', 'quality_level',
+    'ppo_value', 'ppo_histogram', 'pmo_value', 'pmo_signal',
+    'ema_3', 'ema_9', 'ema_20', 'ema_34',
+    'relative_strength', 'chaikin_ad', 'buy_point',
+    'target_price', 'stop_loss',
+    'outcome', 'days_to_target', 'max_gain_pct', 'max_drawdown_pct',
+    'timeframe', 'reason', 'win_reason', 'days_to_failure',
+    'ema_breach_price', 'ema_value'
+]
+
+# Symbols per batch download in parallel mode
+SCAN_BATCH_SIZE = 100
+
+
+def extract_and_label_signals(df: pd.DataFrame, symbol: str, timeframe: str,
+                              history: pd.DataFrame = None) -> List[Dict]:
+    """
+    Extract Strong Buy signals from an analyzed frame and label their outcomes
+    
+    Args:
+        df: TR analysis for one stock
+        symbol: Stock ticker
+        timeframe: 'Daily' or 'Weekly'
+        history: Bars through end_date + the outcome window, from
+                 outcome_history (default: label from df only)
+    
+    Returns:
+        List of labeled signal dicts
+    """
+    # Extract Strong Buy signals
+    signals = extract_tr_signals(df, symbol)
+    
+    # Add timeframe to each signal
+    for signal in signals:
+        signal['timeframe'] = timeframe
+    
+    print(f"  ✅ Found {len(signals)} Strong Buy signals")
+    
+    # Label all signals in one pass (no per-signal downloads)
+    outcomes = label_signal_outcomes_batch(
+        df,
+        get_strong_buy_indices(df),
+        [s['entry_price'] for s in signals],
+        [s['target_price'] for s in signals],
+        [s['stop_loss'] for s in signals],
+        timeframe=timeframe,  # Pass timeframe for EMA check
+        history=history
+    )
+    
+    labeled_count = 0
+    for signal, outcome in zip(signals, outcomes):
+        signal.update(outcome)
+        
+        if outcome['outcome'] in ['SUCCESS', 'FAILURE']:
+            labeled_count += 1
+    
+    print(f"  ✅ Labeled {labeled_count} signals")
+    
+    return signals
+
+
+def outcome_history_end(end_date: str) -> str:
+    """
+    Last date the outcome labels need: end_date + the forward window
+    (+1 week so the last weekly bar is complete), capped at tomorrow
+    """
+    label_end = min(pd.Timestamp(end_date) + timedelta(days=OUTCOME_WINDOW_DAYS + 7),
+                    pd.Timestamp(datetime.now().date() + timedelta(days=1)))
+    return label_end.strftime('%Y-%m-%d')
+
+
+def outcome_history(raw_df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Labeling bars from raw daily bars that run past the analysis window (same preparation as the analysis)"""
+    return prepare_market_data(raw_df, timeframe.lower())
+
+
+def _fetch_outcome_history(symbol: str, start_date: str, end_date: str, timeframe: str) -> pd.DataFrame:
+    """Serial scan: bars from start_date through end_date + the outcome window (universal cache)"""
+    from universal_cache import get_stock_data
+    
+    if not PARALLEL_SCAN_AVAILABLE:
+        return None  # Label from the analyzed frame (needs tr_enhanced)
+    
+    try:
+        raw_df = get_stock_data(symbol, start_date, outcome_history_end(end_date), interval='1d')
+    except Exception as e:
+        print(f"  ⚠️  Could not fetch outcome bars for {symbol}: {e}")
+        return None
+    
+    return outcome_history(raw_df, timeframe)
+
+
 def scan_multiple_stocks(stock_list: List[str], 
                          start_date: str, 
                          end_date: str,
                          scan_both_timeframes: bool = True,
-                         output_file: str = 'tr_signals_labeled.csv') -> pd.DataFrame:
+                         output_file: str = 'tr_signals_labeled.csv',
+                         workers: int = 1,
+                         resume: bool = False,
+                         batch_size: int = SCAN_BATCH_SIZE) -> pd.DataFrame:
     """
     Scan multiple stocks for TR signals using YOUR existing TR code
     
@@ -460,33 +682,37 @@ def scan_multiple_stocks(stock_list: List[str],
         end_date: End date
         scan_both_timeframes: If True, scans BOTH Daily and Weekly (default True)
         output_file: Output CSV filename
+        workers: Worker processes (1 = serial scan, >1 = parallel scan)
+        resume: Parallel scan only - skip symbols finished by a previous run
+        batch_size: Parallel scan only - symbols per batch download
     
     Returns:
         DataFrame with all signals (Daily + Weekly combined)
     """
     
-    all_signals = []
+    if workers > 1 and PARALLEL_SCAN_AVAILABLE:
+        return scan_multiple_stocks_parallel(
+            stock_list, start_date, end_date,
+            scan_both_timeframes=scan_both_timeframes,
+            output_file=output_file,
+            workers=workers,
+            resume=resume,
+            batch_size=batch_size
+        )
     
-    print(f"\n{'='*80}")
-    print(f"TR SIGNAL SCANNER - Using YOUR TR Indicator Code")
-    print(f"{'='*80}")
-    print(f"Stocks: {len(stock_list)}")
-    print(f"Period: {start_date} to {end_date}")
+    if workers > 1:
+        print("⚠️  Parallel scan needs tr_enhanced.py - running serial scan")
     
-    if scan_both_timeframes:
-        print(f"Timeframes: Daily AND Weekly ✅")
-    else:
-        print(f"Timeframe: Daily only")
+    all_signals = []
     
-    if USING_EXISTING_CODE:
-        print(f"✅ Using YOUR existing tr_enhanced.py")
-    else:
-        print(f"⚠️  Using fallback code")
-    print(f"{'='*80}\n")
+    print_scan_header(stock_list, start_date, end_date, scan_both_timeframes)
     
     # Determine which timeframes to scan
     timeframes_to_scan = ['Daily', 'Weekly'] if scan_both_timeframes else ['Daily']
     
+    # SPY for RS, fetched once for all symbols (same as the parallel scan)
+    market_data = _fetch_scan_market_data(start_date, end_date, timeframes_to_scan) if PARALLEL_SCAN_AVAILABLE else {}
+    
     for timeframe in timeframes_to_scan:
         print(f"\n{'='*80}")
         print(f"SCANNING {timeframe.upper()} TIMEFRAME")
@@ -497,40 +723,16 @@ def scan_multiple_stocks(stock_list: List[str],
             
             try:
                 # Use YOUR TR indicator code!
-                df = analyze_stock_tr_for_scanner(symbol, start_date, end_date, timeframe=timeframe)
+                df = analyze_stock_tr_for_scanner(symbol, start_date, end_date, timeframe=timeframe,
+                                                  market_df=market_data.get(timeframe))
                 
                 if df.empty:
                     print(f"  ⚠️  Skipping {symbol} - no data")
                     continue
                 
-                # Extract Strong Buy signals
-                signals = extract_tr_signals(df, symbol)
-                
-                # Add timeframe to each signal
-                for signal in signals:
-                    signal['timeframe'] = timeframe
-                
-                print(f"  ✅ Found {len(signals)} Strong Buy signals")
-                
-                # Label each signal
-                labeled_count = 0
-                for signal in signals:
-                    outcome = label_signal_outcome(
-                        symbol,
-                        signal['signal_date'],
-                        signal['entry_price'],
-                        signal['target_price'],
-                        signal['stop_loss'],
-                        timeframe=timeframe  # Pass timeframe for EMA check
-                    )
-                    
-                    signal.update(outcome)
-                    
-                    if outcome['outcome'] in ['SUCCESS', 'FAILURE']:
-                        labeled_count += 1
-                
-                print(f"  ✅ Labeled {labeled_count} signals")
-                all_signals.extend(signals)
+                # Outcomes need the bars after end_date (the analysis stops there)
+                history = _fetch_outcome_history(symbol, start_date, end_date, timeframe)
+                all_signals.extend(extract_and_label_signals(df, symbol, timeframe, history=history))
                 
             except Exception as e:
                 print(f"  ❌ Error with {symbol}: {str(e)[:100]}")
@@ -548,10 +750,249 @@ def scan_multiple_stocks(stock_list: List[str],
     # Save to CSV
     df_signals.to_csv(output_file, index=False)
     
+    print_scan_summary(df_signals, output_file)
+    
+    return df_signals
+
+
+# ============================================================================
+# PARALLEL SCANNER
+# ============================================================================
+#
+# Main process: batch-downloads SCAN_BATCH_SIZE symbols at a time through
+#   batch_fetcher and fetches SPY once (universal_cache)
+# Workers: TR analysis + labeling on the pre-fetched frames (no per-symbol
+#   download for the analysis)
+# Output: each finished symbol is appended to the CSV and recorded in a
+#   '<output_file>.done' progress file, so a crashed scan can be resumed
+
+_WORKER_MARKET_DATA = {}
+
+
+def _init_scan_worker(market_data: Dict[str, pd.DataFrame]):
+    """Process pool initializer: market data is sent once per worker, not per symbol"""
+    global _WORKER_MARKET_DATA
+    _WORKER_MARKET_DATA = market_data
+
+
+def _scan_symbol_worker(symbol: str, raw_df: pd.DataFrame, timeframes: List[str], end_date: str = None):
+    """
+    Analyze and label one pre-fetched symbol (runs in a worker process)
+    
+    raw_df runs through end_date + the outcome window: the analysis stops
+    at end_date, the outcome labels use the bars after it.
+    
+    Returns:
+        Tuple (symbol, signals, error message or None)
+    """
+    signals = []
+    
+    try:
+        for timeframe in timeframes:
+            df = analyze_prefetched_tr(
+                raw_df, symbol, timeframe.lower(),
+                market_df=_WORKER_MARKET_DATA.get(timeframe),
+                end_date=end_date
+            )
+            
+            if df is None or df.empty:
+                continue
+            
+            history = outcome_history(raw_df, timeframe)
+            signals.extend(extract_and_label_signals(df, symbol, timeframe, history=history))
+    except Exception as e:
+        return symbol, [], str(e)[:100]
+    
+    return symbol, signals, None
+
+
+def get_progress_file(output_file: str) -> str:
+    """Progress file listing the symbols already written to output_file"""
+    return f"{output_file}.done"
+
+
+def load_scan_progress(output_file: str) -> set:
+    """Symbols finished by a previous (possibly crashed) parallel scan"""
+    progress_file = get_progress_file(output_file)
+    
+    if not os.path.exists(progress_file):
+        return set()
+    
+    with open(progress_file) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def append_symbol_signals(symbol: str, signals: List[Dict], output_file: str):
+    """Append one symbol's signals to the CSV, then mark the symbol done"""
+    if signals:
+        rows = pd.DataFrame(signals).reindex(columns=SIGNAL_COLUMNS)
+        write_header = not os.path.exists(output_file)
+        rows.to_csv(output_file, mode='a', header=write_header, index=False)
+    
+    with open(get_progress_file(output_file), 'a') as f:
+        f.write(f"{symbol}\n")
+
+
+def _fetch_scan_batch(symbols: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+    """Batch download one chunk of the universe"""
+    from batch_fetcher import batch_fetch_yahoo_by_dates
+    
+    return batch_fetch_yahoo_by_dates(symbols, start_date, end_date)
+
+
+def _fetch_scan_market_data(start_date: str, end_date: str, timeframes: List[str]) -> Dict[str, pd.DataFrame]:
+    """SPY for RS, fetched once and prepared once per timeframe"""
+    from universal_cache import get_stock_data
+    
+    try:
+        market_df = get_stock_data('SPY', start_date, end_date, interval='1d')
+    except Exception as e:
+        print(f"⚠️  Could not fetch SPY: {e}")
+        market_df = None
+    
+    return {tf: prepare_market_data(market_df, tf.lower()) for tf in timeframes}
+
+
+def scan_multiple_stocks_parallel(stock_list: List[str],
+                                  start_date: str,
+                                  end_date: str,
+                                  scan_both_timeframes: bool = True,
+                                  output_file: str = 'tr_signals_labeled.csv',
+                                  workers: int = None,
+                                  resume: bool = False,
+                                  batch_size: int = SCAN_BATCH_SIZE) -> pd.DataFrame:
+    """
+    Parallel TR scan: batch pre-fetch + process pool + streaming CSV output
+    
+    Downloading the next batch overlaps with the workers analyzing the
+    current one, and at most two batches of raw data are held in memory.
+    
+    Args:
+        stock_list: List of stock symbols
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        scan_both_timeframes: If True, scans BOTH Daily and Weekly (default True)
+        output_file: Output CSV filename (rows are appended per symbol)
+        workers: Worker processes (default: CPU count - 1)
+        resume: Skip symbols already in '<output_file>.done' and keep
+                their rows; otherwise start a fresh output file
+        batch_size: Symbols per batch download
+    
+    Returns:
+        DataFrame with all signals (Daily + Weekly combined)
+    """
+    workers = workers or max(1, (os.cpu_count() or 2) - 1)
+    timeframes = ['Daily', 'Weekly'] if scan_both_timeframes else ['Daily']
+    
+    if resume:
+        done = load_scan_progress(output_file)
+    else:
+        done = set()
+        for path in (output_file, get_progress_file(output_file)):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    pending = [s for s in dict.fromkeys(stock_list) if s not in done]
+    
+    print_scan_header(stock_list, start_date, end_date, scan_both_timeframes)
+    print(f"⚡ Parallel scan: {workers} workers, batches of {batch_size}")
+    if done:
+        print(f"🔁 Resuming: {len(done)} symbols already done, {len(pending)} remaining")
+    
+    start_time = datetime.now()
+    market_data = _fetch_scan_market_data(start_date, end_date, timeframes)
+    
+    # Batches run past end_date so the outcome labels see the forward window
+    fetch_end = outcome_history_end(end_date)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    completed = 0
+    
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_scan_worker,
+                             initargs=(market_data,)) as executor:
+        
+        next_data = _fetch_scan_batch(batches[0], start_date, fetch_end) if batches else {}
+        
+        for batch_num, batch in enumerate(batches):
+            batch_data = next_data
+            
+            futures = {}
+            for symbol in batch:
+                raw_df = batch_data.get(symbol)
+                if raw_df is None or raw_df.empty:
+                    # Empty result = no data for this symbol; missing key = batch
+                    # download failed, leave it pending for the next resume
+                    if symbol in batch_data:
+                        print(f"  ⚠️  Skipping {symbol} - no data")
+                        append_symbol_signals(symbol, [], output_file)
+                    completed += 1
+                    continue
+                futures[executor.submit(_scan_symbol_worker, symbol, raw_df, timeframes, end_date)] = symbol
+            
+            # Download the next batch while the workers run this one
+            del batch_data
+            if batch_num + 1 < len(batches):
+                next_data = _fetch_scan_batch(batches[batch_num + 1], start_date, fetch_end)
+            
+            for future in as_completed(futures):
+                completed += 1
+                symbol, signals, error = future.result()
+                
+                if error:
+                    print(f"  ❌ Error with {symbol}: {error}")
+                    continue
+                
+                append_symbol_signals(symbol, signals, output_file)
+                print(f"[{completed}/{len(pending)}] {symbol}: {len(signals)} signals")
+    
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"\n⏱️  Scanned {len(pending)} symbols in {elapsed:.1f}s")
+    
+    if not os.path.exists(output_file):
+        print("\n⚠️  No signals collected!")
+        return pd.DataFrame()
+    
+    # A crash between the CSV append and the progress update re-scans that symbol
+    df_signals = pd.read_csv(output_file).drop_duplicates(
+        subset=['stock_symbol', 'timeframe', 'signal_date'], keep='last'
+    ).reset_index(drop=True)
+    
+    print_scan_summary(df_signals, output_file)
+    
+    return df_signals
+
+
+# ============================================================================
+# SCAN REPORTING
+# ============================================================================
+
+def print_scan_header(stock_list: List[str], start_date: str, end_date: str,
+                      scan_both_timeframes: bool):
+    """Print the scan banner"""
+    print(f"\n{'='*80}")
+    print(f"TR SIGNAL SCANNER - Using YOUR TR Indicator Code")
+    print(f"{'='*80}")
+    print(f"Stocks: {len(stock_list)}")
+    print(f"Period: {start_date} to {end_date}")
+    
+    if scan_both_timeframes:
+        print(f"Timeframes: Daily AND Weekly ✅")
+    else:
+        print(f"Timeframe: Daily only")
+    
+    if USING_EXISTING_CODE:
+        print(f"✅ Using YOUR existing tr_enhanced.py")
+    else:
+        print(f"⚠️  Using fallback code")
+    print(f"{'='*80}\n")
+
+
+def print_scan_summary(df_signals: pd.DataFrame, output_file: str):
+    """Print signal counts and success rates by timeframe and quality level"""
     print(f"\n{'='*80}")
     print(f"SCAN COMPLETE!")
     print(f"{'='*80}")
-    print(f"Total signals found: {len(all_signals)}")
+    print(f"Total signals found: {len(df_signals)}")
     
     # Show breakdown by timeframe
     if 'timeframe' in df_signals.columns:
@@ -614,8 +1055,6 @@ def scan_multiple_stocks(stock_list: List[str],
     
     print(f"\nSaved to: {output_file}")
     print(f"{'='*80}\n")
-    
-    return df_signals
 
 
 # ============================================================================
@@ -628,3 +1067,27 @@ if __name__ == "__main__":
     print("=" * 80)
     print("\nThis scanner uses YOUR existing TR indicator code.")
     print("Make sure tr_indicator.py is in the same folder!\n")
+    
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Scan stocks for TR Strong Buy signals and label outcomes")
+    parser.add_argument('--csv', default=None, help="Stock list CSV (default: stocks_list.csv)")
+    parser.add_argument('--start', default=(datetime.now() - timedelta(days=730)).strftime('%Y-%m-%d'), help="Start date (YYYY-MM-DD)")
+    parser.add_argument('--end', default=datetime.now().strftime('%Y-%m-%d'), help="End date (YYYY-MM-DD)")
+    parser.add_argument('--daily-only', action='store_true', help="Skip the weekly timeframe")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (>1 = parallel scan)")
+    parser.add_argument('--resume', action='store_true', help="Continue a crashed parallel scan")
+    parser.add_argument('--output', default='tr_signals_labeled.csv', help="Output CSV")
+    args = parser.parse_args()
+    
+    from universe_rs import load_universe_symbols
+    
+    scan_multiple_stocks(
+        load_universe_symbols(args.csv),
+        args.start,
+        args.end,
+        scan_both_timeframes=not args.daily_only,
+        output_file=args.output,
+        workers=args.workers,
+        resume=args.resume
+    )
@@ -0,0 +1,793 @@
+"""
+TR STREAMING STATE
+==================
+Incremental TR analysis for the newest bar
+
+analyze_prefetched_tr recomputes every indicator over the whole history,
+even when only the latest bar changed. TRState carries the recursive parts
+forward instead (EMAs, PPO, PMO, slopes, the last confirmed peak, the RS
+and Chaikin windows), so a new or revised bar costs a fixed amount of work
+no matter how long the history is.
+
+USAGE:
+    state = TRState.from_history(daily_df, 'daily', market_df=spy_df)
+    status = state.update(bar, market_bar=spy_bar)    # e.g. 'Strong Buy ✓ *'
+    save_tr_state(state, 'NVDA')                       # next to the cached history
+
+    state = load_tr_state('NVDA', 'daily')             # later / another process
+
+- update() with a NEW date appends a bar
+- update() with the SAME date revises the latest bar (intraday refresh)
+- Weekly states take daily bars and fold them into the current week
+
+The status (and every column in state.latest) matches the last row of
+analyze_prefetched_tr on the same history. Universe RS ratings are not
+looked up here - pass the bar's rating as rs= to use it instead of the
+stock-vs-market RS.
+"""
+
+import json
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from tr_calculations import IBD_RS_WEIGHTS
+from tr_indicator import TR_STAGE_NAMES
+from tr_enhanced import (
+    STATUS_MARKERS,
+    SIGNAL_MARKERS,
+    format_tr_status,
+    prepare_ohlcv_data,
+    prepare_market_data,
+    detect_and_adjust_splits
+)
+from universal_cache import HISTORY_DIR
+from cache_storage import write_json
+
+# Bump when the checkpoint layout changes (old checkpoints are rebuilt)
+STATE_VERSION = 1
+
+# EWM spans, same as calculate_all_indicators / calculate_ppo / calculate_pmo
+EWM_SPANS = {
+    'ema_3': 3,
+    'ema_9': 9,
+    'ema_20': 20,
+    'ema_34': 34,
+    'ppo_fast': 12,
+    'ppo_slow': 26,
+    'ppo_signal': 9,
+    'pmo_smooth1': 35,
+    'pmo_smooth2': 20,
+    'pmo_signal': 10
+}
+
+SLOPE_PERIODS = 3
+PEAK_LOOKBACK = 5
+PEAK_THRESHOLD = 0.02
+BUY_POINT_LOOKBACK = 50
+BUY_ZONE_PCT = 5.0
+STOP_LOSS_PCT = 8.0
+
+# RS lookbacks (1yr, 6mo, 3mo, 1mo) and Chaikin ranking window per timeframe
+RS_PERIODS = {
+    'daily': [252, 126, 63, 21],
+    'weekly': [52, 26, 13, 4]
+}
+CHAIKIN_PERIODS = {
+    'daily': 252,
+    'weekly': 52,
+    'monthly': 12
+}
+
+# Market bars kept for RS (1yr lookback + a few bars ahead of the stock)
+MARKET_BUFFER = 260
+
+# Indicator state that a same-date revision rolls back
+_CORE_FIELDS = [
+    'count', 'last_date', 'ewm', 'slopes', 'prev_ema_3', 'prev_ema_9',
+    'prev_stage', 'prev_close', 'prev_volume', 'peak_window', 'last_peak',
+    'closes', 'ad_line', 'ad_window', 'latest'
+]
+
+
+class TRState:
+    """
+    Running TR analysis of one stock on one timeframe
+    """
+
+    def __init__(self, timeframe='daily', strength_timeframe='daily'):
+        """
+        Args:
+            timeframe (str): 'daily' or 'weekly' bars
+            strength_timeframe (str): RS / Chaikin windows. analyze_prefetched_tr
+                                      frames carry no TimeFrame column, so it
+                                      ranks on the daily windows for both
+        """
+        self.timeframe = timeframe.lower()
+        self.strength_timeframe = strength_timeframe.lower()
+        self.needs_rebuild = False
+
+        rs_key = 'daily' if self.strength_timeframe == 'daily' else 'weekly'
+        self.rs_periods = RS_PERIODS[rs_key]
+        self.chaikin_period = CHAIKIN_PERIODS.get(self.strength_timeframe, 252)
+
+        # Indicator state (see _CORE_FIELDS)
+        self.count = 0
+        self.last_date = None
+        self.ewm = {name: [np.nan, 1.0] for name in EWM_SPANS}
+        self.slopes = {name: deque(maxlen=SLOPE_PERIODS) for name in ['ema_9', 'ema_34', 'ppo', 'pmo']}
+        self.prev_ema_3 = np.nan
+        self.prev_ema_9 = np.nan
+        self.prev_stage = 0
+        self.prev_close = np.nan
+        self.prev_volume = np.nan
+        self.peak_window = deque(maxlen=2 * PEAK_LOOKBACK + 1)
+        self.last_peak = None
+        self.closes = deque(maxlen=max(self.rs_periods) + 1)
+        self.ad_line = 0.0
+        self.ad_window = deque(maxlen=self.chaikin_period)
+        self.latest = None
+
+        # State before the latest bar (restored when that bar is revised)
+        self._previous = None
+
+        # Market closes for RS: [date, close] pairs, as-of aligned by date
+        self.market = deque(maxlen=MARKET_BUFFER)
+        self.market_count = 0
+
+        # Weekly bars: aggregate of the week's daily bars before the last one
+        self.week_base = None
+        self.last_daily_date = None
+        self.latest_bar = None
+
+    # ═══════════════════════════════════════════════════════════════
+    # BUILD / UPDATE
+    # ═══════════════════════════════════════════════════════════════
+
+    @classmethod
+    def from_history(cls, df, timeframe='daily', market_df=None, strength_timeframe='daily'):
+        """
+        Build the state by running through an OHLCV history once
+
+        Args:
+            df (pd.DataFrame): Raw daily OHLCV data (as for analyze_prefetched_tr)
+            timeframe (str): 'daily' or 'weekly'
+            market_df (pd.DataFrame): Raw daily market (SPY) data, optional.
+                                      Bars after the last stock bar are left
+                                      for update(market_bar=...)
+            strength_timeframe (str): RS / Chaikin windows (see __init__)
+
+        Returns:
+            TRState: State positioned on the last bar
+        """
+        state = cls(timeframe, strength_timeframe)
+
+        daily = prepare_ohlcv_data(df, 'daily')
+        if daily is None:
+            return state
+
+        bars = detect_and_adjust_splits(prepare_ohlcv_data(df, state.timeframe))
+
+        market = prepare_market_data(market_df, state.timeframe) if market_df is not None else None
+        market_rows = market[['Date', 'Close']].to_numpy(dtype=object) if market is not None else []
+        next_market = 0
+
+        records = bars.to_dict('records')
+        for i, bar in enumerate(records):
+            # Market bars up to this bar's date (as-of alignment)
+            while next_market < len(market_rows) and market_rows[next_market][0] <= bar['Date']:
+                state._push_market(*market_rows[next_market])
+                next_market += 1
+
+            if i == len(records) - 1:
+                state._push(bar, revise=False)
+            else:
+                state._apply(bar)
+
+        # Seed the current week with its daily bars, so the next daily bar folds in
+        if state.timeframe == 'weekly':
+            week = daily[_week_label(daily['Date']) == _week_label(daily['Date'].iloc[-1])]
+            state.week_base = _combine_bars(None, week.iloc[:-1].to_dict('records'))
+            state.last_daily_date = pd.Timestamp(daily['Date'].iloc[-1])
+            state.latest_bar = _as_bar(daily.iloc[-1])
+
+        return state
+
+    def update(self, bar, market_bar=None, rs=None):
+        """
+        Add (or revise) the newest bar and return its enhanced TR status
+
+        Args:
+            bar (dict or pd.Series): Daily bar with Date, Open, High, Low, Close, Volume
+                                     (Date may also be the Series name)
+            market_bar (dict or pd.Series): Market bar for the same session (optional)
+            rs (float): Universe RS Rating for this bar (optional)
+
+        Returns:
+            str: TR_Status_Enhanced of the newest bar, or None if a split was
+                 detected (rebuild with from_history)
+        """
+        if market_bar is not None:
+            self.update_market(market_bar)
+
+        if self.needs_rebuild:
+            return None
+
+        bar = _as_bar(bar)
+
+        # Same rule as prepare_ohlcv_data: bars without a close are dropped
+        if pd.isna(bar['Close']):
+            return self.status
+
+        if self.timeframe == 'weekly':
+            if self.last_daily_date is not None and bar['Date'] < self.last_daily_date:
+                return self.status
+            bar, revise = self._fold_into_week(bar)
+        else:
+            if self.last_date is not None and bar['Date'] < self.last_date:
+                return self.status
+            revise = bar['Date'] == self.last_date
+
+        row = self._push(bar, revise, rs)
+
+        return row['TR_Status_Enhanced'] if row is not None else None
+
+    def update_market(self, bar):
+        """
+        Add (or revise) the newest market bar used for RS
+
+        Args:
+            bar (dict or pd.Series): Market bar with Date and Close
+        """
+        bar = _as_bar(bar)
+
+        if pd.isna(bar['Close']):
+            return
+
+        date = bar['Date']
+        if self.timeframe == 'weekly':
+            date = _week_label(date)
+
+        self._push_market(date, bar['Close'])
+
+    @property
+    def status(self):
+        """TR_Status_Enhanced of the newest bar (None before the first bar)"""
+        return self.latest['TR_Status_Enhanced'] if self.latest is not None else None
+
+    def _push(self, bar, revise, rs=None):
+        """Apply a bar as new, or as a revision of the latest bar"""
+        if revise:
+            self._restore(self._previous)
+        else:
+            self._previous = self._snapshot()
+
+        return self._apply(bar, rs)
+
+    def _push_market(self, date, close):
+        """Append a market close, or replace it when the date repeats"""
+        date = pd.Timestamp(date)
+
+        if self.market and date == self.market[-1][0]:
+            self.market[-1] = [date, float(close)]
+        elif not self.market or date > self.market[-1][0]:
+            self.market.append([date, float(close)])
+            self.market_count += 1
+
+    def _fold_into_week(self, bar):
+        """
+        Merge a daily bar into its weekly bar
+
+        Returns:
+            tuple: (weekly bar, True if it revises the latest weekly bar)
+        """
+        label = _week_label(bar['Date'])
+        same_week = self.last_date is not None and label == self.last_date
+
+        if not same_week:
+            self.week_base = None
+        elif bar['Date'] != self.last_daily_date:
+            # Previous daily bar is final - it becomes part of the base
+            self.week_base = _combine_bars(self.week_base, [self.latest_bar])
+
+        self.last_daily_date = bar['Date']
+        self.latest_bar = bar
+
+        weekly = _combine_bars(self.week_base, [bar])
+        weekly['Date'] = label
+
+        return weekly, same_week
+
+    # ═══════════════════════════════════════════════════════════════
+    # ONE BAR
+    # ═══════════════════════════════════════════════════════════════
+
+    def _apply(self, bar, rs=None):
+        """
+        Advance every indicator by one bar
+
+        Returns:
+            dict: Analysis columns for the bar, or None if it looks like a split
+        """
+        i = self.count
+        date = pd.Timestamp(bar['Date'])
+        open_ = float(bar.get('Open', np.nan))
+        high = float(bar['High'])
+        low = float(bar['Low'])
+        close = float(bar['Close'])
+        volume = float(bar.get('Volume', np.nan))
+
+        # Same signature as detect_and_adjust_splits: history would be rewritten
+        if i > 0 and _looks_like_split(close, self.prev_close, volume, self.prev_volume):
+            print(f"⚠️  Split detected on {date.date()} - rebuild the TR state from history")
+            self.needs_rebuild = True
+            return None
+
+        # ───── EMAs, PPO, PMO ─────
+        ema_3 = self._ewm('ema_3', close)
+        ema_9 = self._ewm('ema_9', close)
+        ema_20 = self._ewm('ema_20', close)
+        ema_34 = self._ewm('ema_34', close)
+
+        ema_fast = self._ewm('ppo_fast', close)
+        ema_slow = self._ewm('ppo_slow', close)
+        ppo = ((ema_fast - ema_slow) / ema_slow) * 100
+        ppo_signal = self._ewm('ppo_signal', ppo)
+
+        roc = (close / self.prev_close - 1) * 100 if i > 0 else np.nan
+        pmo_smooth1 = self._ewm('pmo_smooth1', roc)
+        pmo = self._ewm('pmo_smooth2', pmo_smooth1) * 10
+        pmo_signal = self._ewm('pmo_signal', pmo)
+
+        # ───── Slopes (vs 3 bars ago) ─────
+        ema_9_rising = self._rising('ema_9', ema_9)
+        ema_34_rising = self._rising('ema_34', ema_34)
+        ppo_rising = self._rising('ppo', ppo)
+        pmo_rising = self._rising('pmo', pmo)
+
+        # ───── TR stage (same conditions as calculate_stage_masks) ─────
+        warm_34 = i >= 34
+        uptrend_stage1 = i >= 1 and ema_3 > ema_9 and self.prev_ema_3 <= self.prev_ema_9
+        downtrend_stage1 = i >= 1 and ema_3 < ema_9 and self.prev_ema_3 >= self.prev_ema_9
+        uptrend_stage2 = (warm_34 and ppo > 0 and ppo_rising and ema_34_rising and
+                          ppo > ppo_signal and ema_9 > ema_20)
+        uptrend_stage3 = (warm_34 and ppo > 0 and ppo_rising and ema_9_rising and ema_34_rising and
+                          pmo > 0 and ppo > ppo_signal)
+        downtrend_stage2 = (warm_34 and ppo < 0 and not ppo_rising and ppo < ppo_signal and
+                            not ema_9_rising and not ema_34_rising and ema_9 < ema_20)
+        downtrend_stage3 = (warm_34 and ppo <= 0 and not ppo_rising and not ema_9_rising and
+                            not ema_34_rising and not pmo_rising and pmo < pmo_signal and ema_9 < ema_34)
+
+        if uptrend_stage2:
+            stage = 3 if uptrend_stage3 else 2
+        elif downtrend_stage2:
+            stage = -3 if downtrend_stage3 else -2
+        elif uptrend_stage1:
+            stage = 1
+        elif downtrend_stage1:
+            stage = -1
+        else:
+            stage = 0
+
+        # ───── Peaks: the bar PEAK_LOOKBACK back now has both sides ─────
+        self.peak_window.append((high, low, date))
+        if self._is_confirmed_peak():
+            peak_high, _, peak_date = self.peak_window[PEAK_LOOKBACK]
+            self.last_peak = (i - PEAK_LOOKBACK, peak_high, peak_date)
+
+        buy_point, days_from_peak, peak_date = self._buy_point(i)
+        valid_bp = buy_point if buy_point > 0 else np.nan
+        distance_pct = ((close - valid_bp) / valid_bp) * 100
+        in_buy_zone = -BUY_ZONE_PCT <= distance_pct <= BUY_ZONE_PCT
+        stop_loss = valid_bp * (1 - STOP_LOSS_PCT / 100)
+
+        # Previous bar's zone, with the peaks known as of this bar
+        prev_bp = self._buy_point(i - 1)[0] if i > 0 else np.nan
+        prev_bp = prev_bp if prev_bp > 0 else np.nan
+        prev_distance = ((self.prev_close - prev_bp) / prev_bp) * 100
+        prev_in_zone = -BUY_ZONE_PCT <= prev_distance <= BUY_ZONE_PCT
+
+        # ───── Buy / exit signals (identify_buy_and_exit_signals) ─────
+        has_prev = i > 0
+        prev_stage = self.prev_stage if has_prev else 0
+        uptrend = stage >= 2
+
+        buy_signal = in_buy_zone and uptrend and (
+            not has_prev or prev_stage < 2 or not prev_in_zone or (stage == 3 and prev_stage == 2)
+        )
+
+        exit_reason = ''
+        if has_prev and close <= stop_loss:
+            exit_reason = f'Stop Loss Hit (${stop_loss:.2f})'
+        elif has_prev and stage <= -2 and prev_stage > -2:
+            exit_reason = f'TR Sell Signal ({TR_STAGE_NAMES[stage]})'
+        elif has_prev and stage == -1 and prev_stage > 0:
+            exit_reason = 'Downtrend Starting (Neutral Sell)'
+
+        # ───── RS & Chaikin ─────
+        self.closes.append(close)
+        rs_value = self._relative_strength(i, date)
+        if rs is not None and not pd.isna(rs):
+            rs_value = float(rs)
+
+        chaikin = self._chaikin(high, low, close, volume)
+
+        row = {
+            'Date': date,
+            'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume,
+            'EMA_3': ema_3, 'EMA_9': ema_9, 'EMA_20': ema_20, 'EMA_34': ema_34,
+            'PPO_Line': ppo, 'PPO_Signal': ppo_signal, 'PPO_Histogram': ppo - ppo_signal,
+            'PMO_Line': pmo, 'PMO_Signal': pmo_signal,
+            'TR_Stage': stage,
+            'TR_Status': TR_STAGE_NAMES[stage],
+            'Buy_Point': buy_point,
+            'Days_From_Peak': days_from_peak,
+            'Peak_Date': peak_date,
+            'In_Buy_Zone': in_buy_zone,
+            'Distance_From_BP': distance_pct,
+            'Buy_Zone_Lower': valid_bp * (1 - BUY_ZONE_PCT / 100),
+            'Buy_Zone_Upper': valid_bp * (1 + BUY_ZONE_PCT / 100),
+            'Stop_Loss': stop_loss,
+            'Risk_Per_Share': valid_bp - stop_loss,
+            'Buy_Signal': buy_signal,
+            'Exit_Signal': exit_reason != '',
+            'Exit_Reason': exit_reason,
+            'Fresh_Uptrend': has_prev and stage > 0 and prev_stage <= 0,
+            'Fresh_Downtrend': has_prev and stage < 0 and prev_stage >= 0,
+            'Near_Buy_Point': uptrend and in_buy_zone,
+            'RS': rs_value,
+            'Chaikin_AD': chaikin,
+            'Strong_Stock': rs_value >= 95 and chaikin >= 95
+        }
+        row['TR_Status_Enhanced'] = format_tr_status(
+            stage,
+            [marker for column, marker in STATUS_MARKERS + SIGNAL_MARKERS if row[column]]
+        )
+
+        self.count = i + 1
+        self.last_date = date
+        self.prev_ema_3 = ema_3
+        self.prev_ema_9 = ema_9
+        self.prev_stage = stage
+        self.prev_close = close
+        self.prev_volume = volume
+        self.latest = row
+
+        return row
+
+    def _ewm(self, name, value):
+        """
+        One step of pandas ewm(span, adjust=False).mean()
+
+        Same arithmetic as pandas (including NaN gaps), so the values match
+        a full recompute exactly.
+        """
+        weighted, old_wt = self.ewm[name]
+        alpha = 1. / (1. + (EWM_SPANS[name] - 1) / 2.0)
+
+        if weighted == weighted:
+            old_wt *= 1. - alpha
+            if value == value:
+                if weighted != value:
+                    weighted = old_wt * weighted + alpha * value
+                    weighted /= old_wt + alpha
+                old_wt = 1.
+        elif value == value:
+            weighted = value
+
+        self.ewm[name] = [weighted, old_wt]
+        return weighted
+
+    def _rising(self, name, value):
+        """value > value SLOPE_PERIODS bars ago (calculate_slope)"""
+        history = self.slopes[name]
+        rising = len(history) == SLOPE_PERIODS and value > history[0]
+        history.append(value)
+        return rising
+
+    def _is_confirmed_peak(self):
+        """identify_peaks for the middle bar of the full centered window"""
+        if len(self.peak_window) < self.peak_window.maxlen:
+            return False
+
+        highs = [h for h, _, _ in self.peak_window]
+        lows = [l for _, l, _ in self.peak_window if l == l]
+        high = highs[PEAK_LOOKBACK]
+
+        # Any missing high -> rolling max is NaN -> not a peak
+        if any(h != h for h in highs) or not lows:
+            return False
+
+        window_low = min(lows)
+        return high >= max(highs) and window_low > 0 and (high - window_low) / window_low >= PEAK_THRESHOLD
+
+    def _buy_point(self, i):
+        """Buy point of bar i from the last confirmed peak (calculate_buy_points)"""
+        if self.last_peak is not None:
+            position, high, date = self.last_peak
+            if position < i and i - position <= BUY_POINT_LOOKBACK:
+                return high, float(i - position), date
+
+        return np.nan, np.nan, ''
+
+    def _relative_strength(self, i, date):
+        """IBD RS rating of bar i (calculate_relative_strength_ibd)"""
+        # Market bars dated after this bar do not count yet
+        ahead = 0
+        while ahead < len(self.market) and self.market[-1 - ahead][0] > date:
+            ahead += 1
+        market_count = self.market_count - ahead
+        current = len(self.market) - 1 - ahead
+
+        composite = 0.0
+        for period, weight in zip(self.rs_periods, IBD_RS_WEIGHTS):
+            stock_perf = 0.0
+            if i >= period:
+                past = self.closes[-1 - period]
+                if past > 0:
+                    stock_perf = (self.closes[-1] - past) / past * 100
+
+            market_perf = 0.0
+            if market_count >= period and current - (period - 1) >= 0:
+                past = self.market[current - (period - 1)][1]
+                if past > 0:
+                    market_perf = (self.market[current][1] - past) / past * 100
+
+            composite += (stock_perf - market_perf) * weight
+
+        # Neutral 50 until a month of stock and market history
+        one_month = self.rs_periods[-1]
+        if i < one_month or market_count < one_month:
+            return 50.0
+
+        if composite >= 50:
+            return 99.0
+        if composite <= -50:
+            return 1.0
+        return float(np.round(((composite + 50) / 100) * 98 + 1, 1))
+
+    def _chaikin(self, high, low, close, volume):
+        """Chaikin A/D percentile of the newest bar (calculate_chaikin_ad)"""
+        high_low_diff = high - low
+        if high_low_diff == 0:
+            high_low_diff = 0.0001
+
+        mf_volume = ((close - low) - (high - close)) / high_low_diff * volume
+
+        # cumsum skips missing values but leaves them missing
+        if mf_volume == mf_volume:
+            self.ad_line += mf_volume
+            current = self.ad_line
+        else:
+            current = np.nan
+        self.ad_window.append(current)
+
+        # Window is the whole history until it reaches the ranking period
+        min_periods = max(10, len(self.ad_window) // 4)
+        values = np.fromiter(self.ad_window, dtype=float, count=len(self.ad_window))
+        valid = int(np.count_nonzero(~np.isnan(values)))
+
+        if current != current or valid < min_periods:
+            return 50.0
+
+        less = int(np.count_nonzero(values < current))
+        equal = int(np.count_nonzero(values == current))
+        pct = (less + (equal + 1) / 2) / valid * 100
+
+        return float(min(max(pct, 0), 100))
+
+    # ═══════════════════════════════════════════════════════════════
+    # CHECKPOINTS
+    # ═══════════════════════════════════════════════════════════════
+
+    def _snapshot(self):
+        """Copy of the indicator state"""
+        return {field: _copy_state(getattr(self, field)) for field in _CORE_FIELDS}
+
+    def _restore(self, snapshot):
+        """Put back a _snapshot (copied, so it can be restored again)"""
+        for field in _CORE_FIELDS:
+            setattr(self, field, _copy_state(snapshot[field]))
+
+    def to_checkpoint(self):
+        """
+        Serializable checkpoint of the state
+
+        Returns:
+            dict: JSON-compatible checkpoint (see from_checkpoint)
+        """
+        return {
+            'version': STATE_VERSION,
+            'timeframe': self.timeframe,
+            'strength_timeframe': self.strength_timeframe,
+            'needs_rebuild': self.needs_rebuild,
+            'core': _encode(self._snapshot()),
+            'previous': _encode(self._previous),
+            'market': _encode(list(self.market)),
+            'market_count': self.market_count,
+            'week_base': _encode(self.week_base),
+            'last_daily_date': _encode(self.last_daily_date),
+            'latest_bar': _encode(self.latest_bar)
+        }
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        """
+        Rebuild a state from to_checkpoint() output
+
+        Args:
+            checkpoint (dict): Checkpoint data
+
+        Returns:
+            TRState: Restored state, or None if the checkpoint is from
+                     another STATE_VERSION
+        """
+        if checkpoint.get('version') != STATE_VERSION:
+            return None
+
+        state = cls(checkpoint['timeframe'], checkpoint['strength_timeframe'])
+        state.needs_rebuild = checkpoint['needs_rebuild']
+
+        state._restore(state._decode_core(checkpoint['core']))
+        if checkpoint['previous'] is not None:
+            state._previous = state._decode_core(checkpoint['previous'])
+
+        state.market.extend(_decode(checkpoint['market']))
+        state.market_count = checkpoint['market_count']
+        state.week_base = _decode(checkpoint['week_base'])
+        state.last_daily_date = _decode(checkpoint['last_daily_date'])
+        state.latest_bar = _decode(checkpoint['latest_bar'])
+
+        return state
+
+    def _decode_core(self, core):
+        """Decoded core fields with their deques rebuilt"""
+        core = _decode(core)
+        core['slopes'] = {name: deque(values, maxlen=SLOPE_PERIODS) for name, values in core['slopes'].items()}
+        core['peak_window'] = deque([tuple(bar) for bar in core['peak_window']], maxlen=2 * PEAK_LOOKBACK + 1)
+        core['closes'] = deque(core['closes'], maxlen=self.closes.maxlen)
+        core['ad_window'] = deque(core['ad_window'], maxlen=self.chaikin_period)
+        if core['last_peak'] is not None:
+            core['last_peak'] = tuple(core['last_peak'])
+        return core
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HELPERS
+# ═══════════════════════════════════════════════════════════════════
+
+def _copy_state(value):
+    """
+    Copy of a state field
+
+    The containers are copied, their items (floats, Timestamps, tuples)
+    are immutable and shared - much cheaper than copy.deepcopy.
+    """
+    if isinstance(value, deque):
+        return deque(value, maxlen=value.maxlen)
+    if isinstance(value, dict):
+        return {key: _copy_state(v) if isinstance(v, (deque, dict, list)) else v
+                for key, v in value.items()}
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+def _as_bar(bar):
+    """Bar as a dict with a Timestamp Date (Series name used if no Date)"""
+    if isinstance(bar, pd.Series):
+        date = bar.get('Date', bar.name)
+        bar = bar.to_dict()
+    else:
+        bar = dict(bar)
+        date = bar.get('Date')
+
+    bar = {str(k).capitalize(): v for k, v in bar.items()}
+    bar['Date'] = pd.Timestamp(date)
+    return bar
+
+
+def _week_label(dates):
+    """Week-ending Sunday, the label resample('W') gives a date"""
+    if isinstance(dates, pd.Series):
+        return dates.dt.normalize() + pd.offsets.Week(weekday=6, n=0)
+    return pd.Timestamp(dates).normalize() + pd.offsets.Week(weekday=6, n=0)
+
+
+def _combine_bars(base, bars):
+    """Fold daily bars into an OHLCV aggregate (first / max / min / last / sum)"""
+    for bar in bars:
+        if base is None:
+            base = {key: bar.get(key, np.nan) for key in ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']}
+            base['Volume'] = 0.0 if pd.isna(base['Volume']) else base['Volume']
+            continue
+
+        base = dict(base)
+        if pd.isna(base['Open']):
+            base['Open'] = bar.get('Open', np.nan)
+        base['High'] = np.nanmax([base['High'], bar['High']])
+        base['Low'] = np.nanmin([base['Low'], bar['Low']])
+        if not pd.isna(bar['Close']):
+            base['Close'] = bar['Close']
+        if not pd.isna(bar.get('Volume', np.nan)):
+            base['Volume'] = base['Volume'] + bar['Volume']
+
+    return base
+
+
+def _looks_like_split(close, prev_close, volume, prev_volume):
+    """Price drop >25% with a volume spike >150% (detect_and_adjust_splits)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change = (np.float64(close) / np.float64(prev_close) - 1) * 100
+        volume_change = (np.float64(volume) / np.float64(prev_volume) - 1) * 100
+
+    return bool(price_change < -25 and volume_change > 150)
+
+
+def _encode(value):
+    """JSON-compatible copy (Timestamps -> tagged ISO strings, deques/tuples -> lists)"""
+    if isinstance(value, pd.Timestamp):
+        return {'__ts__': value.isoformat()}
+    if isinstance(value, dict):
+        return {key: _encode(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple, deque)):
+        return [_encode(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode(value):
+    """Inverse of _encode (lists stay lists)"""
+    if isinstance(value, dict):
+        if set(value) == {'__ts__'}:
+            return pd.Timestamp(value['__ts__'])
+        return {key: _decode(v) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def get_tr_state_file(ticker, timeframe='daily', interval='1d'):
+    """Checkpoint file, next to the ticker's cached history"""
+    return HISTORY_DIR / f"{ticker.upper()}_{interval}_tr_{timeframe.lower()}.json"
+
+
+def save_tr_state(state, ticker, interval='1d'):
+    """
+    Save a TRState checkpoint next to the cached OHLCV history
+
+    Args:
+        state (TRState): State to save
+        ticker (str): Stock symbol
+        interval (str): Interval of the cached history it was built from
+    """
+    try:
+        write_json(state.to_checkpoint(), get_tr_state_file(ticker, state.timeframe, interval))
+    except Exception as e:
+        print(f"⚠️ Could not save TR state for {ticker}: {e}")
+
+
+def load_tr_state(ticker, timeframe='daily', interval='1d'):
+    """
+    Load a saved TRState checkpoint
+
+    Args:
+        ticker (str): Stock symbol
+        timeframe (str): 'daily' or 'weekly'
+        interval (str): Interval of the cached history
+
+    Returns:
+        TRState: Restored state, or None if missing, unreadable or outdated
+    """
+    state_file = get_tr_state_file(ticker, timeframe, interval)
+
+    if not state_file.exists():
+        return None
+
+    try:
+        with open(state_file, 'r') as f:
+            return TRState.from_checkpoint(json.load(f))
+    except Exception:
+        return None
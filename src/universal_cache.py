@@ -9,20 +9,176 @@ Features:
 - SHARED cache across parallel workers
 - Thread-safe and process-safe
 - Works in scanner and Streamlit
+
+HISTORY STORE:
+- One canonical history file per ticker/interval (.stock_cache/history/)
+- Any requested date range is served as a slice of that history
+- Only the missing head/tail bars are fetched from Yahoo/Tiingo
+- Stored in a columnar format (Feather by default, see cache_storage)
+  with column projection and memory-mapped reads
+- Refetching the tail follows the NYSE calendar (market_calendar):
+  bars fetched after a session's close are final, the running session
+  gets a short TTL, nights/weekends/holidays never refetch
+
+RESAMPLED BARS:
+- Weekly ('1wk') and monthly ('1mo') bars are built from the daily
+  history instead of being downloaded separately, so a symbol's daily
+  and weekly views cost one download and always agree
+- The resampled bars are cached too and only the periods touched by new
+  daily bars are recomputed
+
+MEMORY TIER:
+- Process-local LRU of loaded histories, bounded in bytes
+  (STOCK_CACHE_MEMORY_MB, default 256, 0 disables it)
+- Entries are revalidated against the file's mtime/size, so writes by
+  other processes are picked up
+- Hits return read-only views of the cached frame (no unpickle, no copy);
+  pass copy=True to get_stock_data to get a frame you can modify in place
+
+DISK BUDGET:
+- Entries unused for STOCK_CACHE_MAX_AGE_DAYS (default 90) are evicted,
+  then least recently used entries until the cache fits
+  STOCK_CACHE_DISK_MB (default 2048) - checked after writes
+- compact_cache() merges legacy date-range pickles into the per-ticker
+  histories and removes orphaned/duplicate files
+- get_cache_stats() reports bytes, hit rates and the oldest entries
+
+Maintenance from the command line:
+    python universal_cache.py [--compact] [--enforce] [--stats]
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import os
-import pickle
+import json
+import re
+import time
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+from cache_storage import get_backend, atomic_write, write_json
+from market_calendar import latest_session, session_close, is_fresh, market_now, MARKET_TZ
+
 # Use file-based cache for multiprocessing compatibility
 CACHE_DIR = Path(__file__).parent / '.stock_cache'
 CACHE_DIR.mkdir(exist_ok=True)
 
+# Canonical per-ticker/per-interval histories live here
+HISTORY_DIR = CACHE_DIR / 'history'
+HISTORY_DIR.mkdir(exist_ok=True)
+
+# ═══════════════════════════════════════════════════════════════════
+# IN-MEMORY LRU TIER (IN FRONT OF THE HISTORY FILES)
+# ═══════════════════════════════════════════════════════════════════
+
+MEMORY_CACHE_BYTES = int(float(os.environ.get('STOCK_CACHE_MEMORY_MB', 256)) * 1024 * 1024)
+
+_memory_cache = OrderedDict()  # path -> (file stamp, entry dict, bytes)
+_memory_lock = threading.Lock()
+_memory_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+# get_stock_data requests served without any API call
+_request_stats = {'requests': 0, 'hits': 0}
+
+def _file_stamp(path):
+    """(mtime, size) of a cache file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _freeze(df):
+    """
+    Read-only copy of a frame for the memory tier
+    
+    Every numpy-backed column gets its own non-writeable array, so slices
+    handed out on a hit share memory with the cache but in-place writes
+    cannot corrupt it (pandas raises or copies instead).
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, np.dtype):
+            values = values.to_numpy(copy=True)
+            values.flags.writeable = False
+        columns[col] = values
+    
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(df)), copy=False)
+
+def _memory_get(path, count=True):
+    """Cached entry for a file if it is still current, else None (counts hit/miss)"""
+    if MEMORY_CACHE_BYTES <= 0:
+        return None
+    
+    key = str(path)
+    stamp = _file_stamp(path)
+    
+    with _memory_lock:
+        cached = _memory_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            _memory_cache.move_to_end(key)
+            _memory_stats['hits'] += count
+            return dict(cached[1])
+        _memory_stats['misses'] += count
+        return None
+
+def _memory_put(path, entry):
+    """
+    Store an entry dict ('data' frame + metadata) for a file just read/written
+    
+    Returns:
+        dict: The entry with its frame frozen (what later hits return)
+    """
+    if MEMORY_CACHE_BYTES <= 0:
+        return entry
+    
+    stamp = _file_stamp(path)
+    if stamp is None:
+        return entry
+    
+    entry = dict(entry, data=_freeze(entry['data']))
+    size = int(entry['data'].memory_usage(index=True, deep=True).sum())
+    key = str(path)
+    
+    with _memory_lock:
+        old = _memory_cache.pop(key, None)
+        if old is not None:
+            _memory_stats['bytes'] -= old[2]
+        
+        # Frames larger than the whole budget are not kept
+        if size <= MEMORY_CACHE_BYTES:
+            _memory_cache[key] = (stamp, entry, size)
+            _memory_stats['bytes'] += size
+        
+        while _memory_stats['bytes'] > MEMORY_CACHE_BYTES:
+            _, (_, _, evicted) = _memory_cache.popitem(last=False)
+            _memory_stats['bytes'] -= evicted
+            _memory_stats['evictions'] += 1
+    
+    return dict(entry)
+
+def get_memory_cache_stats():
+    """Hit/miss counters and size of the in-memory tier"""
+    with _memory_lock:
+        lookups = _memory_stats['hits'] + _memory_stats['misses']
+        return {
+            **_memory_stats,
+            'entries': len(_memory_cache),
+            'budget_bytes': MEMORY_CACHE_BYTES,
+            'hit_rate': _memory_stats['hits'] / lookups if lookups else 0.0
+        }
+
+def clear_memory_cache():
+    """Drop every in-memory entry (disk cache untouched) and reset counters"""
+    with _memory_lock:
+        _memory_cache.clear()
+        _memory_stats.update(hits=0, misses=0, evictions=0, bytes=0)
+
 def _get_cache_key(ticker, start_date, end_date, interval='1d'):
-    """Generate unique cache key"""
+    """Generate unique cache key (legacy date-range keyed files)"""
     start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
     end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
     return f"{ticker.upper()}_{start_str}_{end_str}_{interval}"
@@ -31,6 +187,193 @@ def _get_cache_file(cache_key):
     """Get cache file path"""
     return CACHE_DIR / f"{cache_key}.pkl"
 
+def _get_history_file(ticker, interval='1d', backend=None):
+    """Get canonical history data file path for a ticker/interval"""
+    backend = backend or get_backend()
+    return HISTORY_DIR / f"{ticker.upper()}_{interval}{backend.extension}"
+
+def _get_history_meta_file(ticker, interval='1d'):
+    """Get sidecar metadata file (requested date coverage) for a history"""
+    return HISTORY_DIR / f"{ticker.upper()}_{interval}.json"
+
+def _load_history_meta(ticker, interval='1d'):
+    """
+    Load the date range already requested from the API for a history
+    
+    Returns:
+        dict with 'start' and 'end' Timestamps and 'fetched_at' (time of
+        the last tail fetch), or None
+    """
+    history_file = _get_history_file(ticker, interval)
+    
+    cached = _memory_get(history_file, count=False)
+    if cached is not None:
+        return {'start': cached['start'], 'end': cached['end'], 'fetched_at': cached['fetched_at']}
+    
+    meta_file = _get_history_meta_file(ticker, interval)
+    
+    if not meta_file.exists():
+        return None
+    
+    try:
+        with open(meta_file, 'r') as f:
+            return _parse_history_meta(json.load(f), history_file)
+    except:
+        return None
+
+def _parse_history_meta(meta, history_file):
+    """Meta JSON -> Timestamps (histories written before 'fetched_at' use the file time)"""
+    if 'fetched_at' in meta:
+        fetched_at = pd.Timestamp(meta['fetched_at'])
+    else:
+        fetched_at = pd.Timestamp(os.path.getmtime(history_file), unit='s', tz='UTC').tz_convert(MARKET_TZ)
+    
+    return {'start': pd.Timestamp(meta['start']), 'end': pd.Timestamp(meta['end']), 'fetched_at': fetched_at}
+
+def _tail_is_fresh(history, end):
+    """
+    Whether the stored tail already holds the final (or a recent enough
+    intraday) bar of the last session before 'end'
+    
+    Args:
+        history: dict with 'end' (requested coverage) and 'fetched_at'
+        end: Requested end date (exclusive)
+    """
+    session = latest_session(until=end)
+    
+    if session is None:
+        return True
+    
+    if session >= history['end']:
+        return False  # Session never requested
+    
+    return is_fresh(history['fetched_at'], session)
+
+def _load_history(ticker, interval='1d', columns=None, backend=None):
+    """
+    Load canonical history for a ticker/interval
+    
+    Served from the in-memory tier when the file has not changed; a miss
+    reads the whole file (so the entry can serve any projection later).
+    
+    Args:
+        columns: Only read these columns (Date is always included) -
+                 only applies when the memory tier is disabled
+        backend: Storage backend (default: cache_storage.get_backend())
+    
+    Returns:
+        dict with 'data' (DataFrame sorted by Date, read-only when served
+        from memory), 'start' and 'end' (the date range already requested
+        from the API), or None
+    """
+    backend = backend or get_backend()
+    history_file = _get_history_file(ticker, interval, backend)
+    
+    cached = _memory_get(history_file)
+    if cached is not None:
+        return cached
+    
+    if not history_file.exists():
+        return None
+    
+    if columns is not None and MEMORY_CACHE_BYTES <= 0:
+        columns = ['Date'] + [c for c in columns if c != 'Date']
+    else:
+        columns = None
+    
+    try:
+        data = backend.read(history_file, columns=columns)
+    except:
+        return None  # Cache corrupted, rebuild from API
+    
+    _touch(history_file)
+    
+    # Pickled histories written before the sidecar metadata existed
+    if isinstance(data, dict):
+        data.setdefault('fetched_at', _parse_history_meta(
+            {'start': data['start'], 'end': data['end']}, history_file)['fetched_at'])
+        return _memory_put(history_file, data)
+    
+    meta_file = _get_history_meta_file(ticker, interval)
+    try:
+        with open(meta_file, 'r') as f:
+            history = dict(_parse_history_meta(json.load(f), history_file), data=data)
+    except:
+        return None
+    
+    if columns is not None:
+        return history
+    
+    return _memory_put(history_file, history)
+
+def _save_history(ticker, interval, history, backend=None):
+    """Write canonical history atomically (safe with parallel workers)"""
+    backend = backend or get_backend()
+    
+    history_file = _get_history_file(ticker, interval, backend)
+    
+    try:
+        atomic_write(backend, history['data'], history_file)
+        meta = {'start': history['start'].isoformat(), 'end': history['end'].isoformat()}
+        if history.get('fetched_at') is not None:
+            meta['fetched_at'] = history['fetched_at'].isoformat()
+        write_json(meta, _get_history_meta_file(ticker, interval))
+        _memory_put(history_file, dict(history, fetched_at=_parse_history_meta(meta, history_file)['fetched_at']))
+    except:
+        pass  # Cache write failed, not critical
+    
+    _maybe_enforce_budget()
+
+def _merge_bars(existing, new_bars):
+    """Merge fetched bars into history - newer fetch wins on duplicate dates"""
+    if existing is None or existing.empty:
+        merged = new_bars
+    elif new_bars is None or new_bars.empty:
+        merged = existing
+    else:
+        merged = pd.concat([existing, new_bars], ignore_index=True)
+    
+    merged = merged.drop_duplicates(subset='Date', keep='last')
+    return merged.sort_values('Date').reset_index(drop=True)
+
+# Refetched close of the last stored bar may differ this much (relative)
+# before the history counts as re-adjusted
+ADJUSTMENT_TOLERANCE = 1e-4
+
+def _bars_readjusted(data, tail, fetched_at):
+    """
+    Whether the refetched last stored bar no longer matches the stored one
+    
+    Yahoo re-adjusts all past bars after a split or dividend, so appending
+    to the stored history would mix adjustment bases. Only a final bar
+    (fetched after its session's close) is compared - an intraday
+    snapshot is expected to change.
+    """
+    if data.empty or tail is None or tail.empty or fetched_at is None:
+        return False
+    
+    last = data.iloc[-1]
+    if fetched_at < session_close(last['Date']):
+        return False
+    
+    refetched = tail.loc[tail['Date'] == last['Date'], 'Close']
+    if refetched.empty or not last['Close']:
+        return False
+    
+    return abs(float(refetched.iloc[-1]) / float(last['Close']) - 1) > ADJUSTMENT_TOLERANCE
+
+def _drop_resampled(ticker):
+    """Remove a ticker's resampled bars (rebuilt from the daily history on the next read)"""
+    for timeframe in RESAMPLED_TIMEFRAMES.values():
+        bars_file = _get_resampled_file(ticker, timeframe)
+        _remove_entry({'files': [bars_file, bars_file.with_suffix('.json')]})
+
+def _fetch_range(ticker, start_date, end_date, interval, api_source):
+    """Fetch a date range from the selected API (empty DataFrame = no bars, None = request failed)"""
+    if api_source.lower() == 'tiingo':
+        return _fetch_from_tiingo(ticker, start_date, end_date)
+    return _fetch_from_yahoo(ticker, start_date, end_date, interval)
+
 def _fetch_from_yahoo(ticker, start_date, end_date, interval='1d'):
     """Fetch data from Yahoo Finance"""
     try:
@@ -38,17 +381,19 @@ def _fetch_from_yahoo(ticker, start_date, end_date, interval='1d'):
         
         print(f"   🔍 Fetching {ticker} from Yahoo Finance... ({interval})")
         
+        # Adjusted OHLC, same as batch_fetcher - both write the same histories
         df = yf.download(
             ticker,
             start=start_date,
             end=end_date,
             interval=interval,
-            progress=False
+            progress=False,
+            auto_adjust=True
         )
         
         if df.empty:
             print(f"   ⚠️  No data returned for {ticker}")
-            return None
+            return pd.DataFrame()
         
         # Handle multi-index columns
         if isinstance(df.columns, pd.MultiIndex):
@@ -107,7 +452,7 @@ def _fetch_from_tiingo(ticker, start_date, end_date):
         
         if not data:
             print(f"   ⚠️  No data returned for {ticker}")
-            return None
+            return pd.DataFrame()
         
         # Convert to DataFrame
         rows = []
@@ -131,54 +476,248 @@ def _fetch_from_tiingo(ticker, start_date, end_date):
         print(f"   ❌ Tiingo error for {ticker}: {str(e)[:100]}")
         return None
 
-def get_stock_data(ticker, start_date, end_date, interval='1d', api_source='yahoo', force_refresh=False):
+def get_stock_data(ticker, start_date, end_date, interval='1d', api_source='yahoo', force_refresh=False, columns=None,
+                   copy=False):
     """
     Get stock data with file-based caching (multiprocessing compatible)
     
+    Serves the requested range as a slice of the ticker's canonical
+    history, fetching only bars that are not already stored:
+    - Tail: from the last stored bar up to end_date (last bar is refetched
+      so a partial intraday bar gets replaced by the final one) - only
+      when the last session before end_date is missing or not final yet
+      (see market_calendar.is_fresh)
+    - Head: from start_date up to the first requested date
+    - Full range: when the refetched last stored bar no longer matches
+      (Yahoo re-adjusted the past bars after a split or dividend)
+    
     Args:
         ticker: Stock symbol (AAPL, SPY, etc.)
         start_date: Start date
-        end_date: End date
-        interval: '1d' (daily) or '1wk' (weekly)
+        end_date: End date (exclusive, same as yfinance)
+        interval: '1d' (daily), '1wk' (weekly) or '1mo' (monthly) -
+                  weekly/monthly bars are resampled from the daily history
         api_source: 'yahoo' or 'tiingo'
-        force_refresh: Force fetch even if cached
+        force_refresh: Ignore stored history and fetch the full range
+        columns: Only return these columns (Date is always included);
+                 when no fetch is needed only these columns are read from disk
+                 (memory tier disabled)
+        copy: Return a writable copy - by default daily bars are a read-only
+              view of the in-memory cache, copy before modifying them in place
     
     Returns:
         DataFrame with OHLCV data, or None if error
     """
+    if interval in RESAMPLED_TIMEFRAMES:
+        df = get_resampled_data(ticker, start_date, end_date, RESAMPLED_TIMEFRAMES[interval],
+                                api_source, force_refresh)
+        if df is not None and columns is not None:
+            df = df[['Date'] + [c for c in columns if c != 'Date' and c in df.columns]]
+        return df
+    
     ticker = ticker.upper()
-    cache_key = _get_cache_key(ticker, start_date, end_date, interval)
-    cache_file = _get_cache_file(cache_key)
+    start = pd.to_datetime(start_date)
+    end = pd.to_datetime(end_date)
     
-    # Check cache first (unless force refresh)
-    if not force_refresh and cache_file.exists():
-        try:
-            with open(cache_file, 'rb') as f:
-                df = pickle.load(f)
-            print(f"   📦 Using cached data for {ticker} ({interval}, {api_source})")
-            return df.copy()
-        except:
-            pass  # Cache corrupted, fetch fresh
+    history = None
+    if not force_refresh:
+        meta = _load_history_meta(ticker, interval)
+        if meta is not None:
+            # Projection only when the stored range already covers the request
+            needs_fetch = (start.normalize() < meta['start'].normalize() or
+                           not _tail_is_fresh(meta, end))
+            history = _load_history(ticker, interval, columns=None if needs_fetch else columns)
     
-    # Fetch from API based on source
-    if api_source.lower() == 'tiingo':
-        df = _fetch_from_tiingo(ticker, start_date, end_date)
-    else:
-        df = _fetch_from_yahoo(ticker, start_date, end_date, interval)
+    _request_stats['requests'] += 1
     
-    if df is not None and not df.empty:
+    if history is None:
+        # Nothing stored yet - fetch the whole requested range
+        df = _fetch_range(ticker, start, end, interval, api_source)
+        if df is None or df.empty:
+            return None
+        
+        history = {'data': _merge_bars(None, df), 'start': start, 'end': end, 'fetched_at': market_now()}
+        _save_history(ticker, interval, history)
         print(f"   ✅ Fetched & cached {len(df)} periods for {ticker} ({api_source})")
+    
+    else:
+        data = history['data']
+        fetched = 0
+        changed = False
+        api_calls = 0
         
-        # Cache it
-        try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(df, f)
-        except:
-            pass  # Cache write failed, not critical
+        # Missing head bars (an empty answer still marks the range as covered,
+        # e.g. start_date before the IPO)
+        if start.normalize() < history['start'].normalize():
+            head = _fetch_range(ticker, start, history['start'], interval, api_source)
+            api_calls += 1
+            if head is not None and not head.empty:
+                data = _merge_bars(data, head)
+                fetched += len(head)
+            history['start'] = start
+            changed = True
+        
+        # Missing or not yet final tail bars
+        if not _tail_is_fresh(history, end):
+            tail_start = history['end']
+            if not data.empty:
+                tail_start = min(tail_start, data['Date'].iloc[-1])
+            tail = _fetch_range(ticker, tail_start, end, interval, api_source)
+            api_calls += 1
+            # Past bars were re-adjusted (split/dividend) - replace the history
+            if _bars_readjusted(data, tail, history['fetched_at']):
+                print(f"   🔁 {ticker} history was re-adjusted, refetching the full range")
+                tail = _fetch_range(ticker, history['start'], end, interval, api_source)
+                api_calls += 1
+                if tail is not None and not tail.empty:
+                    data = data.iloc[:0]
+                    _drop_resampled(ticker)
+            # An empty answer (delisted symbol, unscheduled closure) still
+            # counts as fetched - only a failed request is retried
+            if tail is not None:
+                if not tail.empty:
+                    data = _merge_bars(data, tail)
+                    fetched += len(tail)
+                history['end'] = max(history['end'], end)
+                history['fetched_at'] = market_now()
+                changed = True
         
-        return df.copy()
+        if changed:
+            history['data'] = data
+            _save_history(ticker, interval, history)
+        
+        if not api_calls:
+            _request_stats['hits'] += 1
+        
+        if fetched:
+            print(f"   ✅ Appended {fetched} periods to cached {ticker} history ({interval}, {api_source})")
+        else:
+            print(f"   📦 Using cached data for {ticker} ({interval}, {api_source})")
+    
+    return _slice_history(history, start, end, columns, copy)
+
+def _slice_history(history, start, end, columns=None, copy=False):
+    """Bars in [start day, end) - None if empty"""
+    # History is sorted by Date - a positional slice is a view, not a copy
+    data = history['data']
+    first = data['Date'].searchsorted(start.normalize(), side='left')
+    last = data['Date'].searchsorted(end, side='left')
+    df = data.iloc[first:last]
+    
+    if df.empty:
+        return None
+    
+    if columns is not None:
+        df = df[['Date'] + [c for c in columns if c != 'Date' and c in df.columns]]
+    
+    if copy:
+        df = df.copy()
     
-    return None
+    df.index = pd.RangeIndex(len(df))
+    return df
+
+# ═══════════════════════════════════════════════════════════════════
+# PER-SYMBOL ENTRIES FOR BATCH DOWNLOADS
+# ═══════════════════════════════════════════════════════════════════
+#
+# batch_fetcher reads and writes the same per-ticker histories, so any
+# watchlist, idea list or detail view requesting a symbol shares its bars
+
+# Columns kept from batch downloads (Yahoo capitalized, Tiingo camelCase)
+_BAR_COLUMNS = {
+    'date': 'Date', 'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close',
+    'volume': 'Volume', 'adj close': 'Adj Close', 'adjclose': 'Adj Close'
+}
+
+def normalize_bars(df):
+    """
+    Batch download frame -> history layout (Date column, OHLCV, tz-naive)
+    
+    Rows without a close (padding in multi-symbol downloads) are dropped.
+    
+    Returns:
+        pd.DataFrame, or None if no bars are left
+    """
+    if df is None or df.empty:
+        return None
+    
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.set_axis(df.columns.get_level_values(0), axis=1)
+    
+    if not any(str(c).lower() == 'date' for c in df.columns):
+        df = df.rename_axis('Date').reset_index()
+    
+    columns = {c: _BAR_COLUMNS[str(c).lower()] for c in df.columns if str(c).lower() in _BAR_COLUMNS}
+    df = df[list(columns)].rename(columns=columns).dropna(subset=['Close'])
+    
+    dates = pd.to_datetime(df['Date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    df = df.assign(Date=dates.dt.normalize())
+    
+    return df if not df.empty else None
+
+def get_cached_stock_data(ticker, start_date, end_date, interval='1d', columns=None, copy=False):
+    """
+    Stored bars for a range if the history covers it and is fresh - never fetches
+    
+    Returns:
+        DataFrame like get_stock_data, or None if the range has to be fetched
+    """
+    start = pd.to_datetime(start_date)
+    end = pd.to_datetime(end_date)
+    
+    meta = _load_history_meta(ticker, interval)
+    if meta is None or start.normalize() < meta['start'].normalize() or not _tail_is_fresh(meta, end):
+        return None
+    
+    history = _load_history(ticker, interval)
+    if history is None:
+        return None
+    
+    return _slice_history(history, start, end, columns, copy)
+
+def store_stock_data(ticker, df, start_date, end_date, interval='1d'):
+    """
+    Merge bars fetched elsewhere (batch downloads) into the ticker's history
+    
+    Args:
+        ticker: Stock symbol
+        df: Bars in any batch layout (see normalize_bars)
+        start_date, end_date: Range that was requested from the API
+        interval: Bar interval of df
+    
+    Returns:
+        bool: True if the history was updated
+    """
+    bars = normalize_bars(df)
+    if bars is None:
+        return False
+    
+    ticker = ticker.upper()
+    start = pd.to_datetime(start_date)
+    end = pd.to_datetime(end_date)
+    
+    history = _load_history(ticker, interval)
+    
+    if history is None:
+        history = {'data': _merge_bars(None, bars), 'start': start, 'end': end, 'fetched_at': market_now()}
+    else:
+        history = dict(history, data=_merge_bars(history['data'], bars))
+        
+        # Coverage grows only across overlapping/touching ranges; a disjoint
+        # newer range replaces it (older bars are kept, gaps get refetched)
+        touching = (start <= history['end'] + pd.Timedelta(days=4) and
+                    end >= history['start'] - pd.Timedelta(days=4))
+        if end >= history['end']:
+            history['fetched_at'] = market_now()
+        if touching:
+            history['start'], history['end'] = min(start, history['start']), max(end, history['end'])
+        elif end > history['end']:
+            history['start'], history['end'] = start, end
+    
+    _save_history(ticker, interval, history)
+    return True
 
 def get_market_data(market_ticker='SPY', start_date=None, end_date=None, interval='1d'):
     """
@@ -186,31 +725,449 @@ def get_market_data(market_ticker='SPY', start_date=None, end_date=None, interva
     
     Returns DataFrame with Date and Close columns
     """
-    df = get_stock_data(market_ticker, start_date, end_date, interval)
+    # Only Date and Close are needed for RS calculation
+    df = get_stock_data(market_ticker, start_date, end_date, interval, columns=['Date', 'Close'])
     
     if df is None or df.empty:
         return None
     
-    # Return only Date and Close for RS calculation
-    return df[['Date', 'Close']].copy()
+    return df
+
+# ═══════════════════════════════════════════════════════════════════
+# RESAMPLED (WEEKLY / MONTHLY) BARS FROM THE DAILY HISTORY
+# ═══════════════════════════════════════════════════════════════════
+
+# Interval -> timeframe served by resampling the daily history
+RESAMPLED_TIMEFRAMES = {'1wk': 'weekly', '1mo': 'monthly'}
+
+# Period rule per timeframe (labels: week-ending Sunday / month end)
+RESAMPLE_RULES = {'weekly': 'W', 'monthly': pd.offsets.MonthEnd()}
+
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+def resample_ohlcv(df, timeframe='weekly'):
+    """
+    Resample daily OHLCV bars to weekly or monthly bars
+    
+    The one resampling rule used everywhere (TR pipeline, scanner, cache),
+    so weekly views built in different places agree.
+    
+    Args:
+        df (pd.DataFrame): Daily bars with a Date column or a DatetimeIndex
+        timeframe (str): 'weekly' or 'monthly'
+    
+    Returns:
+        pd.DataFrame: Resampled bars in the same layout (Date column or
+                      index), periods with missing values dropped
+    """
+    if df is None or df.empty:
+        return df
+    
+    has_date_column = 'Date' in df.columns
+    bars = df.set_index('Date') if has_date_column else df
+    
+    aggregation = {col: how for col, how in OHLCV_AGGREGATION.items() if col in bars.columns}
+    bars = bars[list(aggregation)].resample(RESAMPLE_RULES[timeframe.lower()]).agg(aggregation).dropna()
+    
+    if has_date_column:
+        bars = bars.reset_index()
+        bars['Date'] = pd.to_datetime(bars['Date'])
+    
+    return bars
+
+def period_labels(dates, timeframe='weekly'):
+    """Label of the resampled period each date falls in (same labels as resample_ohlcv)"""
+    dates = pd.to_datetime(pd.Series(dates)).dt.normalize()
+    
+    if timeframe.lower() == 'weekly':
+        return dates + pd.offsets.Week(weekday=6, n=0)
+    return dates + pd.offsets.MonthEnd(0)
+
+def _get_resampled_file(ticker, timeframe, backend=None):
+    """Cached resampled bars for a ticker/timeframe"""
+    backend = backend or get_backend()
+    interval = {v: k for k, v in RESAMPLED_TIMEFRAMES.items()}[timeframe]
+    return HISTORY_DIR / f"{ticker.upper()}_{interval}_resampled{backend.extension}"
+
+def _update_resampled(ticker, daily, timeframe, backend=None):
+    """
+    Resampled bars for the whole daily history, extended incrementally
+    
+    Only the last cached period and later ones are recomputed, as long as
+    the daily history still starts where it did (otherwise full rebuild).
+    
+    Args:
+        ticker: Stock symbol
+        daily (pd.DataFrame): Full daily history (Date column, sorted)
+        timeframe: 'weekly' or 'monthly'
+    
+    Returns:
+        pd.DataFrame: Resampled bars
+    """
+    backend = backend or get_backend()
+    bars_file = _get_resampled_file(ticker, timeframe, backend)
+    meta_file = bars_file.with_suffix('.json')
+    
+    daily_start = daily['Date'].iloc[0].isoformat()
+    daily_end = daily['Date'].iloc[-1].isoformat()
+    
+    cached = None
+    try:
+        entry = _memory_get(bars_file)
+        if entry is None:
+            with open(meta_file, 'r') as f:
+                entry = dict(json.load(f), data=backend.read(bars_file))
+            entry = _memory_put(bars_file, entry)
+        if entry['daily_start'] == daily_start and entry['daily_end'] <= daily_end:
+            if entry['daily_end'] == daily_end and entry['daily_rows'] == len(daily):
+                return entry['data']
+            cached = entry['data']
+    except:
+        cached = None  # No usable cache - rebuild
+    
+    if cached is not None and not cached.empty:
+        # Recompute from the last cached period (it may have been partial)
+        cutoff = cached['Date'].iloc[-1]
+        tail = daily[period_labels(daily['Date'], timeframe).to_numpy() >= cutoff]
+        bars = pd.concat([cached[cached['Date'] < cutoff], resample_ohlcv(tail, timeframe)], ignore_index=True)
+    else:
+        bars = resample_ohlcv(daily, timeframe).reset_index(drop=True)
+    
+    try:
+        meta = {'daily_start': daily_start, 'daily_end': daily_end, 'daily_rows': len(daily)}
+        atomic_write(backend, bars, bars_file)
+        write_json(meta, meta_file)
+        _memory_put(bars_file, dict(meta, data=bars))
+    except:
+        pass  # Cache write failed, not critical
+    
+    return bars
+
+def get_resampled_data(ticker, start_date, end_date, timeframe='weekly', api_source='yahoo', force_refresh=False):
+    """
+    Get weekly or monthly bars built from the cached daily history
+    
+    The daily history is extended through get_stock_data (only missing
+    bars are fetched), then served from the cached resampled bars. The
+    first and last periods are rebuilt from the requested daily range, so
+    the result equals resample_ohlcv(get_stock_data(..., '1d')).
+    
+    Args:
+        ticker: Stock symbol
+        start_date: Start date
+        end_date: End date (exclusive)
+        timeframe: 'weekly' or 'monthly'
+        api_source: 'yahoo' or 'tiingo'
+        force_refresh: Refetch the daily range
+    
+    Returns:
+        DataFrame with resampled OHLCV bars, or None if error
+    """
+    daily = get_stock_data(ticker, start_date, end_date, '1d', api_source, force_refresh)
+    
+    if daily is None or daily.empty:
+        return None
+    
+    history = _load_history(ticker.upper(), '1d')
+    if history is None or history['data'].empty:
+        return resample_ohlcv(daily, timeframe)
+    
+    bars = _update_resampled(ticker.upper(), history['data'], timeframe)
+    
+    # Whole periods inside the range come from the cache, the edge periods
+    # may be partial and are resampled from the requested days only
+    labels = period_labels(daily['Date'], timeframe)
+    first, last = labels.iloc[0], labels.iloc[-1]
+    inner = bars[(bars['Date'] > first) & (bars['Date'] < last)]
+    edges = resample_ohlcv(daily[(labels == first).to_numpy() | (labels == last).to_numpy()], timeframe)
+    
+    df = pd.concat([inner, edges], ignore_index=True).sort_values('Date')
+    
+    return df.reset_index(drop=True)
+
+# ═══════════════════════════════════════════════════════════════════
+# CACHE MAINTENANCE (DISK BUDGET, EVICTION, COMPACTION)
+# ═══════════════════════════════════════════════════════════════════
+
+DISK_BUDGET_BYTES = int(float(os.environ.get('STOCK_CACHE_DISK_MB', 2048)) * 1024 * 1024)
+MAX_ENTRY_AGE_DAYS = float(os.environ.get('STOCK_CACHE_MAX_AGE_DAYS', 90))
+
+# Budget is re-checked at most this often per process (after writes)
+BUDGET_CHECK_INTERVAL = 600
+
+_last_budget_check = 0.0
+
+# Per-ticker sidecars: TICKER_1d.json, TICKER_1wk_resampled.json
+_SIDECAR_PATTERN = re.compile(r'^[^_]+_(1d|1wk|1mo)(_resampled)?$')
+
+_DATA_EXTENSIONS = ('.feather', '.parquet', '.pkl')
+
+# Files directly in CACHE_DIR that this module owns: legacy
+# TICKER_start_end_interval.pkl ranges and batch_*.pkl pickles - anything
+# else (e.g. a store another module keeps there) is never evicted
+_OWNED_FILE_PATTERN = re.compile(r'^([^_]+_\d{4}-\d{2}-\d{2}_\d{4}-\d{2}-\d{2}_[^_]+|batch_.+)\.pkl$')
+
+def _touch(path):
+    """Record a read for LRU eviction (atime only - mtime is the memory tier's stamp)"""
+    try:
+        os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+    except OSError:
+        pass
+
+def _cache_entries():
+    """
+    Evictable cache entries
+    
+    - Everything in HISTORY_DIR for one ticker (histories, sidecars,
+      resampled bars, TR checkpoints) is one entry - evicted together
+    - Every legacy range or batch pickle directly in CACHE_DIR is its own
+      entry - other files and subdirectories there are left alone
+    
+    Returns:
+        list of dicts with 'name', 'files', 'bytes', 'last_used' (epoch seconds)
+    """
+    groups = {}
+    
+    if HISTORY_DIR.exists():
+        for path in HISTORY_DIR.iterdir():
+            if path.is_file() and not path.name.endswith('.tmp'):
+                groups.setdefault(f"history/{path.name.split('_')[0]}", []).append(path)
+    
+    if CACHE_DIR.exists():
+        for path in CACHE_DIR.iterdir():
+            if path.is_file() and _OWNED_FILE_PATTERN.match(path.name):
+                groups.setdefault(path.name, []).append(path)
+    
+    entries = []
+    for name, files in groups.items():
+        stats = [f.stat() for f in files if f.exists()]
+        if not stats:
+            continue
+        entries.append({
+            'name': name,
+            'files': files,
+            'bytes': sum(st.st_size for st in stats),
+            'last_used': max(max(st.st_atime, st.st_mtime) for st in stats)
+        })
+    
+    return entries
+
+def _remove_entry(entry):
+    """Delete an entry's files (and drop them from the memory tier)"""
+    for path in entry['files']:
+        with _memory_lock:
+            cached = _memory_cache.pop(str(path), None)
+            if cached is not None:
+                _memory_stats['bytes'] -= cached[2]
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+def enforce_cache_budget(max_bytes=None, max_age_days=None):
+    """
+    Evict stale entries, then least recently used ones until under budget
+    
+    Args:
+        max_bytes: Disk budget (default: STOCK_CACHE_DISK_MB)
+        max_age_days: Evict entries unused this long (default: STOCK_CACHE_MAX_AGE_DAYS)
+    
+    Returns:
+        dict with 'evicted' (entry count) and 'freed_bytes'
+    """
+    global _last_budget_check
+    _last_budget_check = time.time()
+    
+    max_bytes = DISK_BUDGET_BYTES if max_bytes is None else max_bytes
+    max_age_days = MAX_ENTRY_AGE_DAYS if max_age_days is None else max_age_days
+    
+    entries = sorted(_cache_entries(), key=lambda e: e['last_used'])
+    total = sum(e['bytes'] for e in entries)
+    cutoff = time.time() - max_age_days * 86400
+    
+    evicted, freed = 0, 0
+    for entry in entries:
+        if entry['last_used'] >= cutoff and total <= max_bytes:
+            break
+        _remove_entry(entry)
+        total -= entry['bytes']
+        freed += entry['bytes']
+        evicted += 1
+    
+    if evicted:
+        print(f"   🧹 Evicted {evicted} cache entries ({freed / 2**20:.1f} MB)")
+    
+    return {'evicted': evicted, 'freed_bytes': freed}
+
+def _maybe_enforce_budget():
+    """Budget check after a write, throttled to once per BUDGET_CHECK_INTERVAL"""
+    if time.time() - _last_budget_check < BUDGET_CHECK_INTERVAL:
+        return
+    try:
+        enforce_cache_budget()
+    except Exception as e:
+        print(f"   ⚠️  Cache budget check failed: {str(e)[:100]}")
+
+def compact_cache(stale_tmp_seconds=3600):
+    """
+    Compact the cache directory
+    
+    - Legacy TICKER_start_end_interval.pkl range files are merged into the
+      ticker's history (coverage only grows where the ranges overlap/touch)
+    - History files in another format than the active backend are removed
+      once the active one exists (left over from a migration)
+    - Orphaned sidecars/resampled bars and stale temp files are removed
+    
+    Returns:
+        dict with counts per cleanup step and 'freed_bytes'
+    """
+    import pickle
+    
+    backend = get_backend()
+    result = {'merged_ranges': 0, 'duplicates': 0, 'orphans': 0, 'temp_files': 0, 'freed_bytes': 0}
+    
+    def remove(path, step):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        result[step] += 1
+        result['freed_bytes'] += size
+    
+    # Legacy range files, grouped by ticker/interval
+    ranges = {}
+    for path in CACHE_DIR.glob('*.pkl'):
+        parts = path.stem.split('_')
+        if len(parts) != 4:
+            continue
+        ticker, start_str, end_str, interval = parts
+        try:
+            ranges.setdefault((ticker, interval), []).append(
+                (pd.to_datetime(start_str), pd.to_datetime(end_str), path))
+        except ValueError:
+            continue
+    
+    for (ticker, interval), files in ranges.items():
+        history = _load_history(ticker, interval) or {'data': None, 'start': None, 'end': None}
+        data, start, end = history['data'], history['start'], history['end']
+        merged = []
+        
+        for file_start, file_end, path in sorted(files, key=lambda f: f[0]):
+            try:
+                with open(path, 'rb') as f:
+                    df = pickle.load(f)
+                df = df.copy()
+                df['Date'] = pd.to_datetime(df['Date'])
+            except Exception as e:
+                print(f"   ⚠️  Skipping {path.name}: {e}")
+                continue
+            
+            data = _merge_bars(data, df)
+            merged.append(path)
+            
+            # Disjoint ranges keep their bars but not the coverage (the gap
+            # is fetched as head bars when requested)
+            if start is None:
+                start, end = file_start, file_end
+            elif file_start <= end + pd.Timedelta(days=4) and file_end >= start - pd.Timedelta(days=4):
+                start, end = min(start, file_start), max(end, file_end)
+        
+        if not merged or data is None or data.empty:
+            continue
+        
+        # Merged bars are only as fresh as the oldest file they came from
+        fetched_at = min(pd.Timestamp(p.stat().st_mtime, unit='s', tz='UTC').tz_convert(MARKET_TZ) for p in merged)
+        if history.get('fetched_at') is not None:
+            fetched_at = min(fetched_at, history['fetched_at'])
+        
+        _save_history(ticker, interval, dict(history, data=data, start=start, end=end, fetched_at=fetched_at))
+        
+        for path in merged:
+            remove(path, 'merged_ranges')
+    
+    if HISTORY_DIR.exists():
+        files = [p for p in HISTORY_DIR.iterdir() if p.is_file()]
+        now = time.time()
+        
+        for path in files:
+            if path.name.endswith('.tmp'):
+                if now - path.stat().st_mtime > stale_tmp_seconds:
+                    remove(path, 'temp_files')
+            
+            elif path.suffix in _DATA_EXTENSIONS and path.suffix != backend.extension:
+                if path.with_suffix(backend.extension).exists():
+                    remove(path, 'duplicates')
+            
+            elif path.suffix == '.json' and _SIDECAR_PATTERN.match(path.stem):
+                if not any(path.with_suffix(ext).exists() for ext in _DATA_EXTENSIONS):
+                    remove(path, 'orphans')
+        
+        # Resampled bars without the daily history they were built from
+        for path in HISTORY_DIR.glob(f'*_resampled{backend.extension}'):
+            daily = _get_history_file(path.name.split('_')[0], '1d', backend)
+            if not daily.exists():
+                remove(path, 'orphans')
+                remove(path.with_suffix('.json'), 'orphans')
+    
+    print(f"   🗜️  Compacted cache: {result['merged_ranges']} ranges merged, "
+          f"{result['duplicates'] + result['orphans'] + result['temp_files']} files removed "
+          f"({result['freed_bytes'] / 2**20:.1f} MB)")
+    
+    return result
 
 def clear_cache():
-    """Clear all cached data"""
+    """Clear all cached data (disk and memory tier)"""
     import shutil
     if CACHE_DIR.exists():
         shutil.rmtree(CACHE_DIR)
         CACHE_DIR.mkdir(exist_ok=True)
+        HISTORY_DIR.mkdir(exist_ok=True)
+    clear_memory_cache()
+    _request_stats.update(requests=0, hits=0)
     print("   🗑️  Cache cleared")
 
-def get_cache_stats():
-    """Get cache statistics"""
+def get_cache_stats(oldest=5):
+    """
+    Get cache statistics
+    
+    Args:
+        oldest: Number of least recently used entries to list
+    
+    Returns:
+        dict with file counts, 'bytes' (total on disk), 'budget_bytes',
+        'hit_rate' (requests served without an API call, this process),
+        'memory' (memory tier stats) and 'oldest_entries'
+    """
     if not CACHE_DIR.exists():
-        return {'cached_files': 0}
+        return {'cached_files': 0, 'bytes': 0}
     
+    entries = _cache_entries()
     files = list(CACHE_DIR.glob('*.pkl'))
+    history_files = [f for f in HISTORY_DIR.glob('*') if f.suffix != '.json'] if HISTORY_DIR.exists() else []
+    requests = _request_stats['requests']
+    now = time.time()
+    
     return {
-        'cached_files': len(files),
-        'cache_dir': str(CACHE_DIR)
+        'cached_files': len(files) + len(history_files),
+        'history_files': len(history_files),
+        'cache_dir': str(CACHE_DIR),
+        'entries': len(entries),
+        'bytes': sum(e['bytes'] for e in entries),
+        'budget_bytes': DISK_BUDGET_BYTES,
+        'requests': requests,
+        'hit_rate': _request_stats['hits'] / requests if requests else 0.0,
+        'memory': get_memory_cache_stats(),
+        'oldest_entries': [
+            {'name': e['name'], 'bytes': e['bytes'], 'idle_days': round((now - e['last_used']) / 86400, 1)}
+            for e in sorted(entries, key=lambda e: e['last_used'])[:oldest]
+        ]
     }
 
 def prewarm_cache(tickers, start_date, end_date, interval='1d'):
@@ -222,7 +1179,7 @@ def prewarm_cache(tickers, start_date, end_date, interval='1d'):
         tickers: List of tickers to cache
         start_date: Start date
         end_date: End date  
-        interval: '1d' or '1wk'
+        interval: '1d', '1wk' or '1mo'
     """
     print(f"\n🔥 Prewarming cache for {len(tickers)} tickers...")
     
@@ -234,3 +1191,26 @@ def prewarm_cache(tickers, start_date, end_date, interval='1d'):
     
     print(f"✅ Prewarmed {success}/{len(tickers)} tickers\n")
     return success
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Maintain the universal stock data cache")
+    parser.add_argument('--compact', action='store_true', help="Merge legacy ranges, remove orphaned files")
+    parser.add_argument('--enforce', action='store_true', help="Evict entries over the age/disk budget")
+    parser.add_argument('--budget-mb', type=float, default=None, help="Disk budget (default: STOCK_CACHE_DISK_MB)")
+    parser.add_argument('--stats', action='store_true', help="Print cache statistics")
+    args = parser.parse_args()
+    
+    if args.compact:
+        compact_cache()
+    if args.enforce:
+        budget = None if args.budget_mb is None else int(args.budget_mb * 1024 * 1024)
+        enforce_cache_budget(budget)
+    if args.stats or not (args.compact or args.enforce):
+        stats = get_cache_stats()
+        print(f"\n📦 {stats['entries']} entries, {stats['bytes'] / 2**20:.1f} MB "
+              f"(budget {stats['budget_bytes'] / 2**20:.0f} MB)")
+        for entry in stats['oldest_entries']:
+            print(f"   {entry['name']}: {entry['bytes'] / 2**20:.2f} MB, idle {entry['idle_days']} days")
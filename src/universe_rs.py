@@ -0,0 +1,322 @@
+"""
+UNIVERSE RELATIVE STRENGTH - CROSS-SECTIONAL PERCENTILE RANKING
+================================================================
+IBD-style RS Rating: every stock is ranked against ALL other stocks
+in stocks_list.csv on every date, instead of being compared to SPY
+in isolation.
+
+How it works:
+1. Build one aligned close matrix (dates x symbols) from batch downloads
+2. Weighted composite for every date and symbol in one NumPy pass
+   (40% 12-month, 20% 6-month, 20% 3-month, 20% 1-month return)
+3. Rank cross-sectionally per date -> 1-99 RS Rating
+4. Persist ratings (one column per symbol) so add_strength_indicators
+   can read a single symbol with column projection
+
+Run nightly:
+    python universe_rs.py [--days 730]
+"""
+
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from cache_storage import get_backend, atomic_write
+from tr_calculations import IBD_RS_WEIGHTS, align_to_market
+
+# Ratings live next to the universal_cache histories
+RS_DIR = Path(__file__).parent / '.stock_cache'
+RS_DIR.mkdir(exist_ok=True)
+
+STOCKS_LIST_CSV = Path(__file__).parent.parent / 'stocks_list.csv'
+
+# IBD lookbacks (bars), ordered 1yr, 6mo, 3mo, 1mo
+RS_PERIODS = {
+    'daily': [252, 126, 63, 21],
+    'weekly': [52, 26, 13, 4]
+}
+
+# Symbols per batch download
+BATCH_SIZE = 100
+
+# A missing close is carried over at most this many bars (halts, holidays
+# on other exchanges) - a delisted symbol drops out of the ranking after that
+MAX_FILL_BARS = {
+    'daily': 5,
+    'weekly': 1
+}
+
+# A stored rating older than this (relative to the bar it is used for) is
+# stale - the bar falls back to the SPY-relative RS
+MAX_RATING_AGE = {
+    'daily': pd.Timedelta(days=7),
+    'weekly': pd.Timedelta(days=14)
+}
+
+
+def load_universe_symbols(csv_path=None):
+    """
+    Load the symbol universe
+
+    Args:
+        csv_path: Stock list CSV (default: stocks_list.csv in project root)
+
+    Returns:
+        list: Unique upper-case symbols
+    """
+    df = pd.read_csv(csv_path or STOCKS_LIST_CSV)
+    symbols = df['Symbol'].dropna().astype(str).str.upper().str.strip()
+    return list(dict.fromkeys(s for s in symbols if s))
+
+
+def build_close_matrix(symbols, start_date, end_date, batch_size=BATCH_SIZE):
+    """
+    Download daily closes for all symbols into one aligned matrix
+
+    Args:
+        symbols (list): Stock symbols
+        start_date: Start date
+        end_date: End date
+        batch_size (int): Symbols per batch download
+
+    Returns:
+        pd.DataFrame: Close prices, index = Date, one column per symbol
+    """
+    from batch_fetcher import batch_fetch_yahoo_by_dates
+
+    start_str = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+    end_str = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+
+    closes = {}
+    for i in range(0, len(symbols), batch_size):
+        chunk = symbols[i:i + batch_size]
+        data = batch_fetch_yahoo_by_dates(chunk, start_str, end_str)
+
+        for symbol, df in data.items():
+            if df is None or df.empty or 'Close' not in df.columns:
+                continue
+            close = df['Close']
+            if isinstance(close, pd.DataFrame):
+                close = close.iloc[:, 0]
+            closes[symbol] = close
+
+    if not closes:
+        return pd.DataFrame()
+
+    matrix = pd.DataFrame(closes)
+    matrix.index = pd.to_datetime(matrix.index)
+    matrix.index.name = 'Date'
+
+    return matrix.sort_index()
+
+
+def resample_close_matrix(close_matrix, timeframe='daily'):
+    """Convert a daily close matrix to weekly closes (last close of each week)"""
+    if timeframe.lower() == 'weekly':
+        return close_matrix.resample('W').last().dropna(how='all')
+    return close_matrix
+
+
+def compute_universe_composite(close_matrix, timeframe='daily'):
+    """
+    Weighted IBD composite for every date and symbol at once
+
+    Same lookback convention as tr_enhanced.calculate_relative_strength_ibd:
+    a period with too little history contributes 0, and a symbol needs at
+    least one month of history to get a composite.
+
+    Args:
+        close_matrix (pd.DataFrame): Closes, index = Date, columns = symbols
+        timeframe (str): 'daily' or 'weekly'
+
+    Returns:
+        np.ndarray: Composite (dates x symbols), NaN where not rankable
+    """
+    periods = RS_PERIODS[timeframe.lower()]
+
+    # Carry the last close over a few missing bars only (see MAX_FILL_BARS)
+    closes = close_matrix.ffill(limit=MAX_FILL_BARS[timeframe.lower()]).to_numpy(dtype=float)
+    n_dates = closes.shape[0]
+
+    # Bars of history each symbol has at each date
+    has_data = ~np.isnan(closes)
+    bars = np.cumsum(has_data, axis=0) - 1
+
+    composite = np.zeros_like(closes)
+
+    for period, weight in zip(periods, IBD_RS_WEIGHTS):
+        past = np.full_like(closes, np.nan)
+        if period < n_dates:
+            past[period:] = closes[:-period]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            perf = (closes - past) / past * 100
+
+        valid = (bars >= period) & (past > 0)
+        composite += np.where(valid, perf, 0.0) * weight
+
+    composite[~has_data | (bars < periods[-1])] = np.nan
+
+    return composite
+
+
+def rank_cross_sectional(composite):
+    """
+    Percentile rank of every symbol against the universe on each date
+
+    Args:
+        composite (np.ndarray): Composite (dates x symbols), NaN = not ranked
+
+    Returns:
+        np.ndarray: RS Rating 1-99 (NaN where not ranked)
+    """
+    pct = pd.DataFrame(composite).rank(axis=1, pct=True, method='average').to_numpy()
+    return np.round(1 + pct * 98, 1)
+
+
+def compute_universe_rs(close_matrix, timeframe='daily'):
+    """
+    Cross-sectional RS Ratings for the whole universe
+
+    Args:
+        close_matrix (pd.DataFrame): DAILY closes, index = Date, columns = symbols
+        timeframe (str): 'daily' or 'weekly'
+
+    Returns:
+        pd.DataFrame: RS Rating (1-99), index = Date, columns = symbols
+    """
+    closes = resample_close_matrix(close_matrix, timeframe)
+    ratings = rank_cross_sectional(compute_universe_composite(closes, timeframe))
+
+    return pd.DataFrame(ratings, index=closes.index, columns=closes.columns)
+
+
+def get_ratings_file(timeframe='daily', backend=None):
+    """Get the persisted ratings file for a timeframe"""
+    backend = backend or get_backend()
+    return RS_DIR / f"universe_rs_{timeframe.lower()}{backend.extension}"
+
+
+def save_universe_rs(ratings, timeframe='daily', backend=None):
+    """Persist ratings: one Date column plus one column per symbol"""
+    backend = backend or get_backend()
+    atomic_write(backend, ratings.reset_index(), get_ratings_file(timeframe, backend))
+
+
+def get_universe_rs(symbol, timeframe='daily'):
+    """
+    Look up a symbol's persisted cross-sectional RS Ratings
+
+    Only the Date column and this symbol's column are read from disk.
+
+    Args:
+        symbol (str): Stock symbol
+        timeframe (str): 'daily' or 'weekly'
+
+    Returns:
+        pd.DataFrame with Date and RS columns, or None if not available
+    """
+    backend = get_backend()
+    ratings_file = get_ratings_file(timeframe, backend)
+
+    if symbol is None or not ratings_file.exists():
+        return None
+
+    symbol = str(symbol).upper()
+
+    try:
+        df = backend.read(ratings_file, columns=['Date', symbol])
+    except Exception:
+        return None
+
+    if symbol not in df.columns:
+        return None
+
+    df = df.rename(columns={symbol: 'RS'}).dropna(subset=['RS'])
+    df['Date'] = pd.to_datetime(df['Date'])
+
+    return df.reset_index(drop=True) if not df.empty else None
+
+
+def lookup_universe_rs(df, symbol, timeframe='daily'):
+    """
+    Universe RS Rating for each bar of an analyzed stock (as-of by date)
+
+    A bar more than MAX_RATING_AGE after the matched rating gets NaN (the
+    ratings job stopped running or the symbol left the universe).
+
+    Args:
+        df (pd.DataFrame): Stock data with Date column
+        symbol (str): Stock symbol
+        timeframe (str): 'daily' or 'weekly'
+
+    Returns:
+        pd.Series: RS Rating per bar (NaN where unavailable), or None
+    """
+    ratings = get_universe_rs(symbol, timeframe)
+
+    if ratings is None:
+        return None
+
+    count = align_to_market(df['Date'], ratings['Date'])
+    matched = np.maximum(count - 1, 0)
+    values = ratings['RS'].to_numpy(dtype=float)
+    age = pd.to_datetime(df['Date']).to_numpy() - ratings['Date'].to_numpy()[matched]
+    current = (count > 0) & (age <= MAX_RATING_AGE[timeframe.lower()].to_timedelta64())
+    rs = np.where(current, values[matched], np.nan)
+
+    return pd.Series(rs, index=df.index)
+
+
+def run_universe_rs_job(duration_days=730, csv_path=None, timeframes=('daily', 'weekly')):
+    """
+    Nightly job: download the universe, rank, and persist the ratings
+
+    Args:
+        duration_days (int): Days of history (needs > 1 year for the 12-month leg)
+        csv_path: Stock list CSV (default: stocks_list.csv)
+        timeframes (tuple): Timeframes to compute
+
+    Returns:
+        dict: {timeframe: ratings DataFrame}
+    """
+    start_time = time.time()
+
+    symbols = load_universe_symbols(csv_path)
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=duration_days)
+
+    print(f"\n{'='*60}")
+    print(f"📊 UNIVERSE RS JOB: {len(symbols)} symbols, {duration_days} days")
+    print(f"{'='*60}\n")
+
+    close_matrix = build_close_matrix(symbols, start_date, end_date)
+
+    if close_matrix.empty:
+        print("❌ No data downloaded - ratings not updated")
+        return {}
+
+    results = {}
+    for timeframe in timeframes:
+        ratings = compute_universe_rs(close_matrix, timeframe)
+        save_universe_rs(ratings, timeframe)
+        results[timeframe] = ratings
+        print(f"✅ {timeframe.capitalize()} RS: {ratings.shape[1]} symbols x {ratings.shape[0]} bars")
+
+    print(f"\n✅ Universe RS complete in {time.time() - start_time:.1f}s\n")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compute cross-sectional RS Ratings for the stock universe")
+    parser.add_argument('--days', type=int, default=730, help="Days of history to download")
+    parser.add_argument('--csv', default=None, help="Stock list CSV (default: stocks_list.csv)")
+    args = parser.parse_args()
+
+    run_universe_rs_job(args.days, args.csv)
@@ -1,13 +1,21 @@
 """
 Stock Data Cache Manager
 Saves API calls by caching stock data locally
+Data files use the columnar backends in src/cache_storage.py (Feather by default)
 """
 
 import os
+import sys
 import pandas as pd
 import json
 from datetime import datetime, timedelta
-import pickle
+
+# cache_storage lives in src/ next to universal_cache
+_src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if _src_path not in sys.path:
+    sys.path.insert(0, _src_path)
+
+from cache_storage import get_backend, atomic_write
 
 
 class StockDataCache:
@@ -18,14 +26,16 @@ class StockDataCache:
     - Saves both raw data and TR analysis results
     """
     
-    def __init__(self, cache_dir='cache'):
+    def __init__(self, cache_dir='cache', storage_format=None):
         """
         Initialize cache manager
         
         Args:
             cache_dir (str): Directory to store cache files
+            storage_format (str): 'feather', 'parquet' or 'pickle' (default: feather)
         """
         self.cache_dir = cache_dir
+        self.backend = get_backend(storage_format)
         
         # Create cache directory if it doesn't exist
         os.makedirs(cache_dir, exist_ok=True)
@@ -39,7 +49,7 @@ class StockDataCache:
         ticker_clean = str(ticker).replace('/', '_').replace('\\', '_')
         timeframe_clean = str(timeframe).replace(' ', '_')
         duration_clean = str(duration).replace(' ', '_')
-        return f"{self.cache_dir}/{ticker_clean}_{timeframe_clean}_{duration_clean}_cache.pkl"
+        return f"{self.cache_dir}/{ticker_clean}_{timeframe_clean}_{duration_clean}_cache{self.backend.extension}"
     
     def get_metadata_filename(self, ticker, timeframe, duration):
         """Generate metadata filename"""
@@ -95,8 +105,7 @@ class StockDataCache:
         
         try:
             # Save dataframe
-            with open(cache_file, 'wb') as f:
-                pickle.dump(dataframe, f)
+            atomic_write(self.backend, dataframe, cache_file)
             
             # Save metadata - convert dates to strings for JSON serialization
             date_min = str(dataframe['Date'].min()) if 'Date' in dataframe.columns else 'N/A'
@@ -124,10 +133,13 @@ class StockDataCache:
             import traceback
             traceback.print_exc()
     
-    def load_from_cache(self, ticker, timeframe, duration):
+    def load_from_cache(self, ticker, timeframe, duration, columns=None):
         """
         Load dataframe from cache
         
+        Args:
+            columns (list, optional): Only read these columns
+        
         Returns:
             pd.DataFrame or None: Cached dataframe if exists, None otherwise
         """
@@ -137,8 +149,7 @@ class StockDataCache:
             return None
         
         try:
-            with open(cache_file, 'rb') as f:
-                dataframe = pickle.load(f)
+            dataframe = self.backend.read(cache_file, columns=columns)
             
             print(f"   📂 Loaded from cache: {len(dataframe)} rows")
             return dataframe